@@ -1,6 +1,9 @@
 from fastapi import FastAPI
 from .config import Config
 from .routes import auth_router, knowledge_card_router, card_cluster_router
+from .services import ingestion_job_service, summary_cache_service, engagement_buffer_service, semantic_search_service, keyword_search_service
+from .utils import blocking_executor, embedder_for_title, scraper, fetcher, fetch_scheduler
+from .database.indexes import ensure_indexes
 from fastapi.middleware.cors import CORSMiddleware
 
 config = Config()
@@ -19,8 +22,60 @@ app.include_router(auth_router, prefix="/api")
 app.include_router(knowledge_card_router, prefix="/knowledge-card")
 app.include_router(card_cluster_router, prefix="/suits")
 
+@app.on_event("startup")
+async def start_background_workers():
+    if Config.MONGO_ENSURE_INDEXES:
+        try:
+            await blocking_executor.run_io(ensure_indexes)
+        except Exception as exception:
+            print(f"Error creating indexes: {exception}")
+    await ingestion_job_service.start()
+    await engagement_buffer_service.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await ingestion_job_service.stop()
+    await engagement_buffer_service.stop()
+    scraper.close()
+    blocking_executor.shutdown()
+
 @app.get("/")
 def home():
     return {"message": "Brieffy Backend Running"}
 
+@app.get("/metrics/executors")
+def executor_metrics():
+    """Pool sizes and queue depth of the blocking executor"""
+    return blocking_executor.get_metrics()
+
+@app.get("/metrics/summary-cache")
+def summary_cache_metrics():
+    """Hit rate of the content-addressed summary cache"""
+    return summary_cache_service.get_stats()
+
+@app.get("/metrics/engagement-buffer")
+def engagement_buffer_metrics():
+    """Pending likes/bookmarks of the write-behind engagement buffer"""
+    return engagement_buffer_service.get_stats()
+
+@app.get("/metrics/scraper")
+def scraper_metrics():
+    """Browser session pool occupancy, pages per minute, pages served per fetch tier and politeness counters"""
+    return {**scraper.get_stats(), "tiers": fetcher.get_stats(), "scheduler": fetch_scheduler.get_stats()}
+
+@app.get("/metrics/embedder")
+def embedder_metrics():
+    """Backend, micro-batching and cache counters of the title embedder"""
+    return embedder_for_title.get_stats()
+
+@app.get("/metrics/search-index")
+def search_index_metrics():
+    """Size and hit rate of the per-user semantic search matrices"""
+    return semantic_search_service.get_stats()
+
+@app.get("/metrics/keyword-index")
+def keyword_index_metrics():
+    """Size and hit rate of the per-user keyword search indexes"""
+    return keyword_search_service.get_stats()
+
 __all__ = ["config", "app"]
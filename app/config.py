@@ -16,4 +16,83 @@ class Config:
     AUTH = os.getenv("AUTH")
     PROXY_USERNAME = os.getenv("PROXY_USERNAME")
     PROXY_PASSWORD = os.getenv("PROXY_PASSWORD")
-    BaseURL = os.getenv("BaseURL")
\ No newline at end of file
+    BaseURL = os.getenv("BaseURL")
+    GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", 8))
+    GEMINI_REDUCE_FANOUT = int(os.getenv("GEMINI_REDUCE_FANOUT", 8))
+    INGESTION_WORKERS = int(os.getenv("INGESTION_WORKERS", 4))
+    INGESTION_JOB_STORE = os.getenv("INGESTION_JOB_STORE", "mongo")  # mongo | memory
+    INGESTION_JOB_TTL_SECONDS = int(os.getenv("INGESTION_JOB_TTL_SECONDS", 24 * 3600))  # finished jobs are deleted after this
+    INGESTION_JOB_STALE_SECONDS = int(os.getenv("INGESTION_JOB_STALE_SECONDS", 900))  # a running job without progress for this long is requeued
+    IO_POOL_SIZE = int(os.getenv("IO_POOL_SIZE", 32))
+    LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", 16))
+    CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", os.cpu_count() or 2))
+    SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    SUMMARY_CACHE_TTL_SECONDS = int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+    SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 50000))
+    SUMMARY_CACHE_MEMORY_ENTRIES = int(os.getenv("SUMMARY_CACHE_MEMORY_ENTRIES", 512))
+    SUMMARY_CACHE_EVICT_EVERY = int(os.getenv("SUMMARY_CACHE_EVICT_EVERY", 100))
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 100))
+    MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 60000))
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 10000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 30000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", 10000))
+    MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")  # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    MONGO_ENSURE_INDEXES = os.getenv("MONGO_ENSURE_INDEXES", "true").lower() == "true"
+    DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", 5))
+    DASHBOARD_CACHE_MAX_USERS = int(os.getenv("DASHBOARD_CACHE_MAX_USERS", 10000))
+    CARD_EXCERPT_LENGTH = int(os.getenv("CARD_EXCERPT_LENGTH", 280))
+    BOOKMARKS_PAGE_MAX_SIZE = int(os.getenv("BOOKMARKS_PAGE_MAX_SIZE", 50))
+    ENGAGEMENT_BUFFER_ENABLED = os.getenv("ENGAGEMENT_BUFFER_ENABLED", "false").lower() == "true"
+    ENGAGEMENT_FLUSH_INTERVAL_SECONDS = float(os.getenv("ENGAGEMENT_FLUSH_INTERVAL_SECONDS", 2))
+    ENGAGEMENT_FLUSH_THRESHOLD = int(os.getenv("ENGAGEMENT_FLUSH_THRESHOLD", 500))
+    DISCOVERY_DECAY_SECONDS = float(os.getenv("DISCOVERY_DECAY_SECONDS", 45000))
+    DISCOVERY_LIKE_WEIGHT = float(os.getenv("DISCOVERY_LIKE_WEIGHT", 1))
+    DISCOVERY_BOOKMARK_WEIGHT = float(os.getenv("DISCOVERY_BOOKMARK_WEIGHT", 2))
+    DISCOVERY_COPY_WEIGHT = float(os.getenv("DISCOVERY_COPY_WEIGHT", 3))
+    DISCOVERY_PAGE_MAX_SIZE = int(os.getenv("DISCOVERY_PAGE_MAX_SIZE", 50))
+    CLUSTERING_MODE = os.getenv("CLUSTERING_MODE", "incremental")  # incremental | full
+    CLUSTER_EPS = float(os.getenv("CLUSTER_EPS", 0.2))
+    CLUSTER_MIN_SAMPLES = int(os.getenv("CLUSTER_MIN_SAMPLES", 3))
+    CLUSTER_DRIFT_THRESHOLD = float(os.getenv("CLUSTER_DRIFT_THRESHOLD", 0.1))
+    CLUSTER_GROWTH_THRESHOLD = float(os.getenv("CLUSTER_GROWTH_THRESHOLD", 0.5))
+    CLUSTER_BACKEND = os.getenv("CLUSTER_BACKEND", "auto")  # auto | dense | radius
+    CLUSTER_DENSE_MAX_CARDS = int(os.getenv("CLUSTER_DENSE_MAX_CARDS", 2000))
+    SEARCH_INDEX_MAX_USERS = int(os.getenv("SEARCH_INDEX_MAX_USERS", 256))
+    SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", 50))
+    KEYWORD_INDEX_MAX_USERS = int(os.getenv("KEYWORD_INDEX_MAX_USERS", 256))
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "local")  # local (needs sentence-transformers) | hf | auto (local only when it runs HF_MODEL_ID)
+    EMBEDDING_LOCAL_MODEL = os.getenv("EMBEDDING_LOCAL_MODEL", HF_MODEL_ID or "sentence-transformers/all-MiniLM-L6-v2")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 32))
+    EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", 10))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+    EMBEDDING_TIMEOUT_SECONDS = float(os.getenv("EMBEDDING_TIMEOUT_SECONDS", 60))
+    BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_MAX_PAGES_PER_SESSION = int(os.getenv("BROWSER_MAX_PAGES_PER_SESSION", 25))
+    BROWSER_SESSION_MAX_AGE_SECONDS = float(os.getenv("BROWSER_SESSION_MAX_AGE_SECONDS", 300))
+    BROWSER_ACQUIRE_TIMEOUT_SECONDS = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT_SECONDS", 60))
+    CAPTCHA_DETECT_TIMEOUT_MS = int(os.getenv("CAPTCHA_DETECT_TIMEOUT_MS", 10000))
+    FETCH_HTTP_POOL_SIZE = int(os.getenv("FETCH_HTTP_POOL_SIZE", 20))
+    FETCH_HTTP_TIMEOUT_SECONDS = float(os.getenv("FETCH_HTTP_TIMEOUT_SECONDS", 10))
+    FETCH_MIN_TEXT_CHARS = int(os.getenv("FETCH_MIN_TEXT_CHARS", 500))
+    FETCH_DOMAIN_TIER_CACHE_SIZE = int(os.getenv("FETCH_DOMAIN_TIER_CACHE_SIZE", 5000))
+    FETCH_DOMAIN_TIER_TTL_SECONDS = float(os.getenv("FETCH_DOMAIN_TIER_TTL_SECONDS", 86400))
+    FETCH_CONDITIONAL_CACHE_SIZE = int(os.getenv("FETCH_CONDITIONAL_CACHE_SIZE", 512))
+    CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", 8000))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", 0))
+    CHUNK_CHARS_PER_TOKEN = int(os.getenv("CHUNK_CHARS_PER_TOKEN", 4))
+    CHUNK_DEDUP_SIMILARITY = float(os.getenv("CHUNK_DEDUP_SIMILARITY", 0.9))
+    CHUNK_DEDUP_MIN_CHARS = int(os.getenv("CHUNK_DEDUP_MIN_CHARS", 40))
+    CHUNK_DEDUP_MIN_REPEATS = int(os.getenv("CHUNK_DEDUP_MIN_REPEATS", 3))
+    CHUNK_DEDUP_WINDOW_WORDS = int(os.getenv("CHUNK_DEDUP_WINDOW_WORDS", 20))  # repeated word runs dropped from one-line text (transcripts)
+    FETCH_MAX_CONCURRENCY = int(os.getenv("FETCH_MAX_CONCURRENCY", 8))
+    FETCH_DOMAIN_RATE_PER_SECOND = float(os.getenv("FETCH_DOMAIN_RATE_PER_SECOND", 1))
+    FETCH_DOMAIN_BURST = float(os.getenv("FETCH_DOMAIN_BURST", 2))
+    FETCH_MAX_RETRIES = int(os.getenv("FETCH_MAX_RETRIES", 3))
+    FETCH_BACKOFF_BASE_SECONDS = float(os.getenv("FETCH_BACKOFF_BASE_SECONDS", 1))
+    FETCH_BACKOFF_MAX_SECONDS = float(os.getenv("FETCH_BACKOFF_MAX_SECONDS", 30))
+    FETCH_RESPECT_ROBOTS = os.getenv("FETCH_RESPECT_ROBOTS", "true").lower() == "true"
+    FETCH_ROBOTS_USER_AGENT = os.getenv("FETCH_ROBOTS_USER_AGENT", "BrieffyBot")
+    FETCH_ROBOTS_TTL_SECONDS = float(os.getenv("FETCH_ROBOTS_TTL_SECONDS", 3600))
+    BULK_IMPORT_MAX_URLS = int(os.getenv("BULK_IMPORT_MAX_URLS", 100))
\ No newline at end of file
@@ -1,10 +1,22 @@
 from .user_dao import UserDAO
 from .knowledge_card_dao import KnowledgeCardDao
 from .card_cluster_dao import ClusterDao
+from .ingestion_job_dao import IngestionJobDao, InMemoryIngestionJobDao
+from .summary_cache_dao import SummaryCacheDao
+from .discovery_feed_dao import DiscoveryFeedDao
+from .async_knowledge_card_dao import AsyncKnowledgeCardDao
+from app.config import Config
 
 user_dao = UserDAO()
 knowledge_card_dao = KnowledgeCardDao()
 card_cluster_dao = ClusterDao()
+summary_cache_dao = SummaryCacheDao()
+discovery_feed_dao = DiscoveryFeedDao()
+ingestion_job_dao = IngestionJobDao() if Config.INGESTION_JOB_STORE == "mongo" else InMemoryIngestionJobDao()
 
-__all__ = ["user_dao","knowledge_card_dao", "card_cluster_dao"]
+# motor based reads of the home feed and the dashboard, every method is a coroutine
+async_knowledge_card_dao = AsyncKnowledgeCardDao()
+
+__all__ = ["user_dao","knowledge_card_dao", "card_cluster_dao", "ingestion_job_dao", "summary_cache_dao", "discovery_feed_dao",
+           "async_knowledge_card_dao"]
 
@@ -0,0 +1,49 @@
+from app.database import async_db_instance
+from app.utils import to_knowledge_card_list_item
+from app.dao.knowledge_card_dao import dashboard_cache, dashboard_pipeline, shape_dashboard, all_cards_filter, list_cards_pipeline
+
+class AsyncKnowledgeCardDao:
+    """
+    motor (asyncio) reads of the hottest endpoints, the home feed and the dashboard. They await the server on
+    the event loop instead of holding a thread of the io pool for the round trip. The pipelines and the
+    dashboard cache are the ones of KnowledgeCardDao, so both DAOs return the same documents and the writes
+    of the sync DAO invalidate what this one cached.
+    """
+
+    def __init__(self):
+        """
+        Initialize the AsyncKnowledgeCardDao (motor) with a reference to the knowledge cards collection.
+        """
+        self.knowledge_cards_collection = async_db_instance.get_collection("knowledge_cards_collection")
+
+    async def get_all_cards(self, user_id: str, skip: int = 0, limit: int = 4, cursor: str = None):
+        """
+        Usage: Retrieve all knowledge cards for a specific user.
+        Parameters: user_id (str): The ID of the user whose cards are to be retrieved.
+        Returns: list: A list of the user's unarchived knowledge cards in the list view.
+        """
+        try:
+            cards = self.knowledge_cards_collection.aggregate(list_cards_pipeline(all_cards_filter(user_id), user_id, skip, limit, cursor))
+            return [to_knowledge_card_list_item(card) async for card in cards]
+        except Exception as exception:
+            print(f"An error occurred: {exception}")
+            return None
+
+    async def get_dashboard_data(self, user_id: str):
+        """
+        Usage: Get the dashboard counters and recent cards of a user in a single aggregation.
+            Results are cached per user for DASHBOARD_CACHE_TTL_SECONDS and dropped by the writes that change them.
+        Parameters: user_id (str): The ID of the user.
+        Returns: dict: The dashboard data.
+        """
+        cached = dashboard_cache.get(user_id)
+        if cached is not None:
+            return cached
+        try:
+            result = await self.knowledge_cards_collection.aggregate(dashboard_pipeline(user_id)).to_list(1)
+            dashboard = shape_dashboard(result[0] if result else {})
+            dashboard_cache.set(user_id, dashboard)
+            return dashboard
+        except Exception as exception:
+            print(f"Error getting dashboard data: {exception}")
+            return None
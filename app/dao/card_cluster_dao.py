@@ -1,15 +1,32 @@
+from datetime import datetime
+import numpy as np
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.database import db_instance
 from app.models import CardCluster
+from app.utils import decode_vector
 from typing import List, Dict, Any, Optional
 
 
+def centroid_of(cluster: Dict) -> np.ndarray:
+    """
+    Usage: Centroid of a stored cluster, the running sum of its card vectors divided by their count.
+        Clusters written before the sums were kept only have the packed centroid_vector.
+    Parameter: cluster: The cluster document
+    Returns: np.ndarray
+    """
+    if cluster.get("centroid_sum"):
+        return np.asarray(cluster["centroid_sum"], dtype=float) / max(cluster.get("card_count", 1), 1)
+    return decode_vector(cluster.get("centroid_vector"))
+
+
 class ClusterDao:
     def __init__(self):
         """        
         Initialize the ClusterDao with a reference to the clusters collection.
         """
         self.clusters_collection = db_instance.get_collection("clusters_collection")
+        self.cluster_state_collection = db_instance.get_collection("cluster_state_collection")
 
     def clear_user_clusters(self, user_id: str):
         """
@@ -28,11 +45,17 @@ class ClusterDao:
             
     def create_cluster(self, cluster_data: Dict[str, Any]):
         """
-        Usage: creates new cluster
+        Usage: creates new cluster, its centroid is stored as the sum of the card vectors and their count
+            so that add_card_to_cluster can move it with a single atomic $inc
         parameter: cluster_data to insert
         return: id of inserted cluster or none on failure
         """
         try:
+            cluster_data = dict(cluster_data)
+            card_count = len(cluster_data.get("knowledge_card_ids", []))
+            centroid = np.asarray(cluster_data.pop("centroid_vector"), dtype=float)
+            cluster_data["centroid_sum"] = (centroid * card_count).tolist()
+            cluster_data["card_count"] = card_count
             result = self.clusters_collection.insert_one(cluster_data)
             return str(result.inserted_id) if result.inserted_id else None
         except Exception as exception:
@@ -52,7 +75,7 @@ class ClusterDao:
                 CardCluster(
                     cluster_id=str(cluster["_id"]),
                     user_id=str(cluster["user_id"]),
-                    centroid_vector=cluster.get("centroid_vector", []),
+                    centroid_vector=centroid_of(cluster).tolist(),
                     knowledge_card_ids=[
                         str(card_id) for card_id in cluster.get("knowledge_card_ids", [])
                     ],
@@ -80,4 +103,100 @@ class ClusterDao:
             return result.modified_count > 0
         except Exception as exception:
             print(f"error deleting card from cluster: {exception}")
-            return False
\ No newline at end of file
+            return False
+
+    def get_cluster_centroids(self, user_id: str) -> List[Dict]:
+        """
+        Usage: Centroids of a user's clusters, without the card id lists
+        Parameter: user_id: The user ID to get clusters for
+        Returns: List of {_id, centroid, topic_name}
+        """
+        try:
+            clusters = self.clusters_collection.find(
+                {"user_id": ObjectId(user_id)},
+                {"centroid_sum": 1, "card_count": 1, "centroid_vector": 1, "topic_name": 1}
+            )
+            return [{"_id": cluster["_id"], "centroid": centroid_of(cluster), "topic_name": cluster.get("topic_name")} for cluster in clusters]
+        except Exception as exception:
+            print(f"error getting cluster centroids: {exception}")
+            return []
+
+    def add_card_to_cluster(self, cluster_id, card_id: str, vector: list):
+        """
+        Usage: Add a card to an existing cluster and move its centroid, in one update: the card vector is
+            added to centroid_sum and card_count is incremented with $inc, so concurrent assignments to
+            the same cluster are never lost. The filter skips a card already in the cluster and a cluster
+            without a sum of the same dimension (written before the sums were kept, or by another model).
+        Parameter: cluster_id, card_id, vector: The embedded vector of the card
+        Returns: True when the card was added
+        """
+        try:
+            card_obj_id = ObjectId(card_id)
+            increments = {f"centroid_sum.{index}": float(value) for index, value in enumerate(vector)}
+            result = self.clusters_collection.update_one(
+                {"_id": ObjectId(cluster_id), "centroid_sum": {"$size": len(vector)}, "knowledge_card_ids": {"$ne": card_obj_id}},
+                {"$addToSet": {"knowledge_card_ids": card_obj_id}, "$inc": {**increments, "card_count": 1}}
+            )
+            return result.modified_count > 0
+        except Exception as exception:
+            print(f"error adding card to cluster: {exception}")
+            return False
+
+    def get_cluster_state(self, user_id: str) -> Dict:
+        """
+        Usage: Drift counters of a user's clustering since the last full recluster
+        Parameter: user_id
+        Returns: {cards_at_full_recluster, assigned_since, unassigned_since}, zeros when never clustered
+        """
+        try:
+            state = self.cluster_state_collection.find_one({"_id": ObjectId(user_id)}) or {}
+            return {
+                "cards_at_full_recluster": state.get("cards_at_full_recluster", 0),
+                "assigned_since": state.get("assigned_since", 0),
+                "unassigned_since": state.get("unassigned_since", 0)
+            }
+        except Exception as exception:
+            print(f"error getting cluster state: {exception}")
+            return {"cards_at_full_recluster": 0, "assigned_since": 0, "unassigned_since": 0}
+
+    def record_incremental_assignment(self, user_id: str, assigned: bool) -> Dict:
+        """
+        Usage: Count one incrementally clustered card towards the drift of a user
+        Parameter: user_id, assigned: whether the card joined an existing cluster
+        Returns: The updated drift counters
+        """
+        try:
+            field = "assigned_since" if assigned else "unassigned_since"
+            state = self.cluster_state_collection.find_one_and_update(
+                {"_id": ObjectId(user_id)},
+                {"$inc": {field: 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return {
+                "cards_at_full_recluster": state.get("cards_at_full_recluster", 0),
+                "assigned_since": state.get("assigned_since", 0),
+                "unassigned_since": state.get("unassigned_since", 0)
+            }
+        except Exception as exception:
+            print(f"error recording cluster assignment: {exception}")
+            return {"cards_at_full_recluster": 0, "assigned_since": 0, "unassigned_since": 0}
+
+    def reset_cluster_state(self, user_id: str, card_count: int):
+        """
+        Usage: Reset the drift counters after a full recluster
+        Parameter: user_id, card_count: number of cards the recluster ran on
+        """
+        try:
+            self.cluster_state_collection.update_one(
+                {"_id": ObjectId(user_id)},
+                {"$set": {
+                    "cards_at_full_recluster": card_count,
+                    "assigned_since": 0,
+                    "unassigned_since": 0,
+                    "full_recluster_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as exception:
+            print(f"error resetting cluster state: {exception}")
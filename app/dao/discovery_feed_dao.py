@@ -0,0 +1,119 @@
+from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.config import Config
+from app.database import db_instance
+
+def score_stage():
+    """
+    Usage: Pipeline stage computing the trending score of a feed entry from its counters.
+        score = log10(weighted engagement) + created_at / DISCOVERY_DECAY_SECONDS, the "hot" ranking:
+        the time term grows with newer cards instead of decaying older ones, so scores never have to be
+        recomputed as time passes and only change when a card gets likes, bookmarks or copies.
+        Every factor of 10 in engagement is worth DISCOVERY_DECAY_SECONDS of freshness.
+    Returns: dict: The $set stage.
+    """
+    engagement = {"$add": [
+        {"$multiply": [{"$ifNull": ["$likes", 0]}, Config.DISCOVERY_LIKE_WEIGHT]},
+        {"$multiply": [{"$ifNull": ["$bookmarks", 0]}, Config.DISCOVERY_BOOKMARK_WEIGHT]},
+        {"$multiply": [{"$ifNull": ["$copies", 0]}, Config.DISCOVERY_COPY_WEIGHT]}
+    ]}
+    return {"$set": {"score": {"$add": [
+        {"$log10": {"$max": [engagement, 1]}},
+        {"$divide": [{"$toLong": "$created_at"}, Config.DISCOVERY_DECAY_SECONDS * 1000]}
+    ]}}}
+
+class DiscoveryFeedDao:
+    def __init__(self):
+        """
+        Initialize the DiscoveryFeedDao with a reference to the discovery feed collection.
+        One small document per public card: {_id: card id, created_at, likes, bookmarks, copies, score}.
+        """
+        self.discovery_feed_collection = db_instance.get_collection("discovery_feed_collection")
+
+    def _entry_update(self, card: dict):
+        return UpdateOne(
+            {"_id": card["_id"]},
+            [
+                {"$set": {
+                    "created_at": card.get("created_at") or datetime.utcnow(),
+                    "likes": card.get("likes") or 0,
+                    "bookmarks": len(card.get("bookmarked_by") or []),
+                    "copies": len(card.get("copied_by") or []),
+                    "updated_at": "$$NOW"
+                }},
+                score_stage()
+            ],
+            upsert=True
+        )
+
+    def upsert_entries(self, cards: list):
+        """
+        Usage: Insert or refresh the feed entries of public cards from their documents.
+        Parameters: cards (list): Knowledge card documents.
+        Returns: int: The number of inserted or modified entries.
+        """
+        try:
+            if not cards:
+                return 0
+            result = self.discovery_feed_collection.bulk_write([self._entry_update(card) for card in cards], ordered=False)
+            return result.upserted_count + result.modified_count
+        except Exception as exception:
+            print(f"Error updating discovery feed: {exception}")
+            return 0
+
+    def remove_entries(self, card_ids: list):
+        """
+        Usage: Remove cards that were deleted or made private from the feed.
+        Parameters: card_ids (list): The IDs of the cards.
+        Returns: int: The number of removed entries.
+        """
+        try:
+            object_ids = [ObjectId(card_id) for card_id in card_ids]
+            return self.discovery_feed_collection.delete_many({"_id": {"$in": object_ids}}).deleted_count
+        except Exception as exception:
+            print(f"Error removing discovery feed entries: {exception}")
+            return 0
+
+    def adjust_counters(self, deltas: dict):
+        """
+        Usage: Apply engagement changes and recompute the scores, one bulk_write for any number of cards.
+            Cards without a feed entry (private cards) are left alone.
+        Parameters: deltas (dict): card_id -> {"likes" | "bookmarks" | "copies": delta}
+        Returns: int: The number of modified entries.
+        """
+        try:
+            operations = []
+            for card_id, counters in deltas.items():
+                counters = {field: delta for field, delta in counters.items() if delta}
+                if not counters:
+                    continue
+                operations.append(UpdateOne(
+                    {"_id": ObjectId(card_id)},
+                    [
+                        {"$set": {
+                            **{field: {"$max": [0, {"$add": [{"$ifNull": [f"${field}", 0]}, delta]}]} for field, delta in counters.items()},
+                            "updated_at": "$$NOW"
+                        }},
+                        score_stage()
+                    ]
+                ))
+            if not operations:
+                return 0
+            return self.discovery_feed_collection.bulk_write(operations, ordered=False).modified_count
+        except Exception as exception:
+            print(f"Error adjusting discovery feed counters: {exception}")
+            return 0
+
+    def get_ranked_ids(self, limit: int, after: dict = None):
+        """
+        Usage: One page of card ids by descending score, read from the (score, _id) index only.
+        Parameters: limit (int), after (dict): Keyset filter of the previous page.
+        Returns: list: [{_id, score}]
+        """
+        try:
+            entries = self.discovery_feed_collection.find(after or {}, {"score": 1}).sort([("score", -1), ("_id", -1)]).limit(limit)
+            return list(entries)
+        except Exception as exception:
+            print(f"Error reading discovery feed: {exception}")
+            return []
@@ -0,0 +1,158 @@
+import copy
+import threading
+from datetime import datetime
+from pymongo import ReturnDocument
+from app.database import db_instance
+
+class IngestionJobDao:
+    def __init__(self):
+        """
+        Initialize the IngestionJobDao with a reference to the ingestion jobs collection.
+        """
+        self.ingestion_jobs_collection = db_instance.get_collection("ingestion_jobs_collection")
+
+    @staticmethod
+    def _to_job(document):
+        if document:
+            document["job_id"] = document.pop("_id")
+        return document
+
+    def create_job(self, job: dict):
+        """
+        Usage: Insert a new ingestion job.
+        Parameters: job (dict): The job document, job_id is used as the _id.
+        Returns: str: The ID of the inserted job or None on failure.
+        """
+        try:
+            document = dict(job)
+            document["_id"] = document.pop("job_id")
+            self.ingestion_jobs_collection.insert_one(document)
+            return str(document["_id"])
+        except Exception as exception:
+            print(f"Error creating ingestion job: {exception}")
+            return None
+
+    def get_job(self, job_id: str):
+        """
+        Usage: Get an ingestion job by ID.
+        Parameters: job_id (str): The ID of the job.
+        Returns: dict: The job document or None.
+        """
+        try:
+            return self._to_job(self.ingestion_jobs_collection.find_one({"_id": job_id}))
+        except Exception as exception:
+            print(f"Error getting ingestion job: {exception}")
+            return None
+
+    def update_job(self, job_id: str, updates: dict):
+        """
+        Usage: Update the status/stage/result fields of an ingestion job.
+        Parameters: job_id (str): The ID of the job, updates (dict): The fields to set.
+        Returns: bool: True if the job was found.
+        """
+        try:
+            updates = {**updates, "updated_at": datetime.utcnow()}
+            result = self.ingestion_jobs_collection.update_one({"_id": job_id}, {"$set": updates})
+            return result.matched_count > 0
+        except Exception as exception:
+            print(f"Error updating ingestion job: {exception}")
+            return False
+
+    def claim_job(self, job_id: str):
+        """
+        Usage: Move a queued job to running in one atomic update, so that a job queued by several
+            app instances is only run by the one that claims it first.
+        Parameters: job_id (str): The ID of the job.
+        Returns: dict: The claimed job, or None when it is not queued anymore.
+        """
+        try:
+            job = self.ingestion_jobs_collection.find_one_and_update(
+                {"_id": job_id, "status": "queued"},
+                {"$set": {"status": "running", "updated_at": datetime.utcnow()}},
+                return_document=ReturnDocument.AFTER
+            )
+            return self._to_job(job)
+        except Exception as exception:
+            print(f"Error claiming ingestion job: {exception}")
+            return None
+
+    def requeue_stale_jobs(self, stale_before: datetime):
+        """
+        Usage: Put back in the queue the running jobs that made no progress since stale_before,
+            their worker died with the app instance that ran it.
+        Parameters: stale_before (datetime)
+        Returns: int: The number of requeued jobs.
+        """
+        try:
+            result = self.ingestion_jobs_collection.update_many(
+                {"status": "running", "updated_at": {"$lt": stale_before}},
+                {"$set": {"status": "queued", "stage": None, "progress": 0, "updated_at": datetime.utcnow()}}
+            )
+            return result.modified_count
+        except Exception as exception:
+            print(f"Error requeuing stale ingestion jobs: {exception}")
+            return 0
+
+    def get_queued_jobs(self):
+        """
+        Usage: Get the jobs waiting for a worker, used to pick them up after a restart.
+        Returns: list: The queued job documents, oldest first.
+        """
+        try:
+            jobs = self.ingestion_jobs_collection.find({"status": "queued"}).sort("created_at", 1)
+            return [self._to_job(job) for job in jobs]
+        except Exception as exception:
+            print(f"Error getting queued ingestion jobs: {exception}")
+            return []
+
+
+class InMemoryIngestionJobDao:
+    """In-process stand-in for IngestionJobDao, used for tests and local runs without Mongo."""
+
+    def __init__(self):
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def _drop_expired(self):
+        now = datetime.utcnow()
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.get("expires_at") and job["expires_at"] <= now]:
+            del self.jobs[job_id]
+
+    def create_job(self, job: dict):
+        with self.lock:
+            self._drop_expired()
+            self.jobs[job["job_id"]] = copy.deepcopy(job)
+        return job["job_id"]
+
+    def get_job(self, job_id: str):
+        with self.lock:
+            self._drop_expired()
+            job = self.jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def update_job(self, job_id: str, updates: dict):
+        with self.lock:
+            if job_id not in self.jobs:
+                return False
+            self.jobs[job_id].update(updates, updated_at=datetime.utcnow())
+            return True
+
+    def claim_job(self, job_id: str):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job or job["status"] != "queued":
+                return None
+            job.update(status="running", updated_at=datetime.utcnow())
+            return copy.deepcopy(job)
+
+    def requeue_stale_jobs(self, stale_before: datetime):
+        with self.lock:
+            stale = [job for job in self.jobs.values() if job["status"] == "running" and job["updated_at"] < stale_before]
+            for job in stale:
+                job.update(status="queued", stage=None, progress=0, updated_at=datetime.utcnow())
+        return len(stale)
+
+    def get_queued_jobs(self):
+        with self.lock:
+            jobs = [copy.deepcopy(job) for job in self.jobs.values() if job["status"] == "queued"]
+        return sorted(jobs, key=lambda job: job["created_at"])
@@ -1,11 +1,116 @@
 from bson import ObjectId
 from datetime import datetime
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
+from app.config import Config
 from app.database import db_instance
 from app.models import KnowledgeCard
-from app.utils import to_knowledge_card
+from app.utils import encode_vector, to_knowledge_card, to_knowledge_card_list_item, list_view_projection, keyset_filter, NEWEST_FIRST, LRUCache
+
+# per-user dashboard results, shared with the async DAO so that writes through either one invalidate it.
+# The cache is per process, with several workers the TTL bounds how stale another worker's copy can be.
+dashboard_cache = LRUCache(max_size=Config.DASHBOARD_CACHE_MAX_USERS, ttl_seconds=Config.DASHBOARD_CACHE_TTL_SECONDS)
+
+def invalidate_dashboard(*user_ids):
+    """
+    Usage: Drop the cached dashboard of the given users after a write that changes their counters.
+    Parameters: user_ids (str | ObjectId): The affected users.
+    """
+    for user_id in user_ids:
+        if user_id:
+            dashboard_cache.delete(str(user_id))
+
+def dashboard_pipeline(user_id: str):
+    """
+    Usage: One aggregation returning every dashboard counter and the recent cards.
+        The leading $match uses the user_id and bookmarked_by indexes, the facets split the
+        user's own cards from the cards they bookmarked.
+    Parameters: user_id (str): The ID of the user.
+    Returns: list: The aggregation pipeline.
+    """
+    owner_id = ObjectId(user_id)
+
+    def count_if(expression):
+        return {"$sum": {"$cond": [expression, 1, 0]}}
+
+    def is_set(field):
+        return {"$ne": [{"$ifNull": [field, None]}, None]}
+
+    return [
+        {"$match": {"$or": [{"user_id": owner_id}, {"bookmarked_by": user_id}]}},
+        {"$facet": {
+            "own": [
+                {"$match": {"user_id": owner_id}},
+                {"$group": {
+                    "_id": None,
+                    "total_cards": {"$sum": 1},
+                    "archived": count_if({"$eq": ["$archive", True]}),
+                    "favourites": count_if({"$eq": ["$favourite", True]}),
+                    "shared": count_if(is_set("$shared_token")),
+                    "link": count_if(is_set("$source_url"))
+                }}
+            ],
+            "bookmarked": [
+                {"$match": {"bookmarked_by": user_id}},
+                {"$group": {
+                    "_id": None,
+                    "bookmarks": {"$sum": 1},
+                    "global_bookmarks": count_if({"$eq": ["$public", True]})
+                }}
+            ],
+            "recent_cards": [
+                {"$match": {"user_id": owner_id}},
+                {"$sort": {"created_at": -1}},
+                {"$limit": 4},
+                {"$project": list_view_projection(user_id)}
+            ]
+        }}
+    ]
+
+def shape_dashboard(result: dict):
+    """
+    Usage: Convert the output of dashboard_pipeline into the dashboard response.
+    Parameters: result (dict): The single document returned by the aggregation.
+    Returns: dict: The dashboard data, recent_cards in the list view like the feeds.
+    """
+    own = result["own"][0] if result.get("own") else {}
+    bookmarked = result["bookmarked"][0] if result.get("bookmarked") else {}
+    total_cards = own.get("total_cards", 0)
+    link_count = own.get("link", 0)
+
+    return {
+        "total_cards": total_cards,
+        "archived": own.get("archived", 0),
+        "favourites": own.get("favourites", 0),
+        "bookmarks": bookmarked.get("bookmarks", 0),
+        "global_bookmarks": bookmarked.get("global_bookmarks", 0),
+        "shared": own.get("shared", 0),
+        "recent_cards": [to_knowledge_card_list_item(doc) for doc in result.get("recent_cards", [])],
+        "upload_stats": {"link": link_count, "file": total_cards - link_count}  # Total cards - link cards will give file cards
+    }
+
+def all_cards_filter(user_id: str):
+    """
+    Usage: Filter of the home feed, the user's cards that are not archived.
+    Parameters: user_id (str): The ID of the user.
+    Returns: dict
+    """
+    return {"user_id": ObjectId(user_id), "archive": {"$ne": True}}
+
+def list_cards_pipeline(match: dict, viewer_id: str, skip: int, limit: int, cursor: str = None):
+    """
+    Usage: Aggregation of a newest-first page of cards in the list view, projected on the server.
+        With a cursor the page starts right after it and skip is ignored (keyset pagination).
+    Parameters: match (dict): The filter, viewer_id (str): The user looking at the list, skip (int), limit (int),
+        cursor (str): Cursor returned with the previous page.
+    Returns: list: The aggregation pipeline.
+    """
+    pipeline = [{"$match": {"$and": [match, keyset_filter(cursor)]} if cursor else match}, {"$sort": NEWEST_FIRST}]
+    if skip and not cursor:
+        pipeline.append({"$skip": skip})
+    return pipeline + [{"$limit": limit}, {"$project": list_view_projection(viewer_id)}]
 
 class KnowledgeCardDao:
     def __init__(self):
@@ -14,19 +119,25 @@ class KnowledgeCardDao:
         """
         self.knowledge_cards_collection = db_instance.get_collection("knowledge_cards_collection")
 
-    def get_all_cards(self,user_id:str, skip: int = 0, limit: int = 4):
+    def _list_cards(self, match: dict, viewer_id: str, skip: int, limit: int, cursor: str = None):
+        """
+        Usage: Newest-first page of cards in the list view, projected on the server.
+            With a cursor the page starts right after it and skip is ignored (keyset pagination).
+        Parameters: match (dict): The filter, viewer_id (str): The user looking at the list, skip (int), limit (int),
+            cursor (str): Cursor returned with the previous page.
+        Returns: list: A list of KnowledgeCardListItem.
+        """
+        cards = self.knowledge_cards_collection.aggregate(list_cards_pipeline(match, viewer_id, skip, limit, cursor))
+        return [to_knowledge_card_list_item(card) for card in cards]
+
+    def get_all_cards(self,user_id:str, skip: int = 0, limit: int = 4, cursor: str = None):
         """
         Usage: Retrieve all knowledge cards for a specific user.
         Parameters: user_id (str): The ID of the user whose cards are to be retrieved.
-        Returns: list: A list of knowledge cards.
+        Returns: list: A list of the user's unarchived knowledge cards in the list view.
         """
         try:
-            cards = self.knowledge_cards_collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1).skip(skip).limit(limit)
-            
-            return [
-                to_knowledge_card(card)
-                for card in cards
-            ]
+            return self._list_cards(all_cards_filter(user_id), user_id, skip, limit, cursor)
         
         except Exception as exception:
             print(f"An error occurred: {exception}")
@@ -43,46 +154,33 @@ class KnowledgeCardDao:
             print(f"An error occurred: {exception}")
             return None
 
-    def get_favourite_cards(self, user_id: str, skip: int = 0, limit: int = 4):
+    def get_favourite_cards(self, user_id: str, skip: int = 0, limit: int = 4, cursor: str = None):
         try:
-            cards = self.knowledge_cards_collection.find({
-                "user_id": ObjectId(user_id),
-                "favourite": True
-            }).sort("created_at", -1).skip(skip).limit(limit)
-
-            return [to_knowledge_card(card) for card in cards]
+            return self._list_cards({"user_id": ObjectId(user_id), "favourite": True}, user_id, skip, limit, cursor)
         except Exception as exception:
             print(f"An error occurred: {exception}")
             return None
 
-    def get_archived_cards(self, user_id: str, skip: int = 0, limit: int = 4):
+    def get_archived_cards(self, user_id: str, skip: int = 0, limit: int = 4, cursor: str = None):
         try:
-            cards = self.knowledge_cards_collection.find({
-                "user_id": ObjectId(user_id),
-                "archive": True
-            }).sort("created_at", -1).skip(skip).limit(limit)
-
-            return [to_knowledge_card(card) for card in cards]
+            return self._list_cards({"user_id": ObjectId(user_id), "archive": True}, user_id, skip, limit, cursor)
         except Exception as exception:
             print(f"An error occurred: {exception}")
             return None
 
-    def get_all_public_cards(self, skip: int = 0, limit: int = 4):
+    def get_all_public_cards(self, skip: int = 0, limit: int = 4, viewer_id: str = None, cursor: str = None):
         """
         Usage: Retrieve all public knowledge cards.
-        Returns: list: A list of public knowledge cards.
+        Parameters: viewer_id (str): The user looking at the feed, used for liked_by_me/bookmarked_by_me.
+        Returns: list: A list of public knowledge cards in the list view.
         """
         try:
-            cards = self.knowledge_cards_collection.find({"public": True}).sort("created_at", -1).skip(skip).limit(limit)
-            return [
-                to_knowledge_card(card)  # Convert each card to a KnowledgeCard object
-                for card in cards
-            ]
+            return self._list_cards({"public": True}, viewer_id, skip, limit, cursor)
         except Exception as exception:
             print(f"An error occurred: {exception}")
             return []
     
-    def insert_knowledge_card(self,card: KnowledgeCard):
+    def insert_knowledge_card(self,card: KnowledgeCard, ingestion_job_id: str = None):
         """
         Usage:Insert a knowledge card into MongoDB"
         Parameters:
@@ -93,21 +191,49 @@ class KnowledgeCardDao:
             note (str): Additional notes about the content
             embedding (list): Vector representation of the title for semantic search
             source_url (str): Original source URL of the content
+            ingestion_job_id (str): The ingestion job creating the card, a job inserts at most one card
         Returns:
-            str: The ID of the inserted knowledge card
+            str: The ID of the inserted knowledge card, None when the job already inserted its card
         """
         try:
             knowledge_card = card.dict()
             knowledge_card["user_id"]=ObjectId(card.user_id)
+            knowledge_card["embedded_vector"]=encode_vector(card.embedded_vector)
             # knowledge_card["created_at"]=datetime.utcnow.isoformat()
 
-            result = self.knowledge_cards_collection.insert_one(knowledge_card)
-            inserted_id = result.inserted_id
+            if ingestion_job_id:
+                # a requeued job can run again while its first run is still inserting, the unique
+                # ingestion_job_id index lets only one of them create the card
+                knowledge_card["ingestion_job_id"] = ingestion_job_id
+                result = self.knowledge_cards_collection.update_one(
+                    {"ingestion_job_id": ingestion_job_id}, {"$setOnInsert": knowledge_card}, upsert=True
+                )
+                if result.upserted_id is None:
+                    return None
+                inserted_id = result.upserted_id
+            else:
+                inserted_id = self.knowledge_cards_collection.insert_one(knowledge_card).inserted_id
+            invalidate_dashboard(card.user_id)
             new_card = self.knowledge_cards_collection.find_one({"_id": inserted_id})
             return to_knowledge_card(new_card)
+        except DuplicateKeyError:
+            return None
         except Exception as exception:
             print(f"An error occurred: {exception}")
             return None
+
+    def get_card_by_ingestion_job(self, ingestion_job_id: str):
+        """
+        Usage: Get the card an ingestion job inserted, used when a requeued job runs again.
+        Parameters: ingestion_job_id (str): The ID of the ingestion job.
+        Returns: KnowledgeCard or None when the job has not inserted a card.
+        """
+        try:
+            card = self.knowledge_cards_collection.find_one({"ingestion_job_id": ingestion_job_id})
+            return to_knowledge_card(card) if card else None
+        except Exception as exception:
+            print(f"Error getting the card of ingestion job: {exception}")
+            return None
         
     def update_card_details(self, card_id:str, updates:dict):
         """
@@ -168,6 +294,39 @@ class KnowledgeCardDao:
             print(f"Error getting cards: {exception}")
             return []
         
+    def get_card_vectors(self, user_id: str, model_id: str = None):
+        """
+        Usage: Embeddings of a user's cards for clustering, without the rest of the documents
+        Parameter: user_id: The user ID to get vectors for,
+            model_id: Only the vectors of this embedding model, cards stored without one count as HF_MODEL_ID
+        Returns: List of {_id, embedded_vector, tags} for the cards that have an embedding
+        """
+        try:
+            match = {"user_id": ObjectId(user_id), "embedded_vector": {"$nin": [None, []]}}
+            if model_id:
+                match["embedding_model"] = {"$in": [model_id, None]} if model_id == Config.HF_MODEL_ID else model_id
+            cards = self.knowledge_cards_collection.find(match, {"embedded_vector": 1, "tags": 1})
+            return list(cards)
+        except Exception as exception:
+            print(f"Error getting card vectors: {exception}")
+            return []
+
+    def get_card_texts(self, user_id: str):
+        """
+        Usage: The searchable fields of all cards of a user, for building the keyword index
+        Parameter: user_id: The user ID to get cards for
+        Returns: List of {_id, title, tags, category, summary}
+        """
+        try:
+            cards = self.knowledge_cards_collection.find(
+                {"user_id": ObjectId(user_id)},
+                {"title": 1, "tags": 1, "category": 1, "summary": 1}
+            )
+            return list(cards)
+        except Exception as exception:
+            print(f"Error getting card texts: {exception}")
+            return []
+
     def get_card_by_id(self, card_id: str):
         """
         Usage: Get a knowledge card by ID
@@ -183,6 +342,26 @@ class KnowledgeCardDao:
             print(f"Error getting card: {exception}")
             return None
         
+    def get_cards_by_ids(self, card_ids: list, viewer_id: str = None):
+        """
+        Usage: Get several cards in the list view with a single $in query, in the order of card_ids.
+        Parameters: card_ids (list): The IDs of the cards, viewer_id (str): The user looking at the list.
+        Returns: tuple: (list of KnowledgeCardListItem, list of the ids that no longer exist)
+        """
+        try:
+            object_ids = [ObjectId(card_id) for card_id in card_ids if ObjectId.is_valid(card_id)]
+            cards = self.knowledge_cards_collection.aggregate([
+                {"$match": {"_id": {"$in": object_ids}}},
+                {"$project": list_view_projection(viewer_id)}
+            ])
+            cards_by_id = {str(card["_id"]): card for card in cards}
+            found = [to_knowledge_card_list_item(cards_by_id[card_id]) for card_id in card_ids if card_id in cards_by_id]
+            missing = [card_id for card_id in card_ids if card_id not in cards_by_id]
+            return found, missing
+        except Exception as exception:
+            print(f"Error getting cards by ids: {exception}")
+            return None, []
+
     def toggle_favourite(self, card_id: str):
         """
         Usage: Toggle the favourite status of a knowledge card.
@@ -204,6 +383,7 @@ class KnowledgeCardDao:
                 {"_id": card_id},
                 {"$set": {"favourite": new_favourite_status}}
             )
+            invalidate_dashboard(card.get("user_id"))
             return "Favourite status updated successfully."
         
         except Exception as exception:
@@ -231,6 +411,7 @@ class KnowledgeCardDao:
                 {"_id": card_id},
                 {"$set": {"archive": new_archive_status}}
             )
+            invalidate_dashboard(card.get("user_id"))
             if new_archive_status:
                 return "Card Archived"
             return "Card Unarchived"
@@ -260,6 +441,8 @@ class KnowledgeCardDao:
                 {"_id": card_id},
                 {"$set": {"public": new_public_status}}
             )
+            # global_bookmarks of every user who bookmarked the card changes too
+            invalidate_dashboard(card.get("user_id"), *card.get("bookmarked_by", []))
             return JSONResponse(status_code=200, content={"message": "Card made public" if new_public_status else "Card made private"})
         
         except Exception as exception:
@@ -276,8 +459,12 @@ class KnowledgeCardDao:
         """
         try:
             card_id = ObjectId(card_id)
-            result = self.knowledge_cards_collection.delete_one({"_id": card_id})
-            if result.deleted_count > 0:
+            deleted = self.knowledge_cards_collection.find_one_and_delete(
+                {"_id": card_id},
+                projection={"user_id": 1, "bookmarked_by": 1}
+            )
+            if deleted:
+                invalidate_dashboard(deleted.get("user_id"), *deleted.get("bookmarked_by", []))
                 return "Knowledge card deleted successfully."
             else:
                 return "Card not found."
@@ -306,13 +493,17 @@ class KnowledgeCardDao:
         
     def update_card_shared_token(self, card_id: str, token: str):
         try:
-            return self.knowledge_cards_collection.update_one(
+            card = self.knowledge_cards_collection.find_one_and_update(
                 {"_id": ObjectId(card_id)},
                 {"$set": {
                     "shared_token": token
                     }
-                }
+                },
+                projection={"user_id": 1}
             )
+            if card:
+                invalidate_dashboard(card.get("user_id"))
+            return card
         except Exception as exception:
             print(f"An error occured: {exception}")
             return "failed to generate shareable LINK"
@@ -352,55 +543,139 @@ class KnowledgeCardDao:
         except Exception as exception:
             print(f"erron finding token for sharing: {exception}")
 
-    def like_a_card(self, card_id: str, likes: int, liked_by: list):
+    def like_a_card(self, card_id: str, user_id: str):
+        """
+        Usage: Atomically add a like. The filter only matches when the user has not liked the card yet,
+            so liked_by and the likes counter move together and concurrent likes are never lost.
+        Parameters: card_id (str), user_id (str)
+        Returns: bool: True when this call added the like.
+        """
         try:
-            return self.knowledge_cards_collection.update_one(
-                {"_id": ObjectId(card_id)},
-                {"$set": {
-                    "likes": likes,
-                    "liked_by": liked_by
-                }}
+            result = self.knowledge_cards_collection.update_one(
+                {"_id": ObjectId(card_id), "public": True, "liked_by": {"$ne": user_id}},
+                {"$addToSet": {"liked_by": user_id}, "$inc": {"likes": 1}}
             )
+            return result.modified_count > 0
         except Exception as exception:
             print(f"Error while liking the Card: {exception}")
-            return None
+            return False
         
-    def unlike_a_card(self, card_id: str, likes: int, liked_by: list):
+    def unlike_a_card(self, card_id: str, user_id: str):
+        """
+        Usage: Atomically remove a like, only matches when the user currently likes the card.
+        Parameters: card_id (str), user_id (str)
+        Returns: bool: True when this call removed the like.
+        """
         try:
-            return self.knowledge_cards_collection.update_one(
-                {"_id": ObjectId(card_id)},
-                {"$set":{
-                    "likes":likes,
-                    "liked_by":liked_by
-                }}
+            result = self.knowledge_cards_collection.update_one(
+                {"_id": ObjectId(card_id), "public": True, "liked_by": user_id},
+                {"$pull": {"liked_by": user_id}, "$inc": {"likes": -1}}
             )
+            return result.modified_count > 0
         except Exception as exception:
             print(f"Error while unliking the card: {exception}")
+            return False
 
     def bookmark_a_card(self, card_id: str, user_id: str):
+        """
+        Usage: Atomically bookmark a public card, only matches when the user has not bookmarked it yet.
+        Parameters: card_id (str), user_id (str)
+        Returns: bool: True when this call added the bookmark.
+        """
         try:
-            return self.knowledge_cards_collection.update_one(
-                {"_id": ObjectId(card_id)},
+            result = self.knowledge_cards_collection.update_one(
+                {"_id": ObjectId(card_id), "public": True, "bookmarked_by": {"$ne": user_id}},
                 {"$addToSet": {
                     "bookmarked_by": user_id
                 }}
             )
+            invalidate_dashboard(user_id)
+            return result.modified_count > 0
         except Exception as exception:
             print(f"Error while bookmarking the card: {exception}")
-            return None
+            return False
         
     def unbookmark_a_card(self, card_id: str, user_id: str):
+        """
+        Usage: Atomically remove a bookmark, only matches when the user currently has the card bookmarked.
+        Parameters: card_id (str), user_id (str)
+        Returns: bool: True when this call removed the bookmark.
+        """
         try:
-            return self.knowledge_cards_collection.update_one(
-                {"_id": ObjectId(card_id)},
+            result = self.knowledge_cards_collection.update_one(
+                {"_id": ObjectId(card_id), "bookmarked_by": user_id},
                 {"$pull": {
                     "bookmarked_by": user_id
                 }}
             )
+            invalidate_dashboard(user_id)
+            return result.modified_count > 0
         except Exception as exception:
             print(f"Error while unbookmarking the card: {exception}")
-            return None
+            return False
+
+    def add_user_to_copied_by(self, card_id: str, user_id: str):
+        """
+        Usage: Atomically record that a user copied a card, only matches when the user has no copy yet.
+            Used to claim the copy before inserting it, so two concurrent copies cannot both succeed.
+        Parameters: card_id (str), user_id (str)
+        Returns: bool: True when this call added the user.
+        """
+        try:
+            result = self.knowledge_cards_collection.update_one(
+                {"_id": ObjectId(card_id), "copied_by": {"$ne": user_id}},
+                {"$addToSet": {"copied_by": user_id}}
+            )
+            return result.modified_count > 0
+        except Exception as exception:
+            print(f"Error while updating copied_by: {exception}")
+            return False
         
+    def get_engagement_state(self, card_id: str, user_id: str):
+        """
+        Usage: Whether a user currently likes/bookmarks a card, without loading the liked_by/bookmarked_by arrays.
+        Parameters: card_id (str), user_id (str)
+        Returns: dict: {public, liked, bookmarked}, or None when the card does not exist.
+        """
+        try:
+            cards = self.knowledge_cards_collection.aggregate([
+                {"$match": {"_id": ObjectId(card_id)}},
+                {"$project": {
+                    "_id": 0,
+                    "public": {"$ifNull": ["$public", False]},
+                    "liked": {"$in": [user_id, {"$ifNull": ["$liked_by", []]}]},
+                    "bookmarked": {"$in": [user_id, {"$ifNull": ["$bookmarked_by", []]}]}
+                }}
+            ])
+            return next(cards, None)
+        except Exception as exception:
+            print(f"Error getting engagement state: {exception}")
+            return None
+
+    def apply_engagement_changes(self, changes: dict):
+        """
+        Usage: Apply buffered like/bookmark changes of many cards with one unordered bulk_write.
+            Each card gets a single pipeline update that unions/removes the user ids and recomputes likes
+            from the size of liked_by, so applying the same changes twice leaves the card unchanged.
+        Parameters: changes (dict): card_id -> {"liked_by" | "bookmarked_by": (added user ids, removed user ids)}
+        Returns: int: The number of modified cards.
+        Raises: PyMongoError when the write fails, the caller keeps the changes for its next flush.
+        """
+        operations = []
+        for card_id, fields in changes.items():
+            updates = {
+                field: {"$setDifference": [{"$setUnion": [{"$ifNull": [f"${field}", []]}, added]}, removed]}
+                for field, (added, removed) in fields.items()
+            }
+            stages = [{"$set": updates}]
+            if "liked_by" in fields:
+                stages.append({"$set": {"likes": {"$size": "$liked_by"}}})
+            operations.append(UpdateOne({"_id": ObjectId(card_id)}, stages))
+        if not operations:
+            return 0
+        result = self.knowledge_cards_collection.bulk_write(operations, ordered=False)
+        return result.modified_count
+
     def add_category(self, card_id: str, category: str):
         try:
             result = self.knowledge_cards_collection.find_one_and_update(
@@ -458,37 +733,20 @@ class KnowledgeCardDao:
             return None
         
     def get_dashboard_data(self, user_id: str):
-        def serialize_doc(doc):
-            doc = dict(doc)
-            if "_id" in doc:
-                doc["_id"] = str(doc["_id"])
-                doc["user_id"] = str(doc["user_id"])
-            return doc
-        try:
-            total_cards = self.knowledge_cards_collection.count_documents({ "user_id": ObjectId(user_id) })
-            archived = self.knowledge_cards_collection.count_documents({ "user_id": ObjectId(user_id), "archive": True })
-            favourites = self.knowledge_cards_collection.count_documents({ "user_id": ObjectId(user_id), "favourite": True })
-            bookmarks = self.knowledge_cards_collection.count_documents({ "bookmarked_by": user_id })
-            global_bookmarks = self.knowledge_cards_collection.count_documents({ "public": True, "bookmarked_by": user_id })
-            shared = self.knowledge_cards_collection.count_documents({ "user_id": ObjectId(user_id), "shared_token": { "$ne": None } })
-
-            recent = self.knowledge_cards_collection.find({ "user_id": ObjectId(user_id) }).sort("created_at", -1).to_list(length=4)
-            recent = [serialize_doc(doc) for doc in recent]
-            
-            link_count = self.knowledge_cards_collection.count_documents({"user_id": ObjectId(user_id), "source_url": {"$ne": None}})
-            file_count = total_cards - link_count  # Total cards - link cards will give file cards
-
-
-            return {
-                "total_cards": total_cards,
-                "archived": archived,
-                "favourites": favourites,
-                "bookmarks": bookmarks,
-                "global_bookmarks": global_bookmarks,
-                "shared": shared,
-                "recent_cards": recent,
-                "upload_stats": {"link": link_count, "file": file_count}
-            }
+        """
+        Usage: Get the dashboard counters and recent cards of a user in a single aggregation.
+            Results are cached per user for DASHBOARD_CACHE_TTL_SECONDS and dropped by the writes that change them.
+        Parameters: user_id (str): The ID of the user.
+        Returns: dict: The dashboard data.
+        """
+        cached = dashboard_cache.get(user_id)
+        if cached is not None:
+            return cached
+        try:
+            result = next(self.knowledge_cards_collection.aggregate(dashboard_pipeline(user_id)), {})
+            dashboard = shape_dashboard(result)
+            dashboard_cache.set(user_id, dashboard)
+            return dashboard
         except Exception as exception:
             print(f"Error getting dashboard data: {exception}")
-            return None
\ No newline at end of file
+            return None
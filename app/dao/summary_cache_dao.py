@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from app.database import db_instance
+
+class SummaryCacheDao:
+    def __init__(self):
+        """
+        Initialize the SummaryCacheDao with a reference to the summary cache collection.
+        """
+        self.summary_cache_collection = db_instance.get_collection("summary_cache_collection")
+
+    def get_entry(self, key: str):
+        """
+        Usage: Get a cached ingestion result and refresh its last access time.
+        Parameters: key (str): The content key (normalized URL, video id or file hash).
+        Returns: dict: The cached entry, or None when missing or expired.
+        """
+        try:
+            now = datetime.utcnow()
+            return self.summary_cache_collection.find_one_and_update(
+                {"_id": key, "expires_at": {"$gt": now}},
+                {"$set": {"last_accessed_at": now}, "$inc": {"hits": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as exception:
+            print(f"Error reading summary cache: {exception}")
+            return None
+
+    def put_entry(self, key: str, entry: dict, ttl_seconds: int):
+        """
+        Usage: Insert or replace a cached ingestion result.
+        Parameters: key (str), entry (dict): scraped text and generated fields, ttl_seconds (int)
+        Returns: bool: True on success.
+        """
+        try:
+            now = datetime.utcnow()
+            self.summary_cache_collection.update_one(
+                {"_id": key},
+                {"$set": {
+                    **entry,
+                    "created_at": now,
+                    "last_accessed_at": now,
+                    "expires_at": now + timedelta(seconds=ttl_seconds)
+                }, "$setOnInsert": {"hits": 0}},
+                upsert=True
+            )
+            return True
+        except Exception as exception:
+            print(f"Error writing summary cache: {exception}")
+            return False
+
+    def evict_least_recently_used(self, max_entries: int):
+        """
+        Usage: Delete expired entries, then the least recently used ones above max_entries.
+        Parameters: max_entries (int): The size bound of the cache.
+        Returns: int: The number of deleted entries.
+        """
+        try:
+            deleted = self.summary_cache_collection.delete_many({"expires_at": {"$lte": datetime.utcnow()}}).deleted_count
+            overflow = self.summary_cache_collection.estimated_document_count() - max_entries
+            if overflow > 0:
+                oldest = self.summary_cache_collection.find({}, {"_id": 1}).sort("last_accessed_at", 1).limit(overflow)
+                deleted += self.summary_cache_collection.delete_many({"_id": {"$in": [doc["_id"] for doc in oldest]}}).deleted_count
+            return deleted
+        except Exception as exception:
+            print(f"Error evicting summary cache entries: {exception}")
+            return 0
@@ -95,4 +95,32 @@ class UserDAO:
         try:
             return self.users_collection.update_one({"_id": ObjectId(user_id)}, {"$pull": {"bookmarked_cards": card_id}})
         except OperationFailure as operation_failure:
-            raise DatabaseError("Couldn't remove bookmarked card.", 500) from operation_failure
\ No newline at end of file
+            raise DatabaseError("Couldn't remove bookmarked card.", 500) from operation_failure
+
+    def get_bookmarked_card_ids(self, user_id: str, skip: int = 0, limit: int = 20):
+        """
+        Usage: This function is used to fetch one page of the user's bookmarked card ids, sliced on the server
+        Params: user_id str, skip int, limit int
+        Return: list of card ids in bookmark order, None if the user does not exist
+        """
+        try:
+            user = self.users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                {"_id": 0, "bookmarked_cards": {"$slice": [skip, limit]}}
+            )
+            if user is None:
+                return None
+            return user.get("bookmarked_cards", [])
+        except OperationFailure as operation_failure:
+            raise DatabaseError("Couldn't fetch bookmarked cards.", 500) from operation_failure
+
+    def remove_card_from_all_bookmarks(self, card_id: str):
+        """
+        Usage: This function is used to drop a deleted card from the bookmarks of every user, so bookmark pages are never read with holes
+        Params: card_id str
+        Return: int number of users whose bookmarks changed
+        """
+        try:
+            return self.users_collection.update_many({"bookmarked_cards": card_id}, {"$pull": {"bookmarked_cards": card_id}}).modified_count
+        except OperationFailure as operation_failure:
+            raise DatabaseError("Couldn't remove the card from bookmarks.", 500) from operation_failure
@@ -1,5 +1,8 @@
+
 from .connection import Database
+from .async_connection import AsyncDatabase
 
 db_instance = Database()
+async_db_instance = AsyncDatabase()
 
-__all__ = ["db_instance"]
\ No newline at end of file
+__all__ = ["db_instance", "async_db_instance"]
@@ -0,0 +1,24 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.config import Config
+from app.database.connection import mongo_client_options
+
+class AsyncDatabase:
+    def __init__(self):
+        """
+        Usage: This class is used to connect to the MongoDB database with the asyncio (motor) driver
+        params: None
+        return: None
+        """
+        self.client = AsyncIOMotorClient(Config.MONGO_URI, **mongo_client_options())
+        self.db = self.client["brieffydb"]
+        self.users_collection = self.db["users_collection"]
+        self.knowledge_cards_collection = self.db["knowledge_cards_collection"]
+        self.clusters_collection = self.db["clusters_collection"]
+
+    def get_collection(self, collection_name):
+        """
+        Usage: This function is used to get the collection from the database
+        params: collection_name str
+        return: collection object
+        """
+        return self.db[collection_name]
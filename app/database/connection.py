@@ -1,6 +1,23 @@
 from pymongo import MongoClient
 from app.config import Config
 
+def mongo_client_options():
+    """
+    Usage: Connection pool, timeout and read preference options shared by the sync and async clients
+    params: None
+    return: dict of MongoClient keyword arguments
+    """
+    return {
+        "maxPoolSize": Config.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": Config.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": Config.MONGO_MAX_IDLE_TIME_MS,
+        "connectTimeoutMS": Config.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": Config.MONGO_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": Config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "readPreference": Config.MONGO_READ_PREFERENCE,
+    }
+
 class Database:
     def __init__(self):
         """
@@ -8,7 +25,7 @@ class Database:
         params: None
         return: None
         """
-        self.client = MongoClient(Config.MONGO_URI)
+        self.client = MongoClient(Config.MONGO_URI, **mongo_client_options())
         self.db = self.client["brieffydb"]
         self.users_collection = self.db["users_collection"]
         self.knowledge_cards_collection = self.db["knowledge_cards_collection"]
@@ -0,0 +1,134 @@
+"""
+Declares the indexes the DAO queries rely on and creates them idempotently at startup.
+
+    python -m app.database.indexes           # create missing indexes
+    python -m app.database.indexes --check   # create, then explain() every DAO query and fail on COLLSCAN
+"""
+import sys
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from app.database import db_instance
+
+INDEX_SPECS = {
+    "knowledge_cards_collection": [
+        # home feed, dashboard recent cards and counters, cursor pagination on (created_at, _id)
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created"),
+        IndexModel([("user_id", ASCENDING), ("favourite", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_favourite_created",
+                   partialFilterExpression={"favourite": True}),
+        IndexModel([("user_id", ASCENDING), ("archive", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_archive_created",
+                   partialFilterExpression={"archive": True}),
+        IndexModel([("public", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="public_created",
+                   partialFilterExpression={"public": True}),
+        IndexModel([("shared_token", ASCENDING)], name="shared_token", unique=True,
+                   partialFilterExpression={"shared_token": {"$type": "string"}}),
+        IndexModel([("bookmarked_by", ASCENDING)], name="bookmarked_by"),
+        IndexModel([("liked_by", ASCENDING)], name="liked_by"),
+        # one card per ingestion job, a requeued job cannot insert its card twice
+        IndexModel([("ingestion_job_id", ASCENDING)], name="ingestion_job_id", unique=True,
+                   partialFilterExpression={"ingestion_job_id": {"$type": "string"}}),
+    ],
+    "users_collection": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        # delete_card pulls the card from the bookmarks of every user
+        IndexModel([("bookmarked_cards", ASCENDING)], name="bookmarked_cards"),
+    ],
+    "clusters_collection": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "categories": [
+        IndexModel([("name", ASCENDING)], name="name"),
+        IndexModel([("created_by", ASCENDING), ("name", ASCENDING)], name="created_by_name"),
+    ],
+    "ingestion_jobs_collection": [
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+    "discovery_feed_collection": [
+        IndexModel([("score", DESCENDING), ("_id", DESCENDING)], name="score"),
+    ],
+    "summary_cache_collection": [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        IndexModel([("last_accessed_at", ASCENDING)], name="last_accessed_at"),
+    ],
+}
+
+def _sample_queries():
+    """
+    Usage: Representative filter/sort of every hot DAO query, run through explain() by check_query_plans
+    Returns: list: (name, collection, filter, sort) tuples.
+    """
+    user_id = ObjectId()
+    user_id_str = str(user_id)
+    newest_first = [("created_at", DESCENDING), ("_id", DESCENDING)]
+    return [
+        ("get_all_cards", "knowledge_cards_collection", {"user_id": user_id}, newest_first),
+        ("get_favourite_cards", "knowledge_cards_collection", {"user_id": user_id, "favourite": True}, newest_first),
+        ("get_archived_cards", "knowledge_cards_collection", {"user_id": user_id, "archive": True}, newest_first),
+        ("get_all_public_cards", "knowledge_cards_collection", {"public": True}, newest_first),
+        ("get_card_by_token", "knowledge_cards_collection", {"shared_token": "token"}, None),
+        ("get_card_by_ingestion_job", "knowledge_cards_collection", {"ingestion_job_id": "job"}, None),
+        ("dashboard bookmarks", "knowledge_cards_collection", {"bookmarked_by": user_id_str}, None),
+        ("liked by user", "knowledge_cards_collection", {"liked_by": user_id_str}, None),
+        ("find_user_by_email", "users_collection", {"email": "user@example.com"}, None),
+        ("remove_card_from_all_bookmarks", "users_collection", {"bookmarked_cards": str(ObjectId())}, None),
+        ("get_clusters_by_user", "clusters_collection", {"user_id": user_id}, None),
+        ("get_categories_for_user", "categories", {"created_by": {"$in": [user_id_str, "system"]}}, [("name", ASCENDING)]),
+        ("discovery feed page", "discovery_feed_collection", {}, [("score", DESCENDING), ("_id", DESCENDING)]),
+        ("get_queued_jobs", "ingestion_jobs_collection", {"status": "queued"}, [("created_at", ASCENDING)]),
+    ]
+
+def ensure_indexes(db=None):
+    """
+    Usage: Create every index in INDEX_SPECS, existing identical indexes are left untouched
+    Parameters: db: Database handle, defaults to the application database.
+    Returns: dict: Collection name -> list of index names.
+    """
+    db = db if db is not None else db_instance.db
+    created = {}
+    for collection_name, indexes in INDEX_SPECS.items():
+        try:
+            created[collection_name] = db[collection_name].create_indexes(indexes)
+        except OperationFailure as operation_failure:
+            # an index with the same name but different options already exists, it has to be dropped by hand
+            print(f"Could not create indexes on {collection_name}: {operation_failure}")
+            created[collection_name] = []
+    return created
+
+def _plan_stages(plan):
+    stages = [plan.get("stage")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+def check_query_plans(db=None):
+    """
+    Usage: explain() every hot DAO query and fail if any of them scans the whole collection
+    Parameters: db: Database handle, defaults to the application database.
+    Returns: dict: Query name -> list of winning plan stages.
+    Raises: RuntimeError listing the queries that use a COLLSCAN.
+    """
+    db = db if db is not None else db_instance.db
+    plans = {}
+    for name, collection_name, query, sort in _sample_queries():
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = cursor.limit(10).explain()
+        plans[name] = _plan_stages(explain["queryPlanner"]["winningPlan"])
+
+    collection_scans = [name for name, stages in plans.items() if "COLLSCAN" in stages]
+    if collection_scans:
+        raise RuntimeError(f"Queries without a usable index (COLLSCAN): {', '.join(collection_scans)}")
+    return plans
+
+
+if __name__ == "__main__":
+    print(ensure_indexes())
+    if "--check" in sys.argv:
+        for name, stages in check_query_plans().items():
+            print(f"{name}: {' <- '.join(stage for stage in stages if stage)}")
+        print("All DAO queries use an index.")
@@ -0,0 +1,30 @@
+# to change the data type of "embedded_vector" (knowledge cards) and "centroid_vector" (clusters) from arrays of doubles
+# to packed float32 BSON Binary. Documents already migrated are skipped, so the script can be re-run safely.
+from pymongo import UpdateOne
+from app.database import db_instance
+from app.utils import encode_vector
+
+BATCH_SIZE = 500
+
+def migrate_vector_field(collection_name: str, field: str):
+
+    collection = db_instance.get_collection(collection_name)
+
+    # only non-empty arrays, packed vectors are not arrays and empty ones stay []
+    documents = collection.find({f"{field}.0": {"$exists": True}}, {field: 1})
+
+    modified = 0
+    batch = []
+    for document in documents:
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": {field: encode_vector(document[field])}}))
+        if len(batch) == BATCH_SIZE:
+            modified += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        modified += collection.bulk_write(batch, ordered=False).modified_count
+
+    print(f'Migration of {collection_name}.{field} complete. Updated {modified} documents.')
+
+
+migrate_vector_field("knowledge_cards_collection", "embedded_vector")
+migrate_vector_field("clusters_collection", "centroid_vector")
@@ -1,6 +1,7 @@
 from .user_model import User
-from .knowledge_card_model import KnowledgeCard, KnowledgeCardRequest, EditKnowledgeCard, PublicKnowledgeCard, UpdateCategoryModel, AddtagModel, ChatRequest
+from .knowledge_card_model import KnowledgeCard, KnowledgeCardRequest, BulkKnowledgeCardRequest, EditKnowledgeCard, PublicKnowledgeCard, KnowledgeCardListItem, KnowledgeCardSearchResult, KnowledgeCardPage, UpdateCategoryModel, AddtagModel, ChatRequest
 from .card_cluster_model import CardCluster
+from .ingestion_job_model import IngestionJob
 
-__all__ = ["User", "KnowledgeCard", "KnowledgeCardRequest", "EditKnowledgeCard", "CardCluster", "PublicKnowledgeCard", "UpdateCategoryModel", "AddtagModel", "ChatRequest"]
+__all__ = ["User", "KnowledgeCard", "KnowledgeCardRequest", "BulkKnowledgeCardRequest", "EditKnowledgeCard", "CardCluster", "PublicKnowledgeCard", "KnowledgeCardListItem", "KnowledgeCardSearchResult", "KnowledgeCardPage", "UpdateCategoryModel", "AddtagModel", "ChatRequest", "IngestionJob"]
 
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+INGESTION_STAGES = ["fetch", "summarize", "metadata", "insert"]
+
+class IngestionJob(BaseModel):
+    job_id: str
+    user_id: str
+    source_url: Optional[str] = None
+    status: str = "queued"          # queued | running | completed | failed
+    stage: Optional[str] = None     # one of INGESTION_STAGES while running
+    progress: int = 0               # percentage of stages completed
+    card_id: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -11,6 +11,7 @@ class KnowledgeCard(BaseModel):
     note: Optional[str]
     created_at: datetime
     embedded_vector: Optional[list]
+    embedding_model: Optional[str] = None  # model that produced embedded_vector, None on cards embedded before it was recorded
     source_url: Optional[str] = None
     thumbnail:Optional[str]
     favourite: Optional[bool]
@@ -29,11 +30,46 @@ class KnowledgeCard(BaseModel):
 class PublicKnowledgeCard(KnowledgeCard):
     liked_by_me: bool = False
 
+class KnowledgeCardListItem(BaseModel):
+    """Feed/list view of a card: no vector, summary, qna, map or user id arrays, only an excerpt and the viewer's flags"""
+    card_id: str
+    user_id: str
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+    tags: Optional[list] = []
+    note: Optional[str] = None
+    created_at: Optional[datetime] = None
+    source_url: Optional[str] = None
+    thumbnail: Optional[str] = None
+    favourite: Optional[bool] = False
+    archive: Optional[bool] = False
+    category: Optional[list] = []
+    shared_token: Optional[str] = None
+    public: Optional[bool] = False
+    likes: Optional[int] = 0
+    copied_from: Optional[str] = None
+    liked_by_me: bool = False
+    bookmarked_by_me: bool = False
+
+class KnowledgeCardSearchResult(KnowledgeCardListItem):
+    """List view of a card matched by a search, with its relevance score"""
+    score: float
+
+class KnowledgeCardPage(BaseModel):
+    """One page of a cursor paginated feed, next_cursor is None on the last page"""
+    cards: list[KnowledgeCardListItem]
+    next_cursor: Optional[str] = None
+
 class KnowledgeCardRequest(BaseModel):
     token: str
     source_url: Optional[str]
     note: Optional[str]
 
+class BulkKnowledgeCardRequest(BaseModel):
+    token: str
+    source_urls: list[str]
+    note: Optional[str] = None
+
 class EditKnowledgeCard(BaseModel):
     card_id: str
     user_id: str
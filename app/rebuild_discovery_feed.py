@@ -0,0 +1,35 @@
+# to (re)build the discovery feed ranking from the knowledge cards: run once after deploying the feed,
+# and whenever the DISCOVERY_* weights or decay change. Safe to run while the app is serving traffic.
+from app.database import db_instance
+from app.dao import discovery_feed_dao
+
+BATCH_SIZE = 1000
+
+def rebuild_discovery_feed():
+
+    knowledge_cards_collection = db_instance.get_collection("knowledge_cards_collection")
+    discovery_feed_collection = db_instance.get_collection("discovery_feed_collection")
+
+    public_cards = knowledge_cards_collection.find(
+        {"public": True},
+        {"created_at": 1, "likes": 1, "bookmarked_by": 1, "copied_by": 1}
+    )
+
+    public_ids = set()
+    batch = []
+    for card in public_cards:
+        public_ids.add(card["_id"])
+        batch.append(card)
+        if len(batch) == BATCH_SIZE:
+            discovery_feed_dao.upsert_entries(batch)
+            batch = []
+    discovery_feed_dao.upsert_entries(batch)
+
+    # entries of cards that were deleted or made private
+    stale_ids = [entry["_id"] for entry in discovery_feed_collection.find({}, {"_id": 1}) if entry["_id"] not in public_ids]
+    removed = discovery_feed_collection.delete_many({"_id": {"$in": stale_ids}}).deleted_count if stale_ids else 0
+
+    print(f'Discovery feed rebuilt. {len(public_ids)} public cards ranked, {removed} stale entries removed.')
+
+
+rebuild_discovery_feed()
@@ -2,11 +2,18 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from app.models import card_cluster_model
 from app.services import card_cluster_service
+from app.utils import blocking_executor
 
 card_cluster_router = APIRouter()
 
 @card_cluster_router.get("/")
 async def get_card_clusters(user_id: str):
     """API endpoint to get all suits of the user"""
-    all_suits = card_cluster_service.get_clusters(user_id)
-    return all_suits
\ No newline at end of file
+    all_suits = await blocking_executor.run_io(card_cluster_service.get_clusters, user_id)
+    return all_suits
+
+@card_cluster_router.post("/recluster")
+async def recluster_cards(user_id: str):
+    """API endpoint to rebuild all suits of the user from scratch"""
+    message = await blocking_executor.run_io(card_cluster_service.cluster_knowledge_cards, user_id)
+    return {"message": message}
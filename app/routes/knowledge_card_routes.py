@@ -1,44 +1,78 @@
 from fastapi import APIRouter, HTTPException, Query
 from fastapi import UploadFile, File, Form
-from typing import Dict, List, Optional
-from fastapi.responses import JSONResponse
-from app.models import knowledge_card_model, KnowledgeCardRequest, EditKnowledgeCard, PublicKnowledgeCard, UpdateCategoryModel, AddtagModel, ChatRequest
-from app.services import knowledge_card_service, category_service
+from typing import Dict, List, Optional, Union
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.models import knowledge_card_model, KnowledgeCardRequest, BulkKnowledgeCardRequest, EditKnowledgeCard, PublicKnowledgeCard, KnowledgeCardListItem, KnowledgeCardSearchResult, KnowledgeCardPage, UpdateCategoryModel, AddtagModel, ChatRequest
+from app.services import knowledge_card_service, category_service, ingestion_job_service, discovery_feed_service, semantic_search_service, keyword_search_service
+from app.utils import blocking_executor
 
 knowledge_card_router = APIRouter()
 
 @knowledge_card_router.get("/")
-async def get_knowledge_card(token: str, skip: int = 0, limit: int = 4):
-    """API endpoint to get all cards of the user"""
-    all_cards = knowledge_card_service.get_all_cards(token, skip, limit)
+async def get_knowledge_card(token: str, skip: int = 0, limit: int = 4, cursor: Optional[str] = None):
+    """API endpoint to get all cards of the user. Pass cursor ("" for the first page) for keyset pagination."""
+    try:
+        all_cards = await knowledge_card_service.get_all_cards(token, skip, limit, cursor)
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
     return all_cards
 
 @knowledge_card_router.get("/favourite")
-async def get_favourite_card(token: str, skip: int = 0, limit: int = 4):
+async def get_favourite_card(token: str, skip: int = 0, limit: int = 4, cursor: Optional[str] = None):
     """API endpoint to get favourite cards of the user"""
-    favourite_cards = knowledge_card_service.get_favourite_cards(token, skip, limit)
+    try:
+        favourite_cards = await blocking_executor.run_io(knowledge_card_service.get_favourite_cards, token, skip, limit, cursor)
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
     return favourite_cards
 
 @knowledge_card_router.get("/archive")
-async def get_archive_card(token: str, skip: int = 0, limit: int = 4):
+async def get_archive_card(token: str, skip: int = 0, limit: int = 4, cursor: Optional[str] = None):
     """API endpoint to get archive cards of the user"""
-    archive_cards = knowledge_card_service.get_archive_cards(token, skip, limit)
+    try:
+        archive_cards = await blocking_executor.run_io(knowledge_card_service.get_archive_cards, token, skip, limit, cursor)
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
     return archive_cards
 
-@knowledge_card_router.get("/public", response_model=List[PublicKnowledgeCard])
-async def get_public_card(user_id: str, skip: int = 0, limit: int = 4):
+@knowledge_card_router.get("/public", response_model=Union[KnowledgeCardPage, List[KnowledgeCardListItem]])
+async def get_public_card(user_id: str, skip: int = 0, limit: int = 4, cursor: Optional[str] = None):
     """API endpoint to get all public cards"""
-    public_cards = knowledge_card_service.get_public_cards(user_id=user_id, skip=skip, limit=limit)
+    try:
+        public_cards = await blocking_executor.run_io(knowledge_card_service.get_public_cards, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
     return public_cards
 
-@knowledge_card_router.post("/")
+@knowledge_card_router.post("/", status_code=202)
 async def add_knowledge_card(knowledge_card_data:KnowledgeCardRequest):
-    """API endpoint to add a knowledge card."""    
-    new_card = knowledge_card_service.process_knowledge_card(knowledge_card_data)
+    """API endpoint to add a knowledge card. The card is built in the background, poll the returned job for progress."""    
+    job = await ingestion_job_service.submit(knowledge_card_data)
+    return job
 
-    if not new_card:
-        raise HTTPException(status_code=400, detail="Failed to process knowledge card")
-    return new_card
+@knowledge_card_router.post("/bulk", status_code=202)
+async def add_knowledge_cards_in_bulk(bulk_request: BulkKnowledgeCardRequest):
+    """API endpoint to import several links at once, one ingestion job is returned per link"""
+    return await ingestion_job_service.submit_many(bulk_request)
+
+@knowledge_card_router.get("/jobs/{job_id}")
+async def get_ingestion_job(job_id: str):
+    """API endpoint to poll the status of a knowledge card ingestion job"""
+    job = await blocking_executor.run_io(ingestion_job_service.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@knowledge_card_router.get("/jobs/{job_id}/events")
+async def stream_ingestion_job(job_id: str):
+    """API endpoint to stream the progress of a knowledge card ingestion job as server-sent events"""
+    if not await blocking_executor.run_io(ingestion_job_service.get_job, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        ingestion_job_service.stream_job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
 @knowledge_card_router.post("/upload-file")
 async def add_knowledge_card_from_file(
@@ -56,7 +90,7 @@ async def add_knowledge_card_from_file(
 @knowledge_card_router.put("/")
 async def edit_knowledge_card(details: EditKnowledgeCard):
     """API endpoint to process editing by user"""
-    edited_card = knowledge_card_service.edit_knowledge_card(details)
+    edited_card = await blocking_executor.run_io(knowledge_card_service.edit_knowledge_card, details)
     return edited_card
 
 @knowledge_card_router.get("/{card_id}/download")
@@ -77,7 +111,7 @@ async def download_card(card_id: str, format: str = Query(default="pdf")):
 async def add_remove_favourite(card_id:str):
     """API endpoint to add or remove a card from favourites"""
     try:
-        result = knowledge_card_service.toggle_favourite(card_id=card_id)
+        result = await blocking_executor.run_io(knowledge_card_service.toggle_favourite, card_id=card_id)
         return JSONResponse({"message": result})
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -86,7 +120,7 @@ async def add_remove_favourite(card_id:str):
 async def add_remove_favourite(card_id:str):
     """API endpoint to add or remove a card from archives"""
     try:
-        result = knowledge_card_service.toggle_archive(card_id=card_id)
+        result = await blocking_executor.run_io(knowledge_card_service.toggle_archive, card_id=card_id)
         return JSONResponse({"message": result})
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -95,7 +129,7 @@ async def add_remove_favourite(card_id:str):
 async def add_remove_public(card_id:str):
     """API endpoint to add or remove a card from public"""
     try:
-        result = knowledge_card_service.toggle_public(card_id=card_id)
+        result = await blocking_executor.run_io(knowledge_card_service.toggle_public, card_id=card_id)
         return result
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -104,7 +138,7 @@ async def add_remove_public(card_id:str):
 async def delete_card(card_id:str, user_id: str):
     """API endpoint to delete a card"""
     try:
-        result = knowledge_card_service.delete_card(card_id=card_id, user_id=user_id)
+        result = await blocking_executor.run_io(knowledge_card_service.delete_card, card_id=card_id, user_id=user_id)
         return JSONResponse({"message": result})
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -112,7 +146,7 @@ async def delete_card(card_id:str, user_id: str):
 @knowledge_card_router.post("/{card_id}/generate-share-link")
 async def generate_share_link(card_id: str, user_id: str):
     try:
-        result = {"share_url": knowledge_card_service.generate_share_link(card_id=card_id, user_id=user_id)}
+        result = {"share_url": await blocking_executor.run_io(knowledge_card_service.generate_share_link, card_id=card_id, user_id=user_id)}
         print(result)
         return JSONResponse(content=result, status_code=200)
     except Exception as exception:
@@ -121,14 +155,14 @@ async def generate_share_link(card_id: str, user_id: str):
 @knowledge_card_router.get("/shared/{token}")
 async def view_shared_card(token: str):
     try:
-        return knowledge_card_service.get_shared_card(token=token)
+        return await blocking_executor.run_io(knowledge_card_service.get_shared_card, token=token)
     except Exception as exception:
         raise HTTPException(status_code=400, detail= str(exception))
     
 @knowledge_card_router.put("/{card_id}/like")
 async def like_a_card(card_id: str, user_id: str):
     try:
-        result = knowledge_card_service.like_unlike_card(card_id=card_id, user_id=user_id)
+        result = await blocking_executor.run_io(knowledge_card_service.like_unlike_card, card_id=card_id, user_id=user_id)
         return {f"message: {result}"} if result else HTTPException(status_code=400, detail="Card not found or already liked")
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -136,7 +170,7 @@ async def like_a_card(card_id: str, user_id: str):
 @knowledge_card_router.post("/{card_id}/copy-card")
 async def copy_card(card_id: str, user_id: str):
     try:
-        return knowledge_card_service.copy_card(card_id=card_id, user_id=user_id)
+        return await blocking_executor.run_io(knowledge_card_service.copy_card, card_id=card_id, user_id=user_id)
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
     
@@ -144,7 +178,7 @@ async def copy_card(card_id: str, user_id: str):
 async def toggle_bookmark_card(card_id:str, user_id: str):
     """API endpoint to bookmark public card"""
     try:
-        return knowledge_card_service.toggle_bookmark_card(card_id=card_id, user_id=user_id)
+        return await blocking_executor.run_io(knowledge_card_service.toggle_bookmark_card, card_id=card_id, user_id=user_id)
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
     
@@ -153,7 +187,7 @@ async def get_bookmarked_cards(user_id: str, skip: int = 0, limit: int = 4):
     """API endpoint to get all bookmarked cards"""
     try:
         print(user_id, skip, limit)
-        return knowledge_card_service.get_bookmarked_cards(user_id=user_id, skip=skip, limit=limit)
+        return await blocking_executor.run_io(knowledge_card_service.get_bookmarked_cards, user_id=user_id, skip=skip, limit=limit)
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
 
@@ -161,7 +195,7 @@ async def get_bookmarked_cards(user_id: str, skip: int = 0, limit: int = 4):
 async def get_all_categories():
     """API endpoint to get all categories"""
     try:
-        categories = category_service.get_available_categories()
+        categories = await blocking_executor.run_io(category_service.get_available_categories)
         return {"categories": categories}
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
@@ -170,14 +204,14 @@ async def get_all_categories():
 async def get_categories_for_user(user_id: str):
     """API endpoint to get all categories for a user"""
     try:
-        categories = category_service.get_category_for_user(user_id=user_id)
+        categories = await blocking_executor.run_io(category_service.get_category_for_user, user_id=user_id)
         return {"categories": categories}
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
        
 @knowledge_card_router.put("/{card_id}/update-category")
 async def add_category(card_id: str, payload: UpdateCategoryModel):
-    updated_card =knowledge_card_service.add_category(card_id, payload.user_id, payload.categories)
+    updated_card = await blocking_executor.run_io(knowledge_card_service.add_category, card_id, payload.user_id, payload.categories)
     if updated_card:
         return updated_card
     raise HTTPException(status_code=404, detail="Card not found")
@@ -185,14 +219,14 @@ async def add_category(card_id: str, payload: UpdateCategoryModel):
 @knowledge_card_router.post("/{card_id}/remove-category")
 async def remove_category(card_id: str, payload: UpdateCategoryModel):
     print("Payload received:", payload.categories)
-    response = knowledge_card_service.remove_category(card_id,  payload.categories)
+    response = await blocking_executor.run_io(knowledge_card_service.remove_category, card_id,  payload.categories)
     return response
     
 @knowledge_card_router.post("/{card_id}/generate-qna", response_model=List[Dict[str, str]])
 async def generate_qna(card_id: str, user_id: str):
     """API endpoint to generate QnA from shared data"""
     try:
-        return knowledge_card_service.generate_qna(card_id=card_id, user_id=user_id)
+        return await blocking_executor.run_llm(knowledge_card_service.generate_qna, card_id=card_id, user_id=user_id)
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
     
@@ -202,7 +236,7 @@ async def custom_question(request: ChatRequest):
     API endpoint to answer a question based on a knowledge card's content.
     """
     try:
-        return knowledge_card_service.generate_custom_qna(
+        return await blocking_executor.run_llm(knowledge_card_service.generate_custom_qna,
             card_id=request.card_id,
             question=request.message
         )
@@ -213,24 +247,59 @@ async def custom_question(request: ChatRequest):
 async def get_knowledge_map(card_id: str):
     """API endpoint to get knowledge map of a card"""
     try:
-        return knowledge_card_service.get_knowledge_map(card_id=card_id)
+        return await blocking_executor.run_llm(knowledge_card_service.get_knowledge_map, card_id=card_id)
     except Exception as exception:
         raise HTTPException(status_code=400, detail=str(exception))
     
 @knowledge_card_router.put("/{card_id}/add-tag")
 async def add_tag(card_id: str, user_id: str, payload: AddtagModel):
-    response = knowledge_card_service.add_tag(card_id, user_id, payload.tag)
+    response = await blocking_executor.run_io(knowledge_card_service.add_tag, card_id, user_id, payload.tag)
     return response
 
 @knowledge_card_router.delete("/{card_id}/remove-tag")
 async def remove_tag(card_id: str, user_id: str, payload: AddtagModel):
-    response = knowledge_card_service.remove_tag(card_id, user_id, payload.tag)
+    response = await blocking_executor.run_io(knowledge_card_service.remove_tag, card_id, user_id, payload.tag)
     return response
 
 @knowledge_card_router.get("/dashboard")
 async def get_dashboard_data(user_id: str):
     """API endpoint to get dashboard data"""
     try:
-        return knowledge_card_service.get_dashboard_data(user_id=user_id)
+        return await knowledge_card_service.get_dashboard_data(user_id=user_id)
     except Exception as exception:
-        raise HTTPException(status_code=400, detail=str(exception))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(exception))
+
+@knowledge_card_router.get("/discover", response_model=KnowledgeCardPage)
+async def get_discovery_feed(user_id: str, limit: int = 10, cursor: Optional[str] = None):
+    """API endpoint to get the public discovery feed ranked by trending score"""
+    try:
+        return await blocking_executor.run_io(discovery_feed_service.get_feed, user_id=user_id, limit=limit, cursor=cursor)
+    except ValueError as value_error:
+        raise HTTPException(status_code=400, detail=str(value_error))
+
+@knowledge_card_router.get("/search", response_model=List[KnowledgeCardSearchResult])
+async def semantic_search(user_id: str, q: str, limit: int = 10):
+    """API endpoint to search the user's cards by meaning, best match first"""
+    try:
+        return await blocking_executor.run_io(semantic_search_service.search, user_id=user_id, query=q, limit=limit)
+    except Exception as exception:
+        raise HTTPException(status_code=503, detail=f"Search is unavailable: {exception}")
+
+@knowledge_card_router.get("/search/keyword", response_model=List[KnowledgeCardSearchResult])
+async def keyword_search(user_id: str, q: str, limit: int = 10):
+    """API endpoint to search the user's cards by keywords in title, tags, category and summary"""
+    return await blocking_executor.run_io(keyword_search_service.search, user_id=user_id, query=q, limit=limit)
+
+@knowledge_card_router.get("/search/suggest", response_model=List[str])
+async def keyword_suggest(user_id: str, q: str, limit: int = 10):
+    """API endpoint for typeahead completions of the word being typed"""
+    return await blocking_executor.run_io(keyword_search_service.suggest, user_id=user_id, prefix=q, limit=limit)
+
+# declared last so that the fixed GET paths above (/favourite, /public, /dashboard...) take precedence
+@knowledge_card_router.get("/{card_id}")
+async def get_card_detail(card_id: str, user_id: str):
+    """API endpoint to get the full document of a card, list endpoints only return the list view"""
+    card = await blocking_executor.run_io(knowledge_card_service.get_card_detail, card_id=card_id, user_id=user_id)
+    if not card:
+        raise HTTPException(status_code=404, detail="Card not found")
+    return card
@@ -1,11 +1,23 @@
 from .auth_service import AuthService
+from .summary_cache_service import SummaryCacheService
+from .engagement_buffer_service import EngagementBufferService
+from .discovery_feed_service import DiscoveryFeedService
+from .semantic_search_service import SemanticSearchService
+from .keyword_search_service import KeywordSearchService
 from .knowledge_card_service import KnowledgeCardService
 from .card_cluster_service import ClusteringServices
 from .category_services import CategoryService
+from .ingestion_job_service import IngestionJobService
 
 auth_service = AuthService()
-knowledge_card_service = KnowledgeCardService()
+summary_cache_service = SummaryCacheService()
+engagement_buffer_service = EngagementBufferService()
+discovery_feed_service = DiscoveryFeedService()
 card_cluster_service = ClusteringServices()
+semantic_search_service = SemanticSearchService()
+keyword_search_service = KeywordSearchService()
+knowledge_card_service = KnowledgeCardService()
 category_service = CategoryService()
+ingestion_job_service = IngestionJobService()
 
-__all__ =["auth_service", "knowledge_card_service", "card_cluster_service", "category_service"]
\ No newline at end of file
+__all__ =["auth_service", "summary_cache_service", "engagement_buffer_service", "discovery_feed_service", "semantic_search_service", "keyword_search_service", "knowledge_card_service", "card_cluster_service", "category_service", "ingestion_job_service"]
\ No newline at end of file
@@ -1,15 +1,19 @@
+import threading
 import numpy as np
-from sklearn.cluster import DBSCAN
-from sklearn.decomposition import PCA
 from bson import ObjectId
-from typing import List, Dict, Any, Tuple
 
+from app.config import Config
 from app.dao import knowledge_card_dao
 from app.dao import card_cluster_dao
-from app.utils import cosine_distance_matrix, generate_topic_name, clustering_module
+from app.utils import generate_topic_name, clustering_module, nearest_centroid, decode_vector, blocking_executor, embedder_for_title
 
 class ClusteringServices:
 
+    def __init__(self):
+        # users whose full recluster is queued or running, a second trigger meanwhile is dropped
+        self.reclustering = set()
+        self.lock = threading.Lock()
+
     def get_clusters(self,user_id: str):
         print(f"received user_id:{user_id}")
         all_suits = card_cluster_dao.get_clusters_by_user(user_id)
@@ -28,39 +32,26 @@ class ClusteringServices:
     @staticmethod
     def cluster_knowledge_cards(user_id: str):
         """
-        Usage: Cluster knowledge cards for a user
+        Usage: Cluster knowledge cards for a user from scratch, replacing the existing clusters
         Args:
             user_id: The user ID to cluster cards for
-            eps: DBSCAN epsilon parameter
-            min_samples: DBSCAN min_samples parameter
         Returns:
-            Tuple of (number of clusters created, status message)
+            str: status message
         """
-        # get all knowledge cards for the user
-        print("processiiiingggggggggggggggggggg")
-        cards = knowledge_card_dao.get_cards_by_user(user_id)
-        print("cards doneeeeeeeeeee")
-        min_samples = 3   #value is already defines in clustering module
-        print(len(cards))
-        if len(cards) < min_samples:   
+        min_samples = Config.CLUSTER_MIN_SAMPLES
+        # cards without an embedding cannot be placed in the vector space
+        cards = knowledge_card_dao.get_card_vectors(user_id, embedder_for_title.model_id)
+        if len(cards) < min_samples:
             return "not enough cards to perform clustering"
-        
-        # get embedded vectors from cards
-        
-        print("getting embedded vectors")
-        vectors = np.array([card["embedded_vector"] for card in cards])
-        print("vectors")
-        if vectors.size < 0:
-            return "no vectors found"
-        
-        print(vectors)
-        labels = clustering_module(vectors)
-        print("labelsssss doneeee")
+
+        vectors = np.vstack([decode_vector(card["embedded_vector"]) for card in cards])
+        labels = blocking_executor.run_cpu_sync(clustering_module, vectors, Config.CLUSTER_EPS, min_samples)
+
         # cleare existing clusters
         card_cluster_dao.clear_user_clusters(user_id)
 
-        # create clusters
-        user_id = ObjectId(user_id)
+        user_obj_id = ObjectId(user_id)
+        clusters_created = 0
         # process each cluster
         for cluster_id in set(labels):
             # skip if outlier
@@ -68,51 +59,109 @@ class ClusteringServices:
                 continue
 
             cluster_indices = np.where(labels == cluster_id)[0]
-
-            # get cards in this cluster
             cluster_cards = [cards[i] for i in cluster_indices]
-            cluster_card_ids = [card["_id"] for card in cluster_cards]
-
-            # calculate centroid
-            cluster_vectors = vectors[cluster_indices]
-            centroid = np.mean(cluster_vectors, axis=0)
-            print(centroid.shape)
-            # # Reduce to 128 dimensions (or fewer as needed)
-            # pca = PCA(n_components=384)
-            # reduced_centroid = pca.fit_transform([centroid])[0].tolist()
-            
-            # generate topic name 
-            topic_name = generate_topic_name(cluster_cards)
-            print(topic_name)
-            # create cluster document
+            centroid = np.mean(vectors[cluster_indices], axis=0)
+
             cluster_doc = {
-                "user_id":user_id,
+                "user_id": user_obj_id,
                 "centroid_vector": centroid.tolist(),
-                "knowledge_card_ids":cluster_card_ids,
-                "topic_name": topic_name
+                "knowledge_card_ids": [card["_id"] for card in cluster_cards],
+                "topic_name": generate_topic_name(cluster_cards)
             }
-            clusters_created=0
-            # insert cluster
-            card_cluster_dao.create_cluster(cluster_doc)
-            clusters_created += 1
-
-            # handling noise cards
-            noise_indices = np.where(labels == -1)[0]
-            if len(noise_indices) >= min_samples:
-                noise_cards = [cards[i] for i in noise_indices]
-                noise_card_ids = [card["_id"] for card in noise_cards]  
-                noise_vectors = vectors[noise_indices]
-                noise_centroid = np.mean(noise_vectors, axis=0)
-
-            # misc cluster
+            if card_cluster_dao.create_cluster(cluster_doc):
+                clusters_created += 1
+
+        # noise cards go to a misc cluster when there are enough of them
+        noise_indices = np.where(labels == -1)[0]
+        if len(noise_indices) >= min_samples:
             misc_cluster = {
-                "user_id":user_id,
-                "centroid_vector": noise_centroid.tolist(),
-                "knowledge_card_ids":noise_card_ids,
+                "user_id": user_obj_id,
+                "centroid_vector": np.mean(vectors[noise_indices], axis=0).tolist(),
+                "knowledge_card_ids": [cards[i]["_id"] for i in noise_indices],
                 "topic_name": "Miscellaneous"
             }
+            if card_cluster_dao.create_cluster(misc_cluster):
+                clusters_created += 1
+
+        card_cluster_dao.reset_cluster_state(user_id, len(cards))
+        return f"Created {clusters_created} new clusters"
+
+    def _drifted(self, state: dict) -> bool:
+        """
+        Usage: Decide whether incremental assignments have drifted far enough to need a full recluster
+        Parameters: state (dict): the drift counters from card_cluster_dao.get_cluster_state
+        Returns: bool
+        """
+        new_cards = state["assigned_since"] + state["unassigned_since"]
+        if new_cards < Config.CLUSTER_MIN_SAMPLES:
+            return False
+        total_cards = state["cards_at_full_recluster"] + new_cards
+        # many cards that fit no existing cluster may form a new one
+        if state["unassigned_since"] >= Config.CLUSTER_DRIFT_THRESHOLD * total_cards:
+            return True
+        # the centroids were computed on a much smaller collection
+        return new_cards >= Config.CLUSTER_GROWTH_THRESHOLD * state["cards_at_full_recluster"]
+
+    def schedule_recluster(self, user_id: str) -> bool:
+        """
+        Usage: Run a full recluster of a user's cards in the background instead of inside the request
+            or ingestion job that triggered it, at most one per user at a time. The recluster waits on
+            the cpu pool for the clustering itself, so it runs on a thread of the io pool.
+        Parameters: user_id (str)
+        Returns: bool: False when a recluster of the user is already queued or running.
+        """
+        with self.lock:
+            if user_id in self.reclustering:
+                return False
+            self.reclustering.add(user_id)
+
+        def recluster():
+            try:
+                self.cluster_knowledge_cards(user_id)
+            except Exception as exception:
+                print(f"Error reclustering cards of {user_id}: {exception}")
+            finally:
+                with self.lock:
+                    self.reclustering.discard(user_id)
+
+        try:
+            blocking_executor.submit("io", recluster)
+        except Exception as exception:
+            print(f"Error scheduling a recluster: {exception}")
+            with self.lock:
+                self.reclustering.discard(user_id)
+            return False
+        return True
+
+    def assign_card(self, user_id: str, card_id: str, vector: list):
+        """
+        Usage: Place a new card in the nearest existing cluster instead of reclustering all cards.
+            The card joins the nearest centroid when it is within CLUSTER_EPS, its vector is added to
+            the centroid sum atomically. Cards that fit no cluster are only counted, a full recluster is
+            scheduled in the background once the drift counters pass CLUSTER_DRIFT_THRESHOLD or CLUSTER_GROWTH_THRESHOLD.
+        Parameters: user_id (str), card_id (str), vector (list): the embedded vector of the card
+        Returns: str: status message
+        """
+        if not vector:
+            return "card has no embedding"
+        if Config.CLUSTERING_MODE == "full":
+            self.schedule_recluster(user_id)
+            return "recluster scheduled"
+
+        try:
+            clusters = card_cluster_dao.get_cluster_centroids(user_id)
+            # centroids built from another embedding model have another dimension
+            clusters = [cluster for cluster in clusters if len(cluster["centroid"]) == len(vector)]
+            index, distance = nearest_centroid(vector, [cluster["centroid"] for cluster in clusters])
 
-            card_cluster_dao.create_cluster(misc_cluster)
-            clusters_created += 1
+            # a cluster replaced by a recluster running meanwhile is not updated, the card counts as unassigned
+            assigned = index is not None and distance <= Config.CLUSTER_EPS and card_cluster_dao.add_card_to_cluster(clusters[index]["_id"], card_id, vector)
 
-        return "Created {clusters_created} new clusters"
\ No newline at end of file
+            state = card_cluster_dao.record_incremental_assignment(user_id, assigned)
+            if self._drifted(state):
+                self.schedule_recluster(user_id)
+                return "recluster scheduled"
+            return f"Assigned card to cluster {clusters[index]['topic_name']}" if assigned else "card left unclustered until the next recluster"
+        except Exception as exception:
+            print(f"Error assigning card to cluster: {exception}")
+            return "Failed to assign card to a cluster."
@@ -0,0 +1,67 @@
+from app.config import Config
+from app.dao import discovery_feed_dao, knowledge_card_dao
+from app.utils import encode_rank_cursor, rank_keyset_filter
+
+class DiscoveryFeedService:
+    """
+    Public discovery feed ranked by a trending score (likes, bookmarks and copies with time decay, see
+    app.dao.discovery_feed_dao.score_stage). The ranking lives in discovery_feed_collection and is updated
+    incrementally by the toggle/like/bookmark/copy/delete paths, a page is one index range read on
+    (score, _id) followed by one $in query for the cards, whatever the number of public cards.
+    app/rebuild_discovery_feed.py recomputes the whole ranking from the cards.
+    """
+
+    def __init__(self):
+        from app.services import engagement_buffer_service
+        self.engagement_buffer = engagement_buffer_service
+
+    def get_feed(self, user_id: str, limit: int = 10, cursor: str = None):
+        """
+        Usage: One page of the discovery feed with liked_by_me/bookmarked_by_me for the viewer.
+        Parameters: user_id (str): The viewer, limit (int): capped at DISCOVERY_PAGE_MAX_SIZE, cursor (str): From the previous page.
+        Returns: dict: {cards, next_cursor}
+        Raises: ValueError when the cursor is malformed.
+        """
+        after = rank_keyset_filter(cursor) if cursor else None
+        limit = max(1, min(limit, Config.DISCOVERY_PAGE_MAX_SIZE))
+
+        entries = discovery_feed_dao.get_ranked_ids(limit + 1, after)
+        page = entries[:limit]
+        cards, missing = knowledge_card_dao.get_cards_by_ids([str(entry["_id"]) for entry in page], viewer_id=user_id)
+        cards = cards or []
+
+        # entries of cards deleted or made private behind our back, drop them lazily
+        stale = missing + [card.card_id for card in cards if not card.public]
+        if stale:
+            discovery_feed_dao.remove_entries(stale)
+
+        next_cursor = encode_rank_cursor(page[-1]["score"], page[-1]["_id"]) if len(entries) > limit else None
+        return {
+            "cards": self.engagement_buffer.merge_pending([card.dict() for card in cards if card.public], user_id),
+            "next_cursor": next_cursor
+        }
+
+    def sync_card(self, card_id: str):
+        """
+        Usage: Insert or refresh the entry of a card that was made public, remove it when the card is private or gone.
+        Parameters: card_id (str)
+        """
+        card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+        if card and card.get("public", False):
+            discovery_feed_dao.upsert_entries([card])
+        else:
+            discovery_feed_dao.remove_entries([card_id])
+
+    def record_engagement(self, card_id: str, likes: int = 0, bookmarks: int = 0, copies: int = 0):
+        """
+        Usage: Move the counters of one card and recompute its score.
+        Parameters: card_id (str), likes/bookmarks/copies (int): The deltas.
+        """
+        discovery_feed_dao.adjust_counters({card_id: {"likes": likes, "bookmarks": bookmarks, "copies": copies}})
+
+    def remove_card(self, card_id: str):
+        """
+        Usage: Drop a deleted card from the feed.
+        Parameters: card_id (str)
+        """
+        discovery_feed_dao.remove_entries([card_id])
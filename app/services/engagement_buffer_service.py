@@ -0,0 +1,227 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from app.config import Config
+from app.dao import knowledge_card_dao, discovery_feed_dao
+from app.dao.knowledge_card_dao import invalidate_dashboard
+from app.utils import blocking_executor
+
+BUFFERED_FIELDS = {"like": "liked_by", "bookmark": "bookmarked_by"}
+
+class EngagementBufferService:
+    """
+    Optional write-behind buffer for likes and bookmarks on public cards (ENGAGEMENT_BUFFER_ENABLED).
+
+    A toggle only records the user's new state in memory. Every ENGAGEMENT_FLUSH_INTERVAL_SECONDS, or as soon
+    as ENGAGEMENT_FLUSH_THRESHOLD users are pending, all pending changes are written with one bulk_write that
+    touches each card once, however many users liked it in between. Reads merge the pending changes in through
+    merge_pending, so a user sees their own like immediately.
+
+    Only the card side is buffered: the hot document during a spike is the card, the bookmarked_cards list of
+    the user is still written synchronously and copies are never buffered (the copy must be claimed before
+    the new card is inserted).
+
+    Crash semantics: pending changes live only in this process. A crash or kill -9 loses at most the last
+    flush interval of likes/bookmarks on cards, a clean shutdown flushes. A failed flush keeps the changes and
+    retries them on the next one. Flushes are idempotent (set union/difference, likes recomputed from the size
+    of liked_by), so retrying a flush that partially succeeded is safe and repairs any drifted counter.
+    With several worker processes each one has its own buffer and may see another worker's toggle late,
+    the stored arrays and counters stay consistent either way.
+    """
+
+    def __init__(self):
+        self.enabled = Config.ENGAGEMENT_BUFFER_ENABLED
+        self.flush_interval = Config.ENGAGEMENT_FLUSH_INTERVAL_SECONDS
+        self.flush_threshold = Config.ENGAGEMENT_FLUSH_THRESHOLD
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        # (card_id, field, user_id) -> [lock, number of toggles holding or waiting for it]
+        self.toggle_locks = {}
+        # card_id -> field -> user_id -> (new state, state in the database when first buffered)
+        self.pending = {}
+        self.inflight = {}
+        self.pending_count = 0
+        self.flusher = None
+        self.flushes = 0
+        self.flushed_changes = 0
+
+    async def start(self):
+        """
+        Usage: Start the periodic flush task.
+        """
+        if self.enabled and self.flusher is None:
+            self.flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self):
+        """
+        Usage: Stop the periodic flush task and write what is still pending.
+        """
+        if self.flusher:
+            self.flusher.cancel()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+            self.flusher = None
+        if self.enabled:
+            await blocking_executor.run_io(self.flush)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await blocking_executor.run_io(self.flush)
+
+    def _buffered_state(self, card_id: str, field: str, user_id: str):
+        """
+        Usage: State of a user on a card as it will be once everything buffered is written.
+        Returns: bool, or None when nothing is buffered for the user.
+        """
+        for changes in (self.pending, self.inflight):
+            change = changes.get(card_id, {}).get(field, {}).get(user_id)
+            if change is not None:
+                return change[0]
+        return None
+
+    @contextmanager
+    def _toggle_lock(self, card_id: str, field: str, user_id: str):
+        """Serialize the toggles of one user on one card, toggles of other users and cards do not wait."""
+        key = (card_id, field, user_id)
+        with self.lock:
+            entry = self.toggle_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.toggle_locks[key]
+
+    def toggle(self, card_id: str, user_id: str, kind: str):
+        """
+        Usage: Buffer a like or bookmark toggle. The current state is read and the new one recorded under
+            the same per (card, user) lock, so a fast double toggle cannot read the state before the first
+            toggle recorded its change.
+        Parameters: card_id (str), user_id (str), kind (str): "like" or "bookmark"
+        Returns: bool: The user's new state, or None when the card does not exist or is not public.
+        """
+        field = BUFFERED_FIELDS[kind]
+        with self._toggle_lock(card_id, field, user_id):
+            with self.lock:
+                current = self._buffered_state(card_id, field, user_id)
+
+            if current is None:
+                # nothing buffered, so the database holds the state: a flush only empties inflight once written
+                state = knowledge_card_dao.get_engagement_state(card_id=card_id, user_id=user_id)
+                if not state or not state["public"]:
+                    return None
+                current = state["liked" if kind == "like" else "bookmarked"]
+
+            with self.lock:
+                users = self.pending.setdefault(card_id, {}).setdefault(field, {})
+                if user_id in users:
+                    original = users[user_id][1]
+                else:
+                    original = current
+                    self.pending_count += 1
+                users[user_id] = (not current, original)
+                should_flush = self.pending_count >= self.flush_threshold
+
+        if kind == "bookmark":
+            invalidate_dashboard(user_id)
+        if should_flush:
+            self.flush()
+        return not current
+
+    def flush(self):
+        """
+        Usage: Write every pending change with a single bulk_write.
+        Returns: int: The number of modified cards.
+        """
+        with self.flush_lock:
+            with self.lock:
+                if not self.pending:
+                    return 0
+                self.inflight, self.pending = self.pending, {}
+                self.pending_count = 0
+
+            changes = {}
+            for card_id, fields in self.inflight.items():
+                for field, users in fields.items():
+                    added = [user_id for user_id, (state, original) in users.items() if state and not original]
+                    removed = [user_id for user_id, (state, original) in users.items() if not state and original]
+                    if added or removed:
+                        changes.setdefault(card_id, {})[field] = (added, removed)
+
+            try:
+                modified = knowledge_card_dao.apply_engagement_changes(changes)
+            except Exception as exception:
+                print(f"Error flushing engagement buffer: {exception}")
+                with self.lock:
+                    self._requeue_inflight()
+                return 0
+
+            # a dashboard cached between the toggle and this write was read without the change
+            invalidate_dashboard(*{user_id for fields in changes.values() for added, removed in fields.values() for user_id in added + removed})
+
+            # keep the trending score of the discovery feed in step with the flushed likes/bookmarks
+            discovery_feed_dao.adjust_counters({
+                card_id: {
+                    "likes" if field == "liked_by" else "bookmarks": len(added) - len(removed)
+                    for field, (added, removed) in fields.items()
+                }
+                for card_id, fields in changes.items()
+            })
+
+            with self.lock:
+                self.inflight = {}
+                self.flushes += 1
+                self.flushed_changes += sum(len(added) + len(removed) for fields in changes.values() for added, removed in fields.values())
+            return modified
+
+    def _requeue_inflight(self):
+        # toggles that arrived during the failed flush are newer, they win over the in-flight state
+        for card_id, fields in self.inflight.items():
+            for field, users in fields.items():
+                pending_users = self.pending.setdefault(card_id, {}).setdefault(field, {})
+                for user_id, change in users.items():
+                    if user_id in pending_users:
+                        pending_users[user_id] = (pending_users[user_id][0], change[1])
+                    else:
+                        pending_users[user_id] = change
+                        self.pending_count += 1
+        self.inflight = {}
+
+    def merge_pending(self, cards: list, viewer_id: str = None):
+        """
+        Usage: Apply buffered changes to cards read from the database (list view or full document dicts).
+            Adjusts likes and liked_by_me/bookmarked_by_me for the viewer.
+        Parameters: cards (list): card dicts with card_id, viewer_id (str): The user reading them.
+        Returns: list: The same cards.
+        """
+        if not self.enabled or not cards:
+            return cards
+        with self.lock:
+            for card in cards:
+                card_id = card.get("card_id")
+                for changes in (self.inflight, self.pending):
+                    fields = changes.get(card_id)
+                    if not fields:
+                        continue
+                    for field, users in fields.items():
+                        if field == "liked_by" and card.get("likes") is not None:
+                            card["likes"] += sum((1 if state else -1) for state, original in users.values() if state != original)
+                        if viewer_id in users:
+                            card["liked_by_me" if field == "liked_by" else "bookmarked_by_me"] = users[viewer_id][0]
+        return cards
+
+    def get_stats(self):
+        """
+        Usage: Buffer size and flush counters.
+        Returns: dict: {enabled, pending, flushes, flushed_changes}
+        """
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "pending": self.pending_count,
+                "flushes": self.flushes,
+                "flushed_changes": self.flushed_changes
+            }
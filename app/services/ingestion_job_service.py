@@ -0,0 +1,243 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from app.config import Config
+from app.dao import ingestion_job_dao
+from app.models import IngestionJob, KnowledgeCardRequest, BulkKnowledgeCardRequest
+from app.models.ingestion_job_model import INGESTION_STAGES
+from app.utils import decode_access_token, blocking_executor, normalize_url
+
+TERMINAL_STATUSES = ["completed", "failed"]
+
+class IngestionJobService:
+    """
+    Runs the knowledge card ingestion pipeline (fetch, summarize, metadata, insert) in the background.
+    POST /knowledge-card only records a job and returns its id, a fixed number of workers pick jobs
+    from the queue and run the blocking pipeline on the ingestion pool of the blocking executor.
+    A job only stores the user id, the link and the note, never the user's token. Workers claim a job
+    atomically (queued -> running) so several app instances can share the store, a running job keeps
+    its updated_at fresh and is requeued once it stops doing so for INGESTION_JOB_STALE_SECONDS.
+    Finished jobs expire after INGESTION_JOB_TTL_SECONDS.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or Config.INGESTION_WORKERS
+        self.queue = None
+        self.workers = []
+        self.sweeper = None
+        self.loop = None
+        self.listeners = {}
+        self.enqueued = set()
+        self.running = set()
+
+    async def start(self):
+        """
+        Usage: Start the worker pool and pick up the jobs left queued, or running on an instance that died.
+        """
+        if self.workers:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.max_workers)]
+
+        await self._recover_jobs()
+        self.sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        """
+        Usage: Cancel the workers and put the jobs they were running back in the queue for the next start.
+            The pipeline thread of an interrupted job keeps running, the card insert is keyed on the job id
+            so the requeued run returns the card of the first one instead of creating it twice.
+        """
+        interrupted = list(self.running)
+        if self.sweeper:
+            self.sweeper.cancel()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, *([self.sweeper] if self.sweeper else []), return_exceptions=True)
+        self.workers = []
+        self.sweeper = None
+        for job_id in interrupted:
+            await blocking_executor.run_io(ingestion_job_dao.update_job, job_id, {"status": "queued", "stage": None, "progress": 0})
+        self.enqueued.clear()
+
+    async def _recover_jobs(self):
+        stale_before = datetime.utcnow() - timedelta(seconds=Config.INGESTION_JOB_STALE_SECONDS)
+        requeued = await blocking_executor.run_io(ingestion_job_dao.requeue_stale_jobs, stale_before)
+        if requeued:
+            print(f"requeued {requeued} stale ingestion jobs")
+        for job in await blocking_executor.run_io(ingestion_job_dao.get_queued_jobs):
+            self._enqueue(job["job_id"])
+
+    async def _sweep(self):
+        """Periodically requeue the jobs of dead instances and pick up jobs queued by other instances."""
+        while True:
+            await asyncio.sleep(Config.INGESTION_JOB_STALE_SECONDS / 3)
+            try:
+                await self._recover_jobs()
+            except Exception as exception:
+                print(f"Error recovering ingestion jobs: {exception}")
+
+    def _enqueue(self, job_id: str):
+        if job_id not in self.enqueued and job_id not in self.running:
+            self.enqueued.add(job_id)
+            self.queue.put_nowait(job_id)
+
+    @staticmethod
+    def _expires_at():
+        return datetime.utcnow() + timedelta(seconds=Config.INGESTION_JOB_TTL_SECONDS)
+
+    async def submit(self, knowledge_card_data: KnowledgeCardRequest):
+        """
+        Usage: Record a new ingestion job and queue it for the workers.
+        Parameters: knowledge_card_data (KnowledgeCardRequest): The card request as received by the route.
+        Returns: dict: The public view of the created job.
+        """
+        decoded_token = decode_access_token(knowledge_card_data.token)
+        user_id = decoded_token.get("userId")
+        if not user_id:
+            raise HTTPException(status_code=401, detail={"message": "Invalid token"})
+
+        now = datetime.utcnow()
+        job = IngestionJob(
+            job_id=str(ObjectId()),
+            user_id=user_id,
+            source_url=knowledge_card_data.source_url,
+            created_at=now,
+            updated_at=now
+        ).dict()
+        job["note"] = knowledge_card_data.note
+
+        if not await blocking_executor.run_io(ingestion_job_dao.create_job, job):
+            raise HTTPException(status_code=500, detail={"message": "Failed to create ingestion job"})
+
+        if not self.workers:
+            await self.start()
+        self._enqueue(job["job_id"])
+        return self._public_view(job)
+
+    async def submit_many(self, bulk_request: BulkKnowledgeCardRequest):
+        """
+        Usage: Queue one ingestion job per link of a bulk import. The workers fetch them through the
+            fetch scheduler, which rate limits per domain, so a list of links from one site is fetched politely.
+        Parameters: bulk_request (BulkKnowledgeCardRequest): The token, the links and an optional note for every card.
+        Returns: list: The public views of the created jobs, one per distinct link.
+        """
+        # the same article linked twice is imported once
+        source_urls = list({normalize_url(url): url.strip() for url in bulk_request.source_urls if url and url.strip()}.values())
+        if not source_urls:
+            raise HTTPException(status_code=400, detail={"message": "No links to import"})
+        if len(source_urls) > Config.BULK_IMPORT_MAX_URLS:
+            raise HTTPException(status_code=400, detail={"message": f"At most {Config.BULK_IMPORT_MAX_URLS} links per import"})
+
+        return [
+            await self.submit(KnowledgeCardRequest(token=bulk_request.token, source_url=url, note=bulk_request.note))
+            for url in source_urls
+        ]
+
+    def get_job(self, job_id: str):
+        """
+        Usage: Get the current status of an ingestion job.
+        Parameters: job_id (str): The ID of the job.
+        Returns: dict: The public view of the job, or None if it doesn't exist.
+        """
+        job = ingestion_job_dao.get_job(job_id)
+        return self._public_view(job) if job else None
+
+    async def stream_job_events(self, job_id: str, poll_interval: float = 5.0):
+        """
+        Usage: Server-sent events stream of job progress, ends once the job completes or fails.
+            Updates are pushed by the worker as stages change, the store is re-read every
+            poll_interval seconds for jobs run by another process.
+        Parameters: job_id (str): The ID of the job.
+        Returns: async generator of SSE formatted strings.
+        """
+        listener = asyncio.Queue()
+        self.listeners.setdefault(job_id, set()).add(listener)
+        try:
+            job = await blocking_executor.run_io(self.get_job, job_id)
+            while job:
+                yield f"event: progress\ndata: {json.dumps(jsonable_encoder(job))}\n\n"
+                if job["status"] in TERMINAL_STATUSES:
+                    break
+                try:
+                    job = await asyncio.wait_for(listener.get(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    job = await blocking_executor.run_io(self.get_job, job_id)
+        finally:
+            self.listeners[job_id].discard(listener)
+            if not self.listeners[job_id]:
+                del self.listeners[job_id]
+
+    async def _worker(self):
+        from app.services import knowledge_card_service
+
+        while True:
+            job_id = await self.queue.get()
+            self.enqueued.discard(job_id)
+            try:
+                # None when the job is finished or another instance claimed it first
+                job = await blocking_executor.run_io(ingestion_job_dao.claim_job, job_id)
+                if not job:
+                    continue
+                self.running.add(job_id)
+                self._publish(job_id, self._public_view(job))
+
+                def on_stage(stage):
+                    progress = int(100 * INGESTION_STAGES.index(stage) / len(INGESTION_STAGES))
+                    self._set_job_from_thread(job_id, {"stage": stage, "progress": progress})
+
+                heartbeat = asyncio.create_task(self._heartbeat(job_id))
+                try:
+                    new_card = await blocking_executor.run_ingestion(
+                        knowledge_card_service.process_knowledge_card, job["user_id"], job.get("source_url"), job.get("note"), on_stage, job_id
+                    )
+                finally:
+                    heartbeat.cancel()
+
+                if new_card:
+                    await self._finish_job(job_id, {"status": "completed", "progress": 100, "card_id": new_card.card_id})
+                else:
+                    await self._finish_job(job_id, {"status": "failed", "error": "Failed to process knowledge card"})
+            except asyncio.CancelledError:
+                raise
+            except Exception as exception:
+                print(f"Error running ingestion job {job_id}: {exception}")
+                await self._finish_job(job_id, {"status": "failed", "error": str(exception)})
+            finally:
+                self.running.discard(job_id)
+                self.queue.task_done()
+
+    async def _heartbeat(self, job_id: str):
+        """Refresh updated_at while the pipeline runs, a long summarize stage must not look like a dead worker."""
+        while True:
+            await asyncio.sleep(Config.INGESTION_JOB_STALE_SECONDS / 3)
+            await blocking_executor.run_io(ingestion_job_dao.update_job, job_id, {})
+
+    async def _finish_job(self, job_id: str, updates: dict):
+        await self._set_job(job_id, {**updates, "expires_at": self._expires_at()})
+
+    async def _set_job(self, job_id: str, updates: dict):
+        job = await blocking_executor.run_io(self._update_job, job_id, updates)
+        self._publish(job_id, job)
+
+    def _set_job_from_thread(self, job_id: str, updates: dict):
+        job = self._update_job(job_id, updates)
+        self.loop.call_soon_threadsafe(self._publish, job_id, job)
+
+    def _update_job(self, job_id: str, updates: dict):
+        ingestion_job_dao.update_job(job_id, updates)
+        # only read the job back when someone is streaming it
+        return self.get_job(job_id) if self.listeners.get(job_id) else None
+
+    def _publish(self, job_id: str, job: dict):
+        if not job:
+            return
+        for listener in self.listeners.get(job_id, ()):
+            listener.put_nowait(job)
+
+    def _public_view(self, job: dict):
+        return IngestionJob(**job).dict()
@@ -0,0 +1,90 @@
+import threading
+from app.config import Config
+from app.dao import knowledge_card_dao
+from app.utils import LRUCache, KeywordIndex
+
+class KeywordSearchService:
+    """
+    Keyword search and typeahead over a user's cards: title, tags, category and the summary with its HTML stripped.
+    Each user gets an in-process KeywordIndex (BM25 over an inverted index, see app.utils.keyword_index),
+    built on the first search and kept in an LRU of KEYWORD_INDEX_MAX_USERS users. The insert, edit,
+    tag, category and delete paths update the cached index of the owner in place.
+    """
+
+    def __init__(self):
+        self.indexes = LRUCache(max_size=Config.KEYWORD_INDEX_MAX_USERS)
+        self.lock = threading.Lock()
+
+    def _load(self, user_id: str):
+        index = KeywordIndex()
+        for card in knowledge_card_dao.get_card_texts(user_id):
+            index.add_document(str(card["_id"]), card)
+        self.indexes.set(user_id, index)
+        return index
+
+    def _get_index(self, user_id: str):
+        index = self.indexes.get(user_id)
+        if index is None:
+            with self.lock:
+                # an empty index is falsy, compare with None
+                index = self.indexes.get(user_id)
+                if index is None:
+                    index = self._load(user_id)
+        return index
+
+    def index_card(self, user_id: str, card_id: str, card: dict):
+        """
+        Usage: Add or replace a card in the cached index of its owner, users without one build it on their next search.
+        Parameters: user_id (str), card_id (str), card (dict): The card with title/tags/category/summary.
+        """
+        index = self.indexes.get(user_id)
+        if index is not None:
+            index.add_document(card_id, card)
+
+    def refresh_card(self, card_id: str):
+        """
+        Usage: Re-index a card after an update, reading its current version from the database.
+        Parameters: card_id (str)
+        """
+        card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+        if card:
+            self.index_card(str(card["user_id"]), card_id, card)
+
+    def remove_card(self, user_id: str, card_id: str):
+        index = self.indexes.get(user_id)
+        if index is not None:
+            index.remove_document(card_id)
+
+    def search(self, user_id: str, query: str, limit: int = 10):
+        """
+        Usage: Search a user's cards by keywords, the last word also matches as a prefix.
+        Parameters: user_id (str), query (str), limit (int): capped at SEARCH_MAX_RESULTS.
+        Returns: list: The matching cards in the list view with their BM25 score, best first.
+        """
+        limit = max(1, min(limit, Config.SEARCH_MAX_RESULTS))
+        ranked = self._get_index(user_id).search(query or "", limit)
+        if not ranked:
+            return []
+
+        cards, missing = knowledge_card_dao.get_cards_by_ids([card_id for card_id, _ in ranked], viewer_id=user_id)
+        for card_id in missing:
+            self.remove_card(user_id, card_id)
+
+        scores = dict(ranked)
+        return [{**card.dict(), "score": scores[card.card_id]} for card in cards or []]
+
+    def suggest(self, user_id: str, prefix: str, limit: int = 10):
+        """
+        Usage: Typeahead completions of the word being typed, from the user's own cards.
+        Parameters: user_id (str), prefix (str), limit (int)
+        Returns: list: The completed terms, most frequent first.
+        """
+        limit = max(1, min(limit, Config.SEARCH_MAX_RESULTS))
+        return self._get_index(user_id).suggest(prefix, limit)
+
+    def get_stats(self):
+        """
+        Usage: Size and hit-rate counters of the per-user keyword indexes.
+        Returns: dict
+        """
+        return self.indexes.get_stats()
@@ -6,10 +6,9 @@ from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import StreamingResponse
 import magic
-import pdfkit
-from app.utils import decode_access_token, scraper, embedder_for_title, gemini_text_processor, get_thumbnail, is_youtube_url, get_video_id, get_yt_transcript_text, pdf_docx_generator, convert_summary_to_html, extract_text_from_pdf, extract_text_from_docx
-from app.models import knowledge_card_model, KnowledgeCardRequest, KnowledgeCard
-from app.dao import knowledge_card_dao, card_cluster_dao, user_dao
+from app.utils import decode_access_token, scraper, fetch_scheduler, RateLimitedError, embedder_for_title, gemini_text_processor, get_thumbnail, is_youtube_url, get_video_id, get_yt_transcript_text, pdf_docx_generator, convert_summary_to_html, extract_text_from_pdf, extract_text_from_docx, blocking_executor, render_pdf_from_html, source_cache_key, content_hash_key, to_knowledge_card, vector_to_list, encode_cursor, decode_cursor
+from app.models import knowledge_card_model, KnowledgeCard
+from app.dao import knowledge_card_dao, card_cluster_dao, user_dao, async_knowledge_card_dao
 from fastapi.responses import JSONResponse  
 from datetime import datetime
 import io
@@ -22,156 +21,184 @@ from html2docx import html2docx
 class KnowledgeCardService:
 
     def __init__(self):
-        from app.services import CategoryService 
+        from app.services import CategoryService, summary_cache_service, engagement_buffer_service, discovery_feed_service, card_cluster_service, semantic_search_service, keyword_search_service
         self.category_service = CategoryService()
+        self.summary_cache = summary_cache_service
+        self.engagement_buffer = engagement_buffer_service
+        self.discovery_feed = discovery_feed_service
+        self.clustering = card_cluster_service
+        self.semantic_search = semantic_search_service
+        self.keyword_search = keyword_search_service
+
+    def _cursor_page(self, cards: list, limit: int, viewer_id: str):
+        """
+        Usage: Build a cursor page from limit + 1 fetched cards, the extra card only tells whether a next page exists.
+        Parameters: cards (list): KnowledgeCardListItem fetched with limit + 1, limit (int): The page size,
+            viewer_id (str): The user reading the page, for buffered likes/bookmarks.
+        Returns: dict: {cards, next_cursor}
+        """
+        cards = cards or []
+        page = cards[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].card_id) if len(cards) > limit else None
+        return {"cards": self.engagement_buffer.merge_pending([card.dict() for card in page], viewer_id), "next_cursor": next_cursor}
 
-    def get_all_cards(self, token: str, skip: int = 0, limit: int = 4):
+    async def get_all_cards(self, token: str, skip: int = 0, limit: int = 4, cursor: str = None):
         """
-        Usage: Retrieve all knowledge cards for a specific user.
+        Usage: Retrieve all knowledge cards for a specific user, read with the async DAO on the event loop.
+            When cursor is given ("" for the first page) the feed is keyset paginated and skip is ignored.
         Parameters: token (str): The access token of the user whose cards are to be retrieved.
-        Returns: list: A list of knowledge cards.
+        Returns: list: A list of knowledge cards, or dict: {cards, next_cursor} in cursor mode.
+        Raises: ValueError when the cursor is malformed.
         """
+        if cursor:
+            decode_cursor(cursor)
         try:
             decoded_token = decode_access_token(token)
             user_id = decoded_token["userId"]
 
-            all_cards = knowledge_card_dao.get_all_cards(user_id, skip, limit)
+            if cursor is not None:
+                return self._cursor_page(await async_knowledge_card_dao.get_all_cards(user_id, limit=limit + 1, cursor=cursor or None), limit, user_id)
 
-            result = []
-            for card in all_cards:
-                if card.archive is False:
-                    card_dist = card.dict()
-                    card_dist["liked_by_me"] = user_id in (card_dist.get("liked_by") or [])
-                    result.append(card_dist)
-            
-            return result  
+            # archived cards are filtered in the query so pages are never short
+            all_cards = await async_knowledge_card_dao.get_all_cards(user_id, skip, limit)
+
+            return self.engagement_buffer.merge_pending([card.dict() for card in all_cards], user_id) if all_cards else []
 
         except Exception as exception:
             print(f"Error getting knowledge cards: {exception}")
             return []
             
-    def get_favourite_cards(self, token:str, skip: int = 0, limit: int = 4):
+    def get_favourite_cards(self, token:str, skip: int = 0, limit: int = 4, cursor: str = None):
         """
         Usage: Retrieve favourite knowledge cards for a specific user.
         Parameters: token (str): The access token of the user whose cards are to be retrieved.
-        Returns: list: A list of favourite knowledge cards.
+        Returns: list: A list of favourite knowledge cards, or dict: {cards, next_cursor} in cursor mode.
+        Raises: ValueError when the cursor is malformed.
         """
+        if cursor:
+            decode_cursor(cursor)
         try:
             decoded_token = decode_access_token(token)
             user_id = decoded_token["userId"]
 
+            if cursor is not None:
+                return self._cursor_page(knowledge_card_dao.get_favourite_cards(user_id, limit=limit + 1, cursor=cursor or None), limit, user_id)
+
             cards = knowledge_card_dao.get_favourite_cards(user_id, skip, limit)
               
-            return [card.dict() for card in cards if card.favourite is True] if cards else []
+            return self.engagement_buffer.merge_pending([card.dict() for card in cards if card.favourite is True], user_id) if cards else []
 
         except Exception as exception:
             print(f"Error getting favourite knowledge cards: {exception}")
             return None
         
-    def get_archive_cards(self, token:str, skip: int =0, limit: int = 4):
+    def get_archive_cards(self, token:str, skip: int =0, limit: int = 4, cursor: str = None):
         """
         Usage: Retrieve archive knowledge cards for a specific user.
         Parameters: token (str): The access token of the user whose cards are to be retrieved.
-        Returns: list: A list of archive knowledge cards.
+        Returns: list: A list of archive knowledge cards, or dict: {cards, next_cursor} in cursor mode.
+        Raises: ValueError when the cursor is malformed.
         """
+        if cursor:
+            decode_cursor(cursor)
         try:
             decoded_token = decode_access_token(token)
             user_id = decoded_token["userId"]
 
+            if cursor is not None:
+                return self._cursor_page(knowledge_card_dao.get_archived_cards(user_id, limit=limit + 1, cursor=cursor or None), limit, user_id)
+
             cards = knowledge_card_dao.get_archived_cards(user_id, skip, limit)
               
-            return [card.dict() for card in cards if card.archive is True] if cards else []
+            return self.engagement_buffer.merge_pending([card.dict() for card in cards if card.archive is True], user_id) if cards else []
 
         except Exception as exception:
             print(f"Error getting archive knowledge cards: {exception}")
             return None
         
-    def get_public_cards(self, user_id: str, skip: int = 0, limit: int = 4):
+    def get_public_cards(self, user_id: str, skip: int = 0, limit: int = 4, cursor: str = None):
         """
         Usage: Retrieve archive knowledge cards for a specific user.
         Parameters: token (str): The access token of the user whose cards are to be retrieved.
-        Returns: list: A list of public knowledge cards.
+        Returns: list: A list of public knowledge cards, or dict: {cards, next_cursor} in cursor mode.
+        Raises: ValueError when the cursor is malformed.
         """
+        if cursor:
+            decode_cursor(cursor)
         try:
-            cards = knowledge_card_dao.get_all_public_cards(skip, limit)
+            if cursor is not None:
+                return self._cursor_page(knowledge_card_dao.get_all_public_cards(limit=limit + 1, viewer_id=user_id, cursor=cursor or None), limit, user_id)
+
+            cards = knowledge_card_dao.get_all_public_cards(skip, limit, viewer_id=user_id)
               
-            result = []
-            for card in cards:
-                card_dist = card.dict()
-                card_dist["liked_by_me"] = user_id in (card_dist.get("liked_by") or [])
-                card_dist["bookmarked_by_me"] = user_id in (card_dist.get("bookmarked_by") or [])
-                result.append(card_dist)
-            
-            return result
+            return self.engagement_buffer.merge_pending([card.dict() for card in cards], user_id)
 
         except Exception as exception:
             print(f"Error getting public knowledge cards: {exception}")
             return []
         
-    def process_knowledge_card(self, knowledge_card_data: KnowledgeCardRequest):
+    def _embed_title(self, title: str):
+        """
+        Usage: Embed the title of a new card, a failing embedding backend never fails the ingestion.
+        Parameters: title (str)
+        Returns: list: The embedding, or [] when it could not be computed.
+        """
+        try:
+            return embedder_for_title.embed_text(title) if title else []
+        except Exception as exception:
+            print(f"Error embedding the title: {exception}")
+            return []
+
+    def _index_new_card(self, user_id: str, new_card, embedding: list):
+        """
+        Usage: Add a freshly inserted card to the keyword and semantic search indexes and to a cluster.
+        Parameters: user_id (str), new_card (KnowledgeCard): As returned by insert_knowledge_card, embedding (list)
+        """
+        self.keyword_search.index_card(user_id, new_card.card_id, new_card.dict())
+        if embedding:
+            self.semantic_search.add_card(user_id, new_card.card_id, embedding)
+            self.clustering.assign_card(user_id, new_card.card_id, embedding)
+
+    def process_knowledge_card(self, user_id: str, source_url: str, note: str = None, on_stage=None, job_id: str = None):
         """
         Usage:Scrape content, get title, summarize, generate tags, embedd the title and store the knowledge card.
         Parameters:
-            user_id (str): The ID of the user who owns this knowledge card
+            user_id (str): The ID of the user who owns this knowledge card, already taken from their token
             source_url (str): The URL of the source content
             note (str): Additional notes about the content
+            on_stage (callable): Optional callback called with "fetch", "summarize", "metadata" and "insert" as the pipeline progresses
+            job_id (str): The ingestion job running the pipeline, a job that runs again after being requeued
+                returns the card of its earlier run instead of inserting a second one
         Returns:
             str: The ID of the inserted knowledge card
         """
+        report_stage = on_stage or (lambda stage: None)
         try:
-            decoded_token = decode_access_token(knowledge_card_data.token)
-            
-            user_id = decoded_token["userId"]
-            if (knowledge_card_data.note == ""):
+            if job_id:
+                existing_card = knowledge_card_dao.get_card_by_ingestion_job(job_id)
+                if existing_card:
+                    return existing_card
+
+            if not note:
                 note = "No Note Yet"
-            else:
-                note = knowledge_card_data.note
-            source_url = knowledge_card_data.source_url
 
             if source_url:
-                if is_youtube_url(source_url):
-                    content = get_yt_transcript_text(source_url)
-                    print("transcript done")
-                    print(content)
-
-                    # If transcript failed, is empty, stop
-                    if not content or "Transcript not available" in content or len(content.split()) < 10:
-                        raise ValueError("Transcript is missing, too short, or not usable for this YouTube video.")
-                    
-                    # English check using common English words
-                    common_words = ["the", "is", "and", "of", "in", "to"]
-                    if not any(word in content.lower() for word in common_words):
-                        raise ValueError("Transcript does not appear to be in English.")
-
-                    chunks = scraper.split_content(content)
-                else:
-                    # Scrape content from the given URL
-                    content = scraper.scrape_web(source_url)
-                    if not content:
-                        return None  
-                    # Extract and clean body content
-                    body_content = scraper.extract_body_content(content)
-                    print("body done")
-                    cleaned_content = scraper.clean_body_content(body_content)
-                    print("cleaned done")
-                    print(cleaned_content)
-                    chunks = scraper.split_content(cleaned_content)
-                    
-                summary = gemini_text_processor.summarize_text(chunks)
-                print("summary generated....")
-                # Extract title and process text
-                title = gemini_text_processor.get_title(summary)
-                print("title done")
-                # extract tags from suummary
-                tags = gemini_text_processor.generate_tags(summary)
-                print("tags done", tags)
-                categories = []
-                category = gemini_text_processor.generate_category(summary)
-                categories.append(category)
-                print("category done: ", category)
-                # embedding = embedder_for_title.embed_text(title)
-                embedding = []
-                print("embedding done")
+                # repeat ingestions of the same link are served from the summary cache
+                cache_key = source_cache_key(source_url)
+                ingested = self.summary_cache.get(cache_key)
+                if not ingested:
+                    ingested = self._ingest_source(source_url, report_stage)
+                    if not ingested:
+                        return None
+                    self.summary_cache.put(cache_key, ingested)
+
+                summary = ingested["summary"]
+                title = ingested["title"]
+                tags = ingested["tags"]
+                category = ingested["category"]
+                categories = [category]
+                thumbnail = ingested["icon"]
+                embedding = self._embed_title(title)
                 
             else:
                 title="Untitled"
@@ -179,13 +206,14 @@ class KnowledgeCardService:
                 tags=[]
                 embedding=[]
                 source_url=""
-                category=[]
+                categories=[]
+                thumbnail = get_thumbnail(category="Misc")
 
-            thumbnail = gemini_text_processor.get_icon(category=category)
             markup_summary = convert_summary_to_html(summary_text=summary)
             created_at=datetime.utcnow().isoformat()
             
             # insert the data 
+            report_stage("insert")
             card = KnowledgeCard(user_id=user_id,
                                  title=title,
                                  summary=markup_summary,
@@ -193,23 +221,85 @@ class KnowledgeCardService:
                                  note=note,
                                  created_at=created_at,
                                  embedded_vector=embedding,
+                                 embedding_model=embedder_for_title.model_id if embedding else None,
                                  source_url=source_url,
                                  thumbnail=thumbnail,
                                  favourite=False,
                                  archive=False,
                                  category=categories)
             
-            new_card = knowledge_card_dao.insert_knowledge_card(card=card)
-
-            # clustering = ClusteringServices.cluster_knowledge_cards(user_id)
-            # print("proceeding for clustering")
+            new_card = knowledge_card_dao.insert_knowledge_card(card=card, ingestion_job_id=job_id)
+            if new_card:
+                self._index_new_card(user_id, new_card, embedding)
+            elif job_id:
+                # the interrupted run of this job inserted the card meanwhile, it also indexed it
+                return knowledge_card_dao.get_card_by_ingestion_job(job_id)
             
             return new_card
 
+        except RateLimitedError:
+            # the job reports it, the user can retry later
+            raise
         except Exception as exception:
             print(f"Error processing knowledge card: {exception}")
             return None
         
+    def _ingest_source(self, source_url: str, report_stage):
+        """
+        Usage: Fetch the content of a URL or YouTube video, summarize it and generate its metadata.
+        Parameters:
+            source_url (str): The URL of the source content
+            report_stage (callable): Called with the name of each pipeline stage
+        Returns:
+            dict: {"content", "summary", "title", "tags", "category", "icon"} or None if the page could not be scraped
+        """
+        report_stage("fetch")
+        if is_youtube_url(source_url):
+            content = get_yt_transcript_text(source_url)
+            print("transcript done")
+            print(content)
+
+            # If transcript failed, is empty, stop
+            if not content or "Transcript not available" in content or len(content.split()) < 10:
+                raise ValueError("Transcript is missing, too short, or not usable for this YouTube video.")
+            
+            # English check using common English words
+            common_words = ["the", "is", "and", "of", "in", "to"]
+            if not any(word in content.lower() for word in common_words):
+                raise ValueError("Transcript does not appear to be in English.")
+
+        else:
+            # Fetch the page, plain HTTP first and the browser only when needed
+            html = fetch_scheduler.fetch(source_url)
+            if not html:
+                return None  
+            # Extract the main content, boilerplate is dropped before chunking
+            content = scraper.extract_main_content(html)
+
+        return self._summarize_content(content, report_stage)
+
+    def _summarize_content(self, content: str, report_stage=None):
+        """
+        Usage: Summarize extracted text and generate its title, tags, category and icon.
+        Parameters:
+            content (str): The scraped, transcribed or extracted text
+            report_stage (callable): Optional, called with the name of each pipeline stage
+        Returns:
+            dict: {"content", "summary", "title", "tags", "category", "icon"}
+        """
+        report_stage = report_stage or (lambda stage: None)
+        chunks = scraper.split_content(content)
+
+        report_stage("summarize")
+        summary = gemini_text_processor.summarize_text(chunks)
+        print("summary generated....")
+        # title, tags, category and icon in a single request
+        report_stage("metadata")
+        metadata = gemini_text_processor.generate_card_metadata(summary)
+        print("metadata done: ", metadata)
+
+        return {"content": content, "summary": summary, **metadata}
+        
     async def process_file_for_kc(self, token: str, file: UploadFile, note: str = ""):
         try:
             decoded_token = decode_access_token(token)
@@ -234,50 +324,67 @@ class KnowledgeCardService:
             if suffix != expected_suffix:
                 suffix = expected_suffix  # Correct it to match MIME type
 
-            # Write to a temp file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{suffix}") as temp:
-                temp.write(content)
-                temp_path = temp.name
-
-            # Extract text
-            if suffix == "pdf":
-                text = extract_text_from_pdf(temp_path)
-            elif suffix == "docx":
-                text = extract_text_from_docx(temp_path)
-
-            os.remove(temp_path)
-
-            # Text processing
-            chunks = scraper.split_content(text)
-            summary = gemini_text_processor.summarize_text(chunks)
-            title = gemini_text_processor.get_title(summary)
-            tags = gemini_text_processor.generate_tags(summary)
-            category = [gemini_text_processor.generate_category(summary)]
-            markup_summary = convert_summary_to_html(summary)
-            created_at = datetime.utcnow().isoformat()
-            final_note = note if note else "No Note Yet"
-            thumbnail = get_thumbnail(category=category[0])
-
-            card = KnowledgeCard(
-                user_id=user_id,
-                title=title,
-                summary=markup_summary,
-                tags=tags,
-                note=final_note,
-                created_at=created_at,
-                embedded_vector=[],
-                source_url=None,
-                thumbnail=thumbnail,
-                favourite=False,
-                archive=False,
-                category=category
-            )
-
-            return knowledge_card_dao.insert_knowledge_card(card)
+            # identical uploads are served from the summary cache
+            cache_key = content_hash_key(content)
+            ingested = await blocking_executor.run_io(self.summary_cache.get, cache_key)
+            if not ingested:
+                # Write to a temp file
+                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{suffix}") as temp:
+                    temp.write(content)
+                    temp_path = temp.name
+
+                # Extract text (CPU bound, runs in the process pool)
+                try:
+                    if suffix == "pdf":
+                        text = await blocking_executor.run_cpu(extract_text_from_pdf, temp_path)
+                    elif suffix == "docx":
+                        text = await blocking_executor.run_cpu(extract_text_from_docx, temp_path)
+                finally:
+                    os.remove(temp_path)
+
+                # Text processing (Gemini, runs in the llm thread pool)
+                ingested = await blocking_executor.run_llm(self._summarize_content, text)
+                await blocking_executor.run_io(self.summary_cache.put, cache_key, ingested)
+
+            return await blocking_executor.run_io(self._insert_file_card, user_id=user_id, ingested=ingested, note=note)
 
+        except HTTPException as http_exc:
+            raise http_exc
         except Exception as exception:
             print(f"Error processing file card: {exception}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
+
+    def _insert_file_card(self, user_id: str, ingested: dict, note: str = ""):
+        """
+        Usage: Store the summary and metadata of an uploaded file as a knowledge card.
+        Parameters: user_id (str), ingested (dict): The output of _summarize_content, note (str): Additional notes.
+        Returns: KnowledgeCard: The inserted knowledge card.
+        """
+        markup_summary = convert_summary_to_html(ingested["summary"])
+        created_at = datetime.utcnow().isoformat()
+        final_note = note if note else "No Note Yet"
+        embedding = self._embed_title(ingested["title"])
+
+        card = KnowledgeCard(
+            user_id=user_id,
+            title=ingested["title"],
+            summary=markup_summary,
+            tags=ingested["tags"],
+            note=final_note,
+            created_at=created_at,
+            embedded_vector=embedding,
+            embedding_model=embedder_for_title.model_id if embedding else None,
+            source_url=None,
+            thumbnail=ingested["icon"],
+            favourite=False,
+            archive=False,
+            category=[ingested["category"]]
+        )
+
+        new_card = knowledge_card_dao.insert_knowledge_card(card)
+        if new_card:
+            self._index_new_card(user_id, new_card, embedding)
+        return new_card
         
     def edit_knowledge_card(self, details: knowledge_card_model):
         """
@@ -302,6 +409,7 @@ class KnowledgeCardService:
                 return "no changes updated"
 
             result = knowledge_card_dao.update_card_details(card_id=card_id ,updates=updates)
+            self.keyword_search.refresh_card(card_id)
 
             return result
 
@@ -393,7 +501,7 @@ class KnowledgeCardService:
 
     
     async def generate_card_document(self, card_id: str, file_format: str = "pdf"):
-        card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+        card = await blocking_executor.run_io(knowledge_card_dao.get_card_by_id, card_id=card_id)
 
         if not card:
             raise FileNotFoundError("Card not found")
@@ -410,10 +518,8 @@ class KnowledgeCardService:
             # Generate HTML string from card_data
             html = self._build_html_from_card(card_data)
 
-            # Use pdfkit to convert HTML to PDF (returns bytes)
-            # You can explicitly configure wkhtmltopdf if needed:
-            config = pdfkit.configuration()  # path not needed if it's in Docker PATH
-            pdf_bytes = pdfkit.from_string(html, False, configuration=config)
+            # Use pdfkit to convert HTML to PDF (returns bytes), rendering runs in the process pool
+            pdf_bytes = await blocking_executor.run_cpu(render_pdf_from_html, html)
 
             # Return as a downloadable streaming response
             return StreamingResponse(
@@ -439,9 +545,9 @@ class KnowledgeCardService:
                 detail=f"Failed to generate PDF: {str(e)}"
             )
 
-    def _generate_docx_response(self, card_data):
+    async def _generate_docx_response(self, card_data):
 
-        docx_generator = pdf_docx_generator.generate_card_docx(card_data=card_data)
+        docx_generator = await blocking_executor.run_cpu(pdf_docx_generator.generate_card_docx, card_data=card_data)
 
         return StreamingResponse(
             io.BytesIO(docx_generator),
@@ -493,6 +599,7 @@ class KnowledgeCardService:
                 return JSONResponse(status_code=400, content={"message": "You cannot make a copied card public."})
             
             result = knowledge_card_dao.toggle_public(card_id=card_id)
+            self.discovery_feed.sync_card(card_id)
             return JSONResponse(status_code=200, content={"message": "Public status toggled successfully."})
         except Exception as exception:
             print(f"Error while going public: {exception}")
@@ -515,9 +622,14 @@ class KnowledgeCardService:
                     original_card_id=copied_from,
                     user_id=user_id
                 )
+                self.discovery_feed.record_engagement(copied_from, copies=-1)
             
             result = knowledge_card_dao.delete_card(card_id=card_id)
-            # updated_clusters = card_cluster_dao.delete_card_from_cluster(card_id=card_id, user_id=user_id)
+            user_dao.remove_card_from_all_bookmarks(card_id=card_id)
+            self.discovery_feed.remove_card(card_id)
+            card_cluster_dao.delete_card_from_cluster(card_id=card_id, user_id=user_id)
+            self.semantic_search.remove_card(str(card["user_id"]), card_id)
+            self.keyword_search.remove_card(str(card["user_id"]), card_id)
             return result
 
         except Exception as exception:
@@ -535,6 +647,27 @@ class KnowledgeCardService:
         share_url = f"http://{Config.BaseURL}/knowledge-card/shared/{token}"
         return share_url
     
+    def get_card_detail(self, card_id: str, user_id: str):
+        """
+        Usage: Full document of a card, the list endpoints only return the projected list view.
+        Parameters: card_id (str): The ID of the card, user_id (str): The user opening it.
+        Returns: dict: The card with liked_by_me/bookmarked_by_me, or None when missing or not visible to the user.
+        """
+        try:
+            card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+            if not card:
+                return None
+            if str(card["user_id"]) != user_id and not card.get("public", False):
+                return None
+
+            card_dist = to_knowledge_card(card).dict()
+            card_dist["liked_by_me"] = user_id in card_dist["liked_by"]
+            card_dist["bookmarked_by_me"] = user_id in card_dist["bookmarked_by"]
+            return self.engagement_buffer.merge_pending([card_dist], user_id)[0]
+        except Exception as exception:
+            print(f"Error getting card details: {exception}")
+            return None
+
     def get_shared_card(self, token: str):
         result = knowledge_card_dao.get_card_by_token(token=token)
 
@@ -544,40 +677,27 @@ class KnowledgeCardService:
         return  result
     
     def like_unlike_card(self, card_id: str, user_id: str):
+        """
+        Usage: Toggle the user's like on a public card.
+            Both directions are conditional atomic updates, a like only applies when the user is not in
+            liked_by and an unlike only when they are, so the counter stays exact under concurrent requests.
+        Parameters: card_id (str), user_id (str)
+        Returns: dict: The result message, or None when the card does not exist or is not public.
+        """
         try:
-            card = knowledge_card_dao.get_card_by_id(card_id=card_id)
-            
-            if not card or not card.get("public", False):
-                return None  
-
-            if user_id in card.get("liked_by", []):
-                new_likes = card.get("likes", 1) - 1
-                liked_by = card.get("liked_by", [])
-                liked_by.remove(user_id)
-                updated_liked_by = liked_by
-                result = knowledge_card_dao.unlike_a_card(
-                    card_id=card_id,
-                    likes=new_likes,
-                    liked_by=updated_liked_by
-                )
-                if result:
-                    return {"message": "Card unliked successfully"}
-                else:
-                    return {"message": "Failed to unlike the card"}
-                
-            new_likes = card.get("likes", 0) + 1
-            updated_liked_by = card.get("liked_by", [])
-            updated_liked_by.append(user_id)
-
-            result = knowledge_card_dao.like_a_card(
-                card_id=card_id,
-                likes=new_likes,
-                liked_by=updated_liked_by
-            )
-            if result:
+            if self.engagement_buffer.enabled:
+                liked = self.engagement_buffer.toggle(card_id=card_id, user_id=user_id, kind="like")
+                if liked is None:
+                    return None
+                return {"message": "Card liked successfully" if liked else "Card unliked successfully"}
+
+            if knowledge_card_dao.like_a_card(card_id=card_id, user_id=user_id):
+                self.discovery_feed.record_engagement(card_id, likes=1)
                 return {"message": "Card liked successfully"}
-            else:
-                return {"message": "Failed to like the card"}
+            if knowledge_card_dao.unlike_a_card(card_id=card_id, user_id=user_id):
+                self.discovery_feed.record_engagement(card_id, likes=-1)
+                return {"message": "Card unliked successfully"}
+            return None
             
         except Exception as exception:
             print(f"error while liking the card: {exception}")
@@ -591,8 +711,11 @@ class KnowledgeCardService:
         '''
         try:
             card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+            if not card:
+                raise HTTPException(status_code=404, detail={"message": "Card not found"})
 
-            if user_id in card.get("copied_by", []):
+            # claim the copy first, a concurrent second request finds the user in copied_by and stops here
+            if not knowledge_card_dao.add_user_to_copied_by(card_id=card_id, user_id=user_id):
                 raise HTTPException(status_code=400, detail={"message": "You already have a copy of this card"})
             
                 # Extract fields from the dict
@@ -604,6 +727,8 @@ class KnowledgeCardService:
             copy_card_thumbnail = card.get("thumbnail")
             copy_card_category = card.get("category")
             created_at = datetime.utcnow()
+            # same title, same vector, no need to embed it again
+            copy_card_embedding = vector_to_list(card.get("embedded_vector"))
             
             new_card = KnowledgeCard(
                 user_id=user_id,
@@ -612,7 +737,8 @@ class KnowledgeCardService:
                 tags=copy_card_tags,
                 note=copy_card_note,
                 created_at=created_at,
-                embedded_vector=[],
+                embedded_vector=copy_card_embedding,
+                embedding_model=card.get("embedding_model"),
                 source_url=copy_card_source_url,
                 thumbnail=copy_card_thumbnail,
                 favourite=False,
@@ -622,11 +748,11 @@ class KnowledgeCardService:
             )
             
             result = knowledge_card_dao.insert_knowledge_card(card=new_card)
-                
-            copied_by = card.get("copied_by", [])
-            copied_by.append(user_id)
-            copied_by = list(set(copied_by)) # Remove duplicates
-            knowledge_card_dao.update_copied_by_list(card_id=card_id,copied_by_list=copied_by)
+            if not result:
+                knowledge_card_dao.remove_user_from_copied_by(original_card_id=card_id, user_id=user_id)
+                raise HTTPException(status_code=500, detail={"message": "Failed to copy the card"})
+            self.discovery_feed.record_engagement(card_id, copies=1)
+            self._index_new_card(user_id, result, copy_card_embedding)
                 
             return JSONResponse(status_code=200, content={"message": "Card Copied to Home"})
         
@@ -635,42 +761,38 @@ class KnowledgeCardService:
             return f"Error occurred: {str(exception)}"
         
     def toggle_bookmark_card(self, card_id: str, user_id: str):
+        """
+        Usage: Toggle the user's bookmark on a public card with conditional atomic updates, see like_unlike_card.
+        Parameters: card_id (str), user_id (str)
+        Returns: JSONResponse with the result message.
+        """
         try:
-            card = knowledge_card_dao.get_card_by_id(card_id=card_id)
             user = user_dao.get_user_by_id(user_id=user_id)
             if not user:
                 return JSONResponse(status_code=404, content={"message": "User not found"})
-            if not card or not card.get("public", False):
-                return JSONResponse(status_code=404, content={"message": "Card not found"})  
-    
-            if user_id in card.get("bookmarked_by", []):
-                print("unbookmarking")
-                update_card = knowledge_card_dao.unbookmark_a_card(
-                    card_id=card_id,
-                    user_id=user_id
-                )
-                update_user = user_dao.remove_bookmarked_card(
-                    user_id=user_id,
-                    card_id=card_id                
-                )
-                if update_card and update_user:
-                    return JSONResponse(status_code=200, content={"message": "Card unbookmarked successfully"})
-                else:
-                    return JSONResponse(status_code=400, content={"message": "Failed to unbookmark the card"})
-
-            update_card = knowledge_card_dao.bookmark_a_card(
-                card_id=card_id,
-                user_id=user_id
-            )
-            update_user = user_dao.add_bookmarked_card(
-                user_id=user_id,
-                card_id=card_id
-            )
-    
-            if update_card and update_user:
+
+            if self.engagement_buffer.enabled:
+                bookmarked = self.engagement_buffer.toggle(card_id=card_id, user_id=user_id, kind="bookmark")
+                if bookmarked is None:
+                    return JSONResponse(status_code=404, content={"message": "Card not found"})
+                if bookmarked:
+                    user_dao.add_bookmarked_card(user_id=user_id, card_id=card_id)
+                    return JSONResponse(status_code=200, content={"message": "Card bookmarked successfully"})
+                user_dao.remove_bookmarked_card(user_id=user_id, card_id=card_id)
+                return JSONResponse(status_code=200, content={"message": "Card unbookmarked successfully"})
+
+            if knowledge_card_dao.bookmark_a_card(card_id=card_id, user_id=user_id):
+                user_dao.add_bookmarked_card(user_id=user_id, card_id=card_id)
+                self.discovery_feed.record_engagement(card_id, bookmarks=1)
                 return JSONResponse(status_code=200, content={"message": "Card bookmarked successfully"})
-            else:
-                return JSONResponse(status_code=400, content={"message": "Failed to bookmark the card"})
+
+            if knowledge_card_dao.unbookmark_a_card(card_id=card_id, user_id=user_id):
+                print("unbookmarking")
+                user_dao.remove_bookmarked_card(user_id=user_id, card_id=card_id)
+                self.discovery_feed.record_engagement(card_id, bookmarks=-1)
+                return JSONResponse(status_code=200, content={"message": "Card unbookmarked successfully"})
+
+            return JSONResponse(status_code=404, content={"message": "Card not found"})
             
         except Exception as exception:
             print(f"error while bookmarking the card: {exception}")
@@ -678,38 +800,24 @@ class KnowledgeCardService:
         
     def get_bookmarked_cards(self, user_id: str, skip: int = 0, limit: int = 4):
         """
-        Usage: Get all bookmarked cards for a user.
-        Parameters: user_id (str): The ID of the user whose bookmarked cards are to be retrieved.
-        Returns: list: A list of bookmarked cards.
+        Usage: Get one page of a user's bookmarked cards, in bookmark order.
+            The page of ids is sliced on the server and the cards are loaded with a single $in query.
+            Reading never changes the bookmark list, so skip stays stable between pages: deleted cards are
+            dropped from every user's bookmarks by delete_card, an id left behind is only skipped here.
+        Parameters: user_id (str): The ID of the user, skip (int), limit (int): capped at BOOKMARKS_PAGE_MAX_SIZE.
+        Returns: list: A list of bookmarked cards in the list view.
         """
         try:
-            print("getting bookmarked cards")
-            user = user_dao.get_user_by_id(user_id=user_id)
-            if not user:
-                print("user not found")
-                return []
-            
-            bookmarked_cards = user.get("bookmarked_cards", [])
-            if not bookmarked_cards:
-                print("no bookmarked cards")
+            limit = max(1, min(limit, Config.BOOKMARKS_PAGE_MAX_SIZE))
+            card_ids = user_dao.get_bookmarked_card_ids(user_id=user_id, skip=max(skip, 0), limit=limit)
+            if not card_ids:
                 return []
-            
-            paginated_bookmarked_cards = bookmarked_cards[skip:skip + limit]
-
-            result = []
-            for card_id in paginated_bookmarked_cards:
-                card_data = knowledge_card_dao.get_card_by_id(card_id=card_id)
-                if card_data:
-                    # Normalize _id to card_id
-                    card_data["card_id"] = str(card_data["_id"])
-                    result.append(card_data)                  
-            
-            # Check if we need to fetch more cards
-            if len(paginated_bookmarked_cards) == limit:
-                # Recursively fetch the next batch of cards
-                result += self.get_bookmarked_cards(user_id, skip + limit, limit)
 
-            return jsonable_encoder(result, custom_encoder={ObjectId: str})
+            cards, _ = knowledge_card_dao.get_cards_by_ids(card_ids=card_ids, viewer_id=user_id)
+            if cards is None:
+                return None
+
+            return self.engagement_buffer.merge_pending([card.dict() for card in cards], user_id)
         
         except Exception as exception:
             print(f"Error getting bookmarked cards: {exception}")
@@ -738,6 +846,7 @@ class KnowledgeCardService:
 
             if added:
                 updated_card = knowledge_card_dao.get_card_by_id(card_id=card_id)
+                self.keyword_search.index_card(str(updated_card["user_id"]), card_id, updated_card)
                 return {
                     "status_code": 200,
                     "message": "Categories updated successfully.",
@@ -773,6 +882,8 @@ class KnowledgeCardService:
 
             if updated_categories is None:
                 raise HTTPException(status_code=500, detail="Failed to update category.")
+            if updated_categories is not existing_categories:
+                self.keyword_search.refresh_card(card_id)
 
             return {
                 "status_code": 200,
@@ -870,6 +981,7 @@ class KnowledgeCardService:
                 updated_tags = knowledge_card_dao.update_tags(card_id=card_id, tag=tag)
                 if updated_tags is None:
                     raise HTTPException(status_code=500, detail="Failed to update tags.")
+                self.keyword_search.refresh_card(card_id)
                 
                 return {"status_code": 200, "message": "Tag added successfully.", "tags": updated_tags}
             else:
@@ -899,6 +1011,7 @@ class KnowledgeCardService:
                 updated_tags = knowledge_card_dao.remove_tag(card_id=card_id, tag=tag)
                 if updated_tags is None:
                     raise HTTPException(status_code=500, detail="Failed to update tags.")
+                self.keyword_search.refresh_card(card_id)
                 
                 return {"status_code": 200, "message": "Tag removed successfully.", "tags": updated_tags}
             else:
@@ -910,14 +1023,14 @@ class KnowledgeCardService:
             print(f"Error removing tag: {e}")
             raise HTTPException(status_code=500, detail="Internal Server Error")
         
-    def get_dashboard_data(self, user_id: str):
+    async def get_dashboard_data(self, user_id: str):
         """
-        Usage: Get dashboard data for a specific user.
+        Usage: Get dashboard data for a specific user, read with the async DAO on the event loop.
         Parameters: user_id (str): The ID of the user whose dashboard data is to be retrieved.
         Returns: dict: A dictionary containing the dashboard data.
         """
         try:
-            dashboard_data = knowledge_card_dao.get_dashboard_data(user_id=user_id)
+            dashboard_data = await async_knowledge_card_dao.get_dashboard_data(user_id=user_id)
             return dashboard_data
 
         except Exception as exception:
@@ -0,0 +1,173 @@
+import threading
+import numpy as np
+from app.config import Config
+from app.dao import knowledge_card_dao
+from app.utils import LRUCache, decode_vector, embedder_for_title
+
+class SemanticSearchService:
+    """
+    Ranks a user's cards against a query by cosine similarity of the title embeddings.
+    Each user's vectors are kept as one L2-normalized float32 matrix, loaded on the first search and
+    kept in an LRU of SEARCH_INDEX_MAX_USERS users, so a query is one matrix-vector product and an
+    argpartition for the top k. Inserts and deletes patch the cached matrix instead of dropping it.
+    A user's matrix is read from Mongo under a lock of that user only, searches of other users never wait on it.
+    """
+
+    def __init__(self):
+        self.indexes = LRUCache(max_size=Config.SEARCH_INDEX_MAX_USERS)
+        self.lock = threading.Lock()
+        # user_id -> {lock, waiters, changes}: the load in progress and the inserts/deletes that arrived during it
+        self.loading = {}
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32, copy=False)
+
+    def _load(self, user_id: str):
+        """
+        Usage: Build the search matrix of a user from the stored card vectors.
+        Parameters: user_id (str)
+        Returns: dict: {card_ids: list, matrix: np.ndarray of shape (cards, dimensions)}
+        """
+        # only vectors of the model that embeds the queries are comparable with them
+        cards = knowledge_card_dao.get_card_vectors(user_id, embedder_for_title.model_id)
+        vectors = [decode_vector(card["embedded_vector"]) for card in cards]
+        dimensions = [len(vector) for vector in vectors]
+        if len(set(dimensions)) > 1:
+            # cards stored without a model id before it was recorded, keep the dimension of the majority
+            dimension = max(set(dimensions), key=dimensions.count)
+            cards, vectors = zip(*[(card, vector) for card, vector in zip(cards, vectors) if len(vector) == dimension])
+
+        return {
+            "card_ids": [str(card["_id"]) for card in cards],
+            "matrix": self._normalize(np.vstack(vectors)) if vectors else np.empty((0, 0), dtype=np.float32)
+        }
+
+    def _get_index(self, user_id: str):
+        index = self.indexes.get(user_id)
+        if index is not None:
+            return index
+
+        with self.lock:
+            loading = self.loading.setdefault(user_id, {"lock": threading.Lock(), "waiters": 0, "changes": []})
+            loading["waiters"] += 1
+        try:
+            # concurrent first searches of a user read the vectors once, other users do not wait
+            with loading["lock"]:
+                index = self.indexes.get(user_id)
+                if index is None:
+                    index = self._load(user_id)
+                    with self.lock:
+                        for change in loading["changes"]:
+                            index = change(index)
+                        loading["changes"] = []
+                        if index is not None:
+                            self.indexes.set(user_id, index)
+        finally:
+            with self.lock:
+                loading["waiters"] -= 1
+                if not loading["waiters"]:
+                    del self.loading[user_id]
+        return index if index is not None else {"card_ids": [], "matrix": np.empty((0, 0), dtype=np.float32)}
+
+    def _change_index(self, user_id: str, change):
+        """
+        Usage: Apply change (index -> new index, or None to drop it) to the cached matrix of a user,
+            or queue it for the load in progress so a card inserted while the vectors are read is not lost.
+        """
+        with self.lock:
+            index = self.indexes.get(user_id)
+            if index is None:
+                if user_id in self.loading:
+                    self.loading[user_id]["changes"].append(lambda current: change(current) if current is not None else None)
+                return
+            changed = change(index)
+            if changed is None:
+                self.indexes.delete(user_id)
+            elif changed is not index:
+                self.indexes.set(user_id, changed)
+
+    def add_card(self, user_id: str, card_id: str, vector: list):
+        """
+        Usage: Append a new card to the cached matrix of its owner, users without a cached matrix load it on their next search.
+        Parameters: user_id (str), card_id (str), vector (list): The embedding of the card.
+        """
+        if vector is None or len(vector) == 0:
+            return
+        row = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+        def add(index):
+            if card_id in index["card_ids"]:
+                return index
+            if index["matrix"].size and index["matrix"].shape[1] != row.shape[1]:
+                return None
+            # replace rather than mutate, searches running on the old matrix keep a consistent view
+            matrix = np.vstack([index["matrix"], row]) if index["matrix"].size else row
+            return {"card_ids": index["card_ids"] + [card_id], "matrix": matrix}
+
+        self._change_index(user_id, add)
+
+    def remove_card(self, user_id: str, card_id: str):
+        """
+        Usage: Drop a deleted card from the cached matrix of its owner.
+        Parameters: user_id (str), card_id (str)
+        """
+        def remove(index):
+            if card_id not in index["card_ids"]:
+                return index
+            position = index["card_ids"].index(card_id)
+            return {
+                "card_ids": index["card_ids"][:position] + index["card_ids"][position + 1:],
+                "matrix": np.delete(index["matrix"], position, axis=0)
+            }
+
+        self._change_index(user_id, remove)
+
+    def rank(self, user_id: str, query_vector, limit: int = 10):
+        """
+        Usage: Top cards of a user for an already embedded query.
+        Parameters: user_id (str), query_vector (list | np.ndarray), limit (int)
+        Returns: list: (card_id, score) tuples, best first.
+        """
+        index = self._get_index(user_id)
+        matrix = index["matrix"]
+        query = np.asarray(query_vector, dtype=np.float32)
+        if query.ndim > 1:
+            # token level output of the feature-extraction pipeline, mean pool it
+            query = query.reshape(-1, query.shape[-1]).mean(axis=0)
+        if not matrix.size or matrix.shape[1] != query.shape[0]:
+            return []
+
+        scores = matrix @ self._normalize(query)
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(index["card_ids"][position], float(scores[position])) for position in top]
+
+    def search(self, user_id: str, query: str, limit: int = 10):
+        """
+        Usage: Search a user's cards by meaning rather than keywords.
+        Parameters: user_id (str), query (str), limit (int): capped at SEARCH_MAX_RESULTS.
+        Returns: list: The matching cards in the list view with their score, best first.
+        """
+        query = (query or "").strip()
+        if not query:
+            return []
+        limit = max(1, min(limit, Config.SEARCH_MAX_RESULTS))
+
+        ranked = self.rank(user_id, embedder_for_title.embed_text(query), limit)
+        cards, missing = knowledge_card_dao.get_cards_by_ids([card_id for card_id, _ in ranked], viewer_id=user_id)
+        for card_id in missing:
+            self.remove_card(user_id, card_id)
+
+        scores = dict(ranked)
+        return [{**card.dict(), "score": scores[card.card_id]} for card in cards or []]
+
+    def get_stats(self):
+        """
+        Usage: Size and hit-rate counters of the per-user matrix cache.
+        Returns: dict
+        """
+        return self.indexes.get_stats()
@@ -0,0 +1,80 @@
+import threading
+from app.config import Config
+from app.dao import summary_cache_dao
+from app.utils import LRUCache
+
+CACHED_FIELDS = ["content", "summary", "title", "tags", "category", "icon"]
+
+class SummaryCacheService:
+    """
+    Content-addressed cache of scraped text and generated summary/title/tags/category/icon.
+    Keys come from app.utils.content_keys: normalized URL, YouTube video id or file hash.
+    A small in-process LRU sits in front of the persistent Mongo collection, both tiers
+    honour the same TTL and the collection is trimmed to SUMMARY_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self):
+        self.enabled = Config.SUMMARY_CACHE_ENABLED
+        self.ttl_seconds = Config.SUMMARY_CACHE_TTL_SECONDS
+        self.max_entries = Config.SUMMARY_CACHE_MAX_ENTRIES
+        self.memory_cache = LRUCache(max_size=Config.SUMMARY_CACHE_MEMORY_ENTRIES, ttl_seconds=self.ttl_seconds)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get(self, key: str):
+        """
+        Usage: Look up a cached ingestion result.
+        Parameters: key (str): The content key.
+        Returns: dict: The cached fields, or None on a miss.
+        """
+        if not self.enabled or not key:
+            return None
+
+        entry = self.memory_cache.get(key)
+        if entry is None:
+            document = summary_cache_dao.get_entry(key)
+            if document:
+                entry = {field: document.get(field) for field in CACHED_FIELDS}
+                self.memory_cache.set(key, entry)
+
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return dict(entry) if entry else None
+
+    def put(self, key: str, entry: dict):
+        """
+        Usage: Cache the result of a successful ingestion.
+        Parameters: key (str): The content key, entry (dict): The fields listed in CACHED_FIELDS.
+        """
+        if not self.enabled or not key or not entry.get("summary"):
+            return
+
+        entry = {field: entry.get(field) for field in CACHED_FIELDS}
+        self.memory_cache.set(key, entry)
+        summary_cache_dao.put_entry(key, entry, self.ttl_seconds)
+
+        with self.lock:
+            self.writes += 1
+            should_evict = self.writes % Config.SUMMARY_CACHE_EVICT_EVERY == 0
+        if should_evict:
+            summary_cache_dao.evict_least_recently_used(self.max_entries)
+
+    def get_stats(self):
+        """
+        Usage: Hit-rate counters of the cache.
+        Returns: dict: {hits, misses, hit_rate, writes, memory}
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "writes": self.writes,
+                "memory": self.memory_cache.get_stats()
+            }
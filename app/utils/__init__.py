@@ -1,24 +1,38 @@
 from .jwt_handler import create_access_token, decode_access_token
 from .custom_exceptions import DatabaseError, NotFoundError
 from .sraper import Scraper
+from .fetcher import TieredFetcher
+from .fetch_scheduler import FetchScheduler, RetryableFetchError, RateLimitedError
 from .ai_gemini import TextProcessingWithGemini
 from .embedder import Embedder
 from .thumbnails import get_thumbnail
 from .cosine_distance_matrix import cosine_distance_matrix
 from .topic_name_generator import generate_topic_name
-from .clustering_module import clustering_module
+from .clustering_module import clustering_module, nearest_centroid
 from .youtube_url_checker import is_youtube_url
 from .get_yt_transcript import get_video_id, get_yt_transcript_text
-from .document_generator import DocumentGenerator
-from .knowledge_card_helper import to_knowledge_card
+from .document_generator import DocumentGenerator, render_pdf_from_html
+from .vector_codec import encode_vector, decode_vector, vector_to_list
+from .keyword_index import KeywordIndex, tokenize
+from .knowledge_card_helper import to_knowledge_card, to_knowledge_card_list_item, list_view_projection
 from .mardown_converter import convert_summary_to_html
 from .extract_text_from_file import extract_text_from_pdf, extract_text_from_docx
+from .executor import BlockingExecutor
+from .lru_cache import LRUCache
+from .content_keys import normalize_url, source_cache_key, content_hash_key
+from .pagination import encode_cursor, decode_cursor, keyset_filter, NEWEST_FIRST, encode_rank_cursor, rank_keyset_filter
 
 scraper = Scraper()
+fetcher = TieredFetcher(scraper)
+fetch_scheduler = FetchScheduler(fetcher)
 embedder_for_title = Embedder()
 gemini_text_processor = TextProcessingWithGemini()
 pdf_docx_generator = DocumentGenerator()
+blocking_executor = BlockingExecutor()
 
-__all__ = ["create_access_token", "decode_access_token", "DatabaseError", "NotFoundError", "scraper","embedder_for_title","gemini_text_processor","get_thumbnail",
-           "cosine_distance_matrix", "generate_topic_name", "clustering_module", "is_youtube_url", "get_yt_transcript_text", "get_video_id", "pdf_docx_generator",
-           "to_knowledge_card", "convert_summary_to_html", "extract_text_from_pdf", "extract_text_from_docx"]
\ No newline at end of file
+__all__ = ["create_access_token", "decode_access_token", "DatabaseError", "NotFoundError", "scraper", "fetcher", "fetch_scheduler", "RetryableFetchError", "RateLimitedError","embedder_for_title","gemini_text_processor","get_thumbnail",
+           "cosine_distance_matrix", "generate_topic_name", "clustering_module", "nearest_centroid", "is_youtube_url", "get_yt_transcript_text", "get_video_id", "pdf_docx_generator",
+           "to_knowledge_card", "to_knowledge_card_list_item", "list_view_projection", "convert_summary_to_html", "extract_text_from_pdf", "extract_text_from_docx", "blocking_executor", "render_pdf_from_html",
+           "LRUCache", "normalize_url", "source_cache_key", "content_hash_key",
+           "encode_vector", "decode_vector", "vector_to_list", "KeywordIndex", "tokenize",
+           "encode_cursor", "decode_cursor", "keyset_filter", "NEWEST_FIRST", "encode_rank_cursor", "rank_keyset_filter"]
\ No newline at end of file
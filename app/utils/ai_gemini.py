@@ -1,8 +1,36 @@
 import json
 import google.generativeai as genai
 import re
+from concurrent.futures import ThreadPoolExecutor
 from app.config import Config
 
+# List of predefined categories
+PREDEFINED_CATEGORIES = [
+    "tech", "science", "health", "business", "politics",
+    "entertainment", "sports", "education", "travel", "food",
+    "lifestyle", "fashion", "music", "movies", "gaming",
+    "news", "environment", "social media", "finance", "art"
+]
+
+GENERIC_CATEGORY_TERMS = ["misc", "miscellaneous", "other", "general", "uncategorized"]
+
+# one emoji as the user sees it: a flag, a keycap, or pictographs joined by zero width joiners,
+# each with an optional variation selector, skin tone or tag sequence (subdivision flags)
+_EMOJI_BASE = ("[\u00a9\u00ae\u203c\u2049\u2122\u2139\u2194-\u21aa\u231a-\u23ff\u24c2\u25aa-\u27bf\u2934\u2935"
+               "\u2b00-\u2bff\u3030\u303d\u3297\u3299\U0001F000-\U0001F1E5\U0001F200-\U0001FAFF]")
+_EMOJI_ELEMENT = _EMOJI_BASE + "(?:\uFE0F|[\U0001F3FB-\U0001F3FF])?[\U000E0020-\U000E007F]*"
+SINGLE_EMOJI_PATTERN = re.compile(
+    "(?:[\U0001F1E6-\U0001F1FF]{2}|[0-9#*]\uFE0F?\u20E3|" + _EMOJI_ELEMENT + "(?:\u200D" + _EMOJI_ELEMENT + ")*)"
+)
+
+def is_single_emoji(text) -> bool:
+    """
+    Usage: Whether text is exactly one emoji, multi codepoint ones included (ZWJ sequences, flags, skin tones).
+    Parameters: text (str)
+    Returns: bool
+    """
+    return isinstance(text, str) and SINGLE_EMOJI_PATTERN.fullmatch(text.strip()) is not None
+
 class TextProcessingWithGemini:
     
     def __init__(self):
@@ -55,68 +83,128 @@ class TextProcessingWithGemini:
             return None
     
     
-    def summarize_text(self, chunks):
+    def _generate_many(self, client, prompts, max_concurrency=None):
         """
-        Usage: Summarize text chunks into a structured format.
+        Usage: Run several generate_content calls at the same time with a bounded number of in-flight requests.
         Parameters:
-            chunks (list): A list of text chunks to be summarized.
+            client: The generative model used to run the prompts.
+            prompts (list): The prompts to send to the model.
+            max_concurrency (int): Maximum number of requests in flight at once.
         Returns:
-            str: The final summary of the text chunks.
+            list: The response text for each prompt, in the same order as the prompts.
         """
-        try:
-            client = genai.GenerativeModel("gemini-2.0-flash")
+        max_concurrency = max_concurrency or Config.GEMINI_MAX_CONCURRENCY
 
-            summary_texts = []
-            for chunk in chunks:
-                response = client.generate_content(f"Summarize the following content thoroughly in a structured manner:\n\n{chunk}")
-                summary_text = self.extract_text_from_response(response)
-                summary_texts.append(summary_text)
+        def generate(prompt):
+            try:
+                response = client.generate_content(prompt)
+                return self.extract_text_from_response(response)
+            except Exception as exception:
+                print(f"Error generating content for chunk: {exception}")
+                return ""
 
-                combined_summary = "\n\n".join(summary_texts)
+        if len(prompts) <= 1 or max_concurrency <= 1:
+            return [generate(prompt) for prompt in prompts]
 
-                # Generate a refined summary in a structured format
-                response = client.generate_content(f"""
-                            You are provided with a collection of documents that together form a single comprehensive document.
-                            A researcher needs a summary that is informative, clear, and structured in a visually engaging format using emojis and headings. Your task is to generate a rich, self-contained summary that does not require the reader to refer back to the original documents.
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(prompts))) as executor:
+            return list(executor.map(generate, prompts))
 
-                            **Required Output Format:**
+    def summarize_text(self, chunks, client=None, max_concurrency=None, reduce_fanout=None):
+        """
+        Usage: Summarize text chunks into a structured format using map-reduce.
+            Every chunk is summarized concurrently (map), partial summaries are merged in
+            groups of reduce_fanout until they fit in a single request (reduce), and the
+            final structured summary is generated from what is left.
+        Parameters:
+            chunks (list): A list of text chunks to be summarized.
+            client: Optional generative model, defaults to gemini-2.0-flash.
+            max_concurrency (int): Maximum number of Gemini requests in flight at once.
+            reduce_fanout (int): Number of partial summaries merged per reduce request.
+        Returns:
+            str: The final summary of the text chunks.
+        """
+        try:
+            client = client or genai.GenerativeModel("gemini-2.0-flash")
+            reduce_fanout = max(2, reduce_fanout or Config.GEMINI_REDUCE_FANOUT)
+
+            chunks = [chunk for chunk in chunks if chunk and chunk.strip()]
+            if not chunks:
+                return None
+
+            # map: summarize every chunk concurrently
+            summary_texts = self._generate_many(
+                client,
+                [f"Summarize the following content thoroughly in a structured manner:\n\n{chunk}" for chunk in chunks],
+                max_concurrency
+            )
+            summary_texts = [text for text in summary_texts if text]
+
+            # reduce: merge partial summaries level by level until one request can hold them all
+            while len(summary_texts) > reduce_fanout:
+                groups = [
+                    "\n\n".join(summary_texts[i:i + reduce_fanout])
+                    for i in range(0, len(summary_texts), reduce_fanout)
+                ]
+                summary_texts = self._generate_many(
+                    client,
+                    [f"""
+                        The following are summaries of consecutive parts of one document.
+                        Merge them into a single thorough, structured summary.
+                        Keep every important fact, concept and example, and remove repetition.
+
+                        {group}
+                    """ for group in groups],
+                    max_concurrency
+                )
+                summary_texts = [text for text in summary_texts if text]
+
+            if not summary_texts:
+                return None
+
+            combined_summary = "\n\n".join(summary_texts)
+
+            # Generate a refined summary in a structured format
+            response = client.generate_content(f"""
+                        You are provided with a collection of documents that together form a single comprehensive document.
+                        A researcher needs a summary that is informative, clear, and structured in a visually engaging format using emojis and headings. Your task is to generate a rich, self-contained summary that does not require the reader to refer back to the original documents.
 
-                            **Summary**  
-                            Write a concise 1–2 sentence overview that clearly explains what the document is about, its main focus, and what the reader will learn.
+                        **Required Output Format:**
 
-                            **Highlights**  
-                            List the most important features, concepts, or components using bullet points with relevant emojis.  
-                            Each bullet should be 1-2 sentence long and written in a simple, clear style.
+                        **Summary**  
+                        Write a concise 1–2 sentence overview that clearly explains what the document is about, its main focus, and what the reader will learn.
 
-                            Example format:  
-                            🌐 Domain and Hosting: Acquire a domain name and hosting for your website.
+                        **Highlights**  
+                        List the most important features, concepts, or components using bullet points with relevant emojis.  
+                        Each bullet should be 1-2 sentence long and written in a simple, clear style.
 
-                            **Key Insights**  
-                            Provide an expanded explanation of the core ideas or methods introduced in the content.  
-                            Each bullet point should start with an emoji and bolded heading, followed by 2–4 explanatory sentences.  
-                            If any processes, frameworks, or systems are described, explain them clearly.  
-                            Use examples when they help make the concept easier to understand.
+                        Example format:  
+                        🌐 Domain and Hosting: Acquire a domain name and hosting for your website.
 
-                            Example format:  
-                            🌍 **Understanding Domain and Hosting**: A domain is your website’s address, while hosting is the service that stores your site files. Both are essential for getting your site online. Choosing the right provider ensures good performance and security.
+                        **Key Insights**  
+                        Provide an expanded explanation of the core ideas or methods introduced in the content.  
+                        Each bullet point should start with an emoji and bolded heading, followed by 2–4 explanatory sentences.  
+                        If any processes, frameworks, or systems are described, explain them clearly.  
+                        Use examples when they help make the concept easier to understand.
 
-                            **Guidelines:**  
-                            - Use emojis to help structure and clarify the content visually.  
-                            - Maintain a professional but friendly and educational tone.  
-                            - Avoid promotional language.  
-                            - Do not include extra preamble like “Here’s the summary…” — just present the sections directly.  
-                            - Ensure the summary is self-contained and stands alone.
+                        Example format:  
+                        🌍 **Understanding Domain and Hosting**: A domain is your website’s address, while hosting is the service that stores your site files. Both are essential for getting your site online. Choosing the right provider ensures good performance and security.
 
-                            Summarize the following document in this format:
+                        **Guidelines:**  
+                        - Use emojis to help structure and clarify the content visually.  
+                        - Maintain a professional but friendly and educational tone.  
+                        - Avoid promotional language.  
+                        - Do not include extra preamble like “Here’s the summary…” — just present the sections directly.  
+                        - Ensure the summary is self-contained and stands alone.
 
-                            {combined_summary}
+                        Summarize the following document in this format:
 
-                        """)
+                        {combined_summary}
 
+                    """)
 
-                final_summary = self.extract_text_from_response(response)
+            final_summary = self.extract_text_from_response(response)
 
-                return final_summary
+            return final_summary
 
         except Exception as exception:
             print(f"Error summarizing text: {exception}")
@@ -166,20 +254,12 @@ class TextProcessingWithGemini:
             str: A category type - either from predefined list or a new specific category.
         """
         try:
-            # List of predefined categories
-            predefined_categories = [
-                "tech", "science", "health", "business", "politics", 
-                "entertainment", "sports", "education", "travel", "food", 
-                "lifestyle", "fashion", "music", "movies", "gaming", 
-                "news", "environment", "social media", "finance", "art"
-            ]
-
             client = genai.GenerativeModel("gemini-2.0-flash")
 
             # Try to categorize from predefined list first
             response = client.generate_content(f"""
                 Categorize this content into ONE category from this list:
-                {', '.join(predefined_categories)}
+                {', '.join(PREDEFINED_CATEGORIES)}
                 
                 Content: {content}
                 
@@ -191,7 +271,7 @@ class TextProcessingWithGemini:
             category = self.extract_text_from_response(response).strip().lower()
             
             # Check if category is in predefined list (exact or partial match)
-            for pred_cat in predefined_categories:
+            for pred_cat in PREDEFINED_CATEGORIES:
                 if category == pred_cat or pred_cat in category:
                     return pred_cat
                     
@@ -207,8 +287,7 @@ class TextProcessingWithGemini:
             new_category = self.extract_text_from_response(new_cat_response).strip().lower()
             
             # Filter out generic categories
-            generic_terms = ["misc", "miscellaneous", "other", "general", "uncategorized"]
-            if any(term in new_category for term in generic_terms) or len(new_category) < 3:
+            if any(term in new_category for term in GENERIC_CATEGORY_TERMS) or len(new_category) < 3:
                 # Try one more time with even simpler prompt
                 retry = client.generate_content(f"What single specific topic (1-2 words) best describes: {content[:300]}?")
                 new_category = self.extract_text_from_response(retry).strip().lower()
@@ -241,8 +320,7 @@ class TextProcessingWithGemini:
             """)
 
             icon = self.extract_text_from_response(response).strip()
-            # Ensure it's a single emoji character
-            if len(icon) <= 2:
+            if is_single_emoji(icon):
                 return icon
             else:
                 print(f"Unexpected response: {icon}")
@@ -253,6 +331,114 @@ class TextProcessingWithGemini:
             return "📋"
 
         
+    def generate_card_metadata(self, summary, max_tags=5, client=None):
+        """
+        Usage: Generate the title, tags, category and icon of a card in a single structured request.
+            Every field of the JSON response is validated on its own, and only the fields that are
+            missing or invalid fall back to the dedicated get_title / generate_tags /
+            generate_category / get_icon calls.
+        Parameters:
+            summary (str): The summary of the content.
+            max_tags (int): The maximum number of tags to generate.
+            client: Optional generative model, defaults to gemini-2.0-flash.
+        Returns:
+            dict: {"title": str, "tags": list, "category": str, "icon": str}
+        """
+        metadata = {}
+        try:
+            client = client or genai.GenerativeModel("gemini-2.0-flash")
+
+            response = client.generate_content(f"""
+                Generate the metadata for a knowledge card based on the following summary:
+
+                {summary}
+
+                ### Output Format:
+                Return ONLY a JSON object with exactly these keys:
+                {{
+                    "title": "concise and engaging title",
+                    "tags": ["tag one", "tag two"],
+                    "category": "category",
+                    "icon": "single emoji"
+                }}
+
+                ### Guidelines:
+                1. title: Short & catchy, accurately reflects the main idea, informative (no clickbait), max 6 words.
+                2. tags: Only major topics and keywords, no duplicates, at most {max_tags} tags.
+                3. category: ONE lowercase category from this list if the content fits ANY of them:
+                   {', '.join(PREDEFINED_CATEGORIES)}.
+                   Otherwise create a specific, descriptive category (1-2 words, lowercase).
+                   Don't use generic terms like "misc" or "other".
+                4. icon: A single emoji that clearly represents the category.
+            """, generation_config={"response_mime_type": "application/json"})
+
+            raw_metadata = self.extract_knowledge_map(self.extract_text_from_response(response))
+            metadata = self.validate_card_metadata(raw_metadata, max_tags=max_tags)
+        except Exception as exception:
+            print(f"Error generating card metadata: {exception}")
+
+        # per-field fallback to the dedicated prompts
+        if "title" not in metadata:
+            print("title missing from structured response, falling back")
+            metadata["title"] = self.get_title(summary)
+        if "tags" not in metadata:
+            print("tags missing from structured response, falling back")
+            metadata["tags"] = self.generate_tags(summary, max_tags=max_tags)
+        if "category" not in metadata:
+            print("category missing from structured response, falling back")
+            metadata["category"] = self.generate_category(summary)
+        if "icon" not in metadata:
+            print("icon missing from structured response, falling back")
+            metadata["icon"] = self.get_icon(metadata["category"])
+
+        return metadata
+
+    def validate_card_metadata(self, raw_metadata, max_tags=5):
+        """
+        Usage: Validate the structured metadata returned by the model field by field.
+        Parameters:
+            raw_metadata (dict): The parsed JSON response.
+            max_tags (int): The maximum number of tags to keep.
+        Returns:
+            dict: Only the fields that passed validation.
+        """
+        if not isinstance(raw_metadata, dict):
+            return {}
+
+        metadata = {}
+
+        title = raw_metadata.get("title")
+        if isinstance(title, str):
+            title = re.sub(r"^\**Title:\**\s*", "", title.strip()).strip("*").strip()
+            if title and len(title) <= 120:
+                metadata["title"] = title
+
+        tags = raw_metadata.get("tags")
+        if isinstance(tags, str):
+            tags = tags.split(",")
+        if isinstance(tags, list):
+            unique_tags = []
+            for tag in tags:
+                if isinstance(tag, str) and tag.strip() and tag.strip() not in unique_tags:
+                    unique_tags.append(tag.strip())
+            if unique_tags:
+                metadata["tags"] = unique_tags[:max_tags]
+
+        category = raw_metadata.get("category")
+        if isinstance(category, str):
+            category = category.strip().lower()
+            predefined = next((pred_cat for pred_cat in PREDEFINED_CATEGORIES if category == pred_cat or pred_cat in category), None)
+            if predefined:
+                metadata["category"] = predefined
+            elif len(category) >= 3 and len(category.split()) <= 3 and not any(term in category for term in GENERIC_CATEGORY_TERMS):
+                metadata["category"] = category
+
+        icon = raw_metadata.get("icon")
+        if is_single_emoji(icon):
+            metadata["icon"] = icon.strip()
+
+        return metadata
+
     def generate_qna(self, content):
         """
         Usage: Generate a Q&A format from the provided content.
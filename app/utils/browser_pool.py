@@ -0,0 +1,195 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from app.config import Config
+
+
+class BrowserSession:
+    """One remote browser with the bookkeeping the pool needs to decide when to recycle it."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.pages = 0
+
+    def expired(self, max_pages: int, max_age_seconds: float) -> bool:
+        return self.pages >= max_pages or time.monotonic() - self.created_at >= max_age_seconds
+
+
+class BrowserSessionPool:
+    """
+    Keeps up to max_size warm browser sessions so a scrape does not pay for a new remote
+    Chromium connection every time. Idle sessions are health checked before they are handed
+    out, and a session is closed after max_pages pages or max_age_seconds. A session that
+    raised during a scrape is dropped instead of being returned to the pool. Sessions are
+    created on demand, nothing connects until the first scrape.
+    """
+
+    def __init__(self, create_driver, max_size: int = None, max_pages: int = None, max_age_seconds: float = None):
+        self.create_driver = create_driver
+        self.max_size = max_size or Config.BROWSER_POOL_SIZE
+        self.max_pages = max_pages or Config.BROWSER_MAX_PAGES_PER_SESSION
+        self.max_age_seconds = max_age_seconds or Config.BROWSER_SESSION_MAX_AGE_SECONDS
+        self.idle = deque()
+        self.open_sessions = 0
+        self.condition = threading.Condition()
+        self.closed = False
+
+        self.created = 0
+        self.recycled = 0
+        self.unhealthy = 0
+        self.pages = 0
+        self.failures = 0
+        self.page_seconds = 0.0
+        self.recent_pages = deque()
+
+    @staticmethod
+    def _quit(session: BrowserSession):
+        try:
+            session.driver.quit()
+        except Exception as exception:
+            print(f"Error closing browser session: {exception}")
+
+    @staticmethod
+    def _healthy(session: BrowserSession) -> bool:
+        try:
+            session.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout: float = None) -> BrowserSession:
+        """
+        Usage: Take a healthy session from the pool, opening a new one while below max_size.
+        Parameters: timeout (float): Seconds to wait for a free session, defaults to BROWSER_ACQUIRE_TIMEOUT_SECONDS.
+        Returns: BrowserSession
+        Raises: TimeoutError when every session stays busy for the whole timeout,
+            RuntimeError once the pool is closed.
+        """
+        deadline = time.monotonic() + (timeout if timeout is not None else Config.BROWSER_ACQUIRE_TIMEOUT_SECONDS)
+        while True:
+            with self.condition:
+                while not self.closed and not self.idle and self.open_sessions >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("No browser session became available")
+                    self.condition.wait(remaining)
+                if self.closed:
+                    raise RuntimeError("The browser pool is closed")
+                session = self.idle.popleft() if self.idle else None
+                if session is None:
+                    # reserve the slot before connecting, connecting takes seconds
+                    self.open_sessions += 1
+
+            if session is None:
+                try:
+                    session = BrowserSession(self.create_driver())
+                except Exception:
+                    self._discard_slot()
+                    raise
+                with self.condition:
+                    self.created += 1
+                    closed = self.closed
+                if closed:
+                    # close() ran while the session was connecting
+                    self._quit(session)
+                    self._discard_slot()
+                    raise RuntimeError("The browser pool is closed")
+                return session
+
+            if not session.expired(self.max_pages, self.max_age_seconds) and self._healthy(session):
+                return session
+
+            # stale or dead, close it and try again
+            with self.condition:
+                if session.expired(self.max_pages, self.max_age_seconds):
+                    self.recycled += 1
+                else:
+                    self.unhealthy += 1
+            self._quit(session)
+            self._discard_slot()
+
+    def _discard_slot(self):
+        with self.condition:
+            self.open_sessions -= 1
+            self.condition.notify()
+
+    def release(self, session: BrowserSession, failed: bool = False):
+        """
+        Usage: Return a session after use, failed or worn out sessions are closed instead.
+        Parameters: session (BrowserSession), failed (bool): The scrape raised with this session.
+        """
+        if failed or self.closed or session.expired(self.max_pages, self.max_age_seconds):
+            with self.condition:
+                if not failed and not self.closed:
+                    self.recycled += 1
+            self._quit(session)
+            self._discard_slot()
+            return
+        with self.condition:
+            self.idle.append(session)
+            self.condition.notify()
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """
+        Usage: with pool.session() as driver: ... , counts the page and returns the session to the pool.
+        """
+        session = self.acquire(timeout)
+        started = time.monotonic()
+        failed = False
+        try:
+            yield session.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            session.pages += 1
+            self._record_page(time.monotonic() - started, failed)
+            self.release(session, failed=failed)
+
+    def _record_page(self, seconds: float, failed: bool):
+        now = time.monotonic()
+        with self.condition:
+            self.pages += 1
+            self.failures += 1 if failed else 0
+            self.page_seconds += seconds
+            self.recent_pages.append(now)
+            while self.recent_pages and now - self.recent_pages[0] > 60:
+                self.recent_pages.popleft()
+
+    def close(self):
+        """
+        Usage: Quit every idle session, sessions in use are closed when they are released.
+        """
+        with self.condition:
+            self.closed = True
+            sessions = list(self.idle)
+            self.idle.clear()
+            self.open_sessions -= len(sessions)
+            self.condition.notify_all()
+        for session in sessions:
+            self._quit(session)
+
+    def get_stats(self):
+        """
+        Usage: Pool occupancy and throughput counters, pages_per_minute covers the last 60 seconds.
+        Returns: dict
+        """
+        with self.condition:
+            now = time.monotonic()
+            while self.recent_pages and now - self.recent_pages[0] > 60:
+                self.recent_pages.popleft()
+            return {
+                "max_size": self.max_size,
+                "open": self.open_sessions,
+                "idle": len(self.idle),
+                "created": self.created,
+                "recycled": self.recycled,
+                "unhealthy": self.unhealthy,
+                "pages": self.pages,
+                "failures": self.failures,
+                "pages_per_minute": len(self.recent_pages),
+                "average_page_seconds": round(self.page_seconds / self.pages, 3) if self.pages else 0.0
+            }
@@ -0,0 +1,165 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from app.config import Config
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+NORMALIZE_PATTERN = re.compile(r"[\W_]+", re.UNICODE)
+SHINGLE_SIZE = 5
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Usage: Approximate token count of a text for budgeting, about CHUNK_CHARS_PER_TOKEN characters per token.
+    Parameters: text (str)
+    Returns: int
+    """
+    return math.ceil(len(text) / Config.CHUNK_CHARS_PER_TOKEN)
+
+
+def _fingerprint(text: str) -> str:
+    """Paragraph identity ignoring case, punctuation and spacing. Digits count, 'Step 1' and 'Step 2' differ."""
+    return hashlib.sha1(NORMALIZE_PATTERN.sub(" ", text.lower()).strip().encode("utf-8")).hexdigest()
+
+
+def _shingles(text: str) -> set:
+    words = NORMALIZE_PATTERN.sub(" ", text.lower()).split()
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _drop_repeated_windows(text: str) -> str:
+    """
+    Usage: Remove word runs of CHUNK_DEDUP_WINDOW_WORDS or more that already occurred earlier in the text,
+        for one-line input such as YouTube transcripts, where the caption loops have no paragraphs to compare.
+        Words compare ignoring case and punctuation, the first occurrence is kept wherever the repeat starts.
+    Parameters: text (str)
+    Returns: str
+    """
+    window_words = Config.CHUNK_DEDUP_WINDOW_WORDS
+    words = text.split()
+    normalized = [NORMALIZE_PATTERN.sub("", word.lower()) for word in words]
+    first_seen = {}
+    kept, drop_until = [], 0
+    for position, word in enumerate(words):
+        window = tuple(normalized[position:position + window_words])
+        if len(window) == window_words:
+            start = first_seen.setdefault(window, position)
+            # a window overlapping its first occurrence is a repeated word ("ha ha ha"), not a loop
+            if position - start >= window_words:
+                drop_until = position + window_words
+        if position >= drop_until:
+            kept.append(word)
+    return " ".join(kept)
+
+
+def _split_oversized(unit: str, max_tokens: int) -> list:
+    """Split a paragraph above the budget on sentences, then words, then characters."""
+    max_chars = max_tokens * Config.CHUNK_CHARS_PER_TOKEN
+    pieces = []
+    for sentence in SENTENCE_BOUNDARY.split(unit):
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        current = ""
+        for word in sentence.split():
+            while len(word) > max_chars:
+                pieces.append(word[:max_chars])
+                word = word[max_chars:]
+            if current and len(current) + 1 + len(word) > max_chars:
+                pieces.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+    return [piece for piece in pieces if piece.strip()]
+
+
+def split_units(text: str, max_tokens: int) -> list:
+    """
+    Usage: Paragraphs of a text (one per line, as produced by the extractors), with the ones above
+        the budget broken on sentence boundaries. Repeats of a paragraph (same text up to case, punctuation
+        and spacing) are removed, for lines under CHUNK_DEDUP_MIN_CHARS only once they occur
+        CHUNK_DEDUP_MIN_REPEATS times. Text on a single line is deduplicated by runs of words instead.
+    Parameters: text (str), max_tokens (int)
+    Returns: list of str
+    """
+    paragraphs = [paragraph.strip() for paragraph in text.splitlines() if paragraph.strip()]
+    if len(paragraphs) == 1:
+        paragraphs = [_drop_repeated_windows(paragraphs[0])]
+    fingerprints = [_fingerprint(paragraph) for paragraph in paragraphs]
+    # a short line is only boilerplate ("Share this article", "[Music]") when it keeps coming back
+    short_counts = Counter(
+        fingerprint for paragraph, fingerprint in zip(paragraphs, fingerprints)
+        if len(paragraph) < Config.CHUNK_DEDUP_MIN_CHARS
+    )
+
+    units = []
+    seen = set()
+    for paragraph, fingerprint in zip(paragraphs, fingerprints):
+        # repeated footers, captions and transcript loops, the first occurrence is kept
+        if len(paragraph) >= Config.CHUNK_DEDUP_MIN_CHARS or short_counts[fingerprint] >= Config.CHUNK_DEDUP_MIN_REPEATS:
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+        if estimate_tokens(paragraph) > max_tokens:
+            units.extend(_split_oversized(paragraph, max_tokens))
+        else:
+            units.append(paragraph)
+    return units
+
+
+def chunk_text(text: str, max_tokens: int = None, overlap_tokens: int = None, dedup_similarity: float = None) -> list:
+    """
+    Usage: Pack a document into as few chunks as possible under a token budget, cutting only between
+        paragraphs or sentences. Each chunk can repeat the tail of the previous one for context, and a
+        chunk that is almost the same as an earlier one (by 5-word shingle overlap) is dropped.
+    Parameters:
+        text (str): The document, one paragraph per line.
+        max_tokens (int): Budget per chunk, defaults to CHUNK_MAX_TOKENS.
+        overlap_tokens (int): Tokens of the previous chunk repeated at the start of the next, defaults to CHUNK_OVERLAP_TOKENS.
+        dedup_similarity (float): Jaccard similarity above which a chunk counts as a duplicate, defaults to CHUNK_DEDUP_SIMILARITY.
+    Returns:
+        list of str: The chunks, paragraphs joined with newlines.
+    """
+    if not text:
+        return []
+    max_tokens = max_tokens or Config.CHUNK_MAX_TOKENS
+    overlap_tokens = min(Config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens, max_tokens // 2)
+    dedup_similarity = Config.CHUNK_DEDUP_SIMILARITY if dedup_similarity is None else dedup_similarity
+
+    chunks = []
+    current, current_tokens = [], 0
+    for unit in split_units(text, max_tokens):
+        unit_tokens = estimate_tokens(unit) + 1
+        if current and current_tokens + unit_tokens > max_tokens:
+            chunks.append(current)
+            # carry the last paragraphs over as overlap
+            carried, carried_tokens = [], 0
+            for previous in reversed(current):
+                previous_tokens = estimate_tokens(previous) + 1
+                if carried_tokens + previous_tokens > overlap_tokens or carried_tokens + previous_tokens + unit_tokens > max_tokens:
+                    break
+                carried.insert(0, previous)
+                carried_tokens += previous_tokens
+            current, current_tokens = carried, carried_tokens
+        current.append(unit)
+        current_tokens += unit_tokens
+    if current:
+        chunks.append(current)
+
+    unique_chunks, kept_shingles = [], []
+    for chunk in chunks:
+        chunk = "\n".join(chunk)
+        shingles = _shingles(chunk)
+        duplicate = any(
+            len(shingles & previous) / len(shingles | previous) >= dedup_similarity
+            for previous in kept_shingles if shingles and previous
+        )
+        if not duplicate:
+            unique_chunks.append(chunk)
+            kept_shingles.append(shingles)
+    return unique_chunks
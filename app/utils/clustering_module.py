@@ -2,20 +2,28 @@ import numpy as np
 from sklearn.cluster import DBSCAN
 from bson import ObjectId
 from typing import List, Dict, Any, Tuple
+from app.config import Config
 from app.utils import cosine_distance_matrix
 
 
-def clustering_module(vectors , eps: float = 0.2, min_samples: int = 3):
+def clustering_module(vectors , eps: float = 0.2, min_samples: int = 3, backend: str = None):
         """
         Usage: Cluster knowledge cards for a user
         Args:
             vectors: embedded vectors
-            eps: DBSCAN epsilon parameter
+            eps: DBSCAN epsilon parameter, a cosine distance
             min_samples: DBSCAN min_samples parameter
+            backend: "dense", "radius" or "auto", defaults to Config.CLUSTER_BACKEND
         Returns:
-            Tuple of (number of clusters created, status message)
+            Array of cluster labels, -1 for noise
         """
-        print("arriving here")
+        backend = backend or Config.CLUSTER_BACKEND
+        if backend == "auto":
+            backend = "dense" if len(vectors) <= Config.CLUSTER_DENSE_MAX_CARDS else "radius"
+
+        if backend == "radius":
+            return radius_clustering(vectors, eps, min_samples)
+
         # calculate distance matrix
         distance_matrix = cosine_distance_matrix(vectors)
 
@@ -28,4 +36,53 @@ def clustering_module(vectors , eps: float = 0.2, min_samples: int = 3):
 
         labels = clustering.labels_
 
-        return labels
\ No newline at end of file
+        return labels
+
+
+def radius_clustering(vectors, eps: float = 0.2, min_samples: int = 3):
+        """
+        Usage: DBSCAN without the N x N distance matrix, memory grows with the neighbours found instead.
+            On L2-normalized vectors the cosine distance is ||a - b||^2 / 2, so a cosine eps is
+            the euclidean radius sqrt(2 * eps) and the tree/blockwise radius queries of DBSCAN
+            return the same neighbourhoods as the precomputed matrix.
+        Args:
+            vectors: embedded vectors
+            eps: DBSCAN epsilon parameter, a cosine distance
+            min_samples: DBSCAN min_samples parameter
+        Returns:
+            Array of cluster labels, -1 for noise
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized = vectors / norms
+
+        clustering = DBSCAN(
+            eps=float(np.sqrt(2 * eps)),
+            min_samples=min_samples,
+            metric="euclidean",
+            n_jobs=1
+        ).fit(normalized)
+
+        return clustering.labels_
+
+
+def nearest_centroid(vector, centroids):
+        """
+        Usage: Find the centroid closest to a vector by cosine distance
+        Args:
+            vector: embedded vector of a single card
+            centroids: array of cluster centroids, one per row
+        Returns:
+            Tuple of (row index of the nearest centroid, cosine distance), (None, None) without centroids
+        """
+        vector = np.asarray(vector, dtype=float)
+        centroids = np.asarray(centroids, dtype=float)
+        if centroids.size == 0:
+            return None, None
+
+        norms = np.linalg.norm(centroids, axis=1) * np.linalg.norm(vector)
+        norms[norms == 0] = 1.0
+        distances = 1 - np.clip(centroids @ vector / norms, -1.0, 1.0)
+        index = int(np.argmin(distances))
+        return index, float(distances[index])
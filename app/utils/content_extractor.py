@@ -0,0 +1,152 @@
+import re
+import lxml.html
+from lxml import etree
+
+# never part of the article text
+DROP_TAGS = ["script", "style", "noscript", "template", "iframe", "img", "pre", "svg", "video", "audio", "canvas",
+             "hr", "form", "input", "button", "select", "option", "textarea", "nav", "header", "footer", "aside"]
+
+BOILERPLATE_PATTERN = re.compile(
+    r"cookie|consent|gdpr|banner|sidebar|side-bar|\bnav|menu|footer|masthead|header|comment|share|social|related|"
+    r"recommend|promo|sponsor|advert|\bads?\b|newsletter|subscribe|signup|popup|modal|breadcrumb|pagination|widget|skip-link",
+    re.IGNORECASE
+)
+CONTENT_PATTERN = re.compile(r"article|content|main|post|entry|story|text|body|blog", re.IGNORECASE)
+# chrome-looking names that still wrap the article ("main-nav-content"), narrower than CONTENT_PATTERN
+# so that "relatedposts" or "post-share" are dropped
+KEEP_PATTERN = re.compile(r"article|body|column|content|main", re.IGNORECASE)
+
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr", "td", "th", "blockquote",
+              "h1", "h2", "h3", "h4", "h5", "h6", "dd", "dt", "dl", "figcaption", "br"}
+PARAGRAPH_TAGS = ("p", "td", "li", "blockquote", "h2", "h3", "dd")
+
+# a candidate below this share of the page text is probably a teaser box, use the whole page then
+MIN_CANDIDATE_SHARE = 0.25
+MAX_BOILERPLATE_SHARE = 0.5
+
+
+def _class_weight(element) -> int:
+    names = f"{element.get('class', '')} {element.get('id', '')}"
+    if not names.strip():
+        return 0
+    weight = 0
+    if BOILERPLATE_PATTERN.search(names):
+        weight -= 25
+    if CONTENT_PATTERN.search(names):
+        weight += 25
+    return weight
+
+
+def _is_chrome(element) -> bool:
+    names = f"{element.get('class', '')} {element.get('id', '')}"
+    if not BOILERPLATE_PATTERN.search(names) or KEEP_PATTERN.search(names):
+        return False
+    # a layout wrapper named after the navigation ("grid-for-nav") can still hold the main landmark
+    return element.get("role") != "main" and not element.xpath(".//main|.//*[@role='main']")
+
+
+def _drop_boilerplate(root):
+    """Remove blacklisted tags and the elements whose class/id marks them as page chrome."""
+    etree.strip_elements(root, *DROP_TAGS, with_tail=False)
+    page_length = len(root.text_content())
+    for element in list(root.iter("div", "section", "span", "ul", "aside", "p", "table")):
+        if element.getparent() is None or not _is_chrome(element):
+            continue
+        # a wrapper holding most of the page is layout, not chrome, whatever its class says
+        if len(element.text_content()) < MAX_BOILERPLATE_SHARE * page_length:
+            element.drop_tree()
+
+
+def _element_text(element) -> str:
+    """Text of an element with a line break after every block element, lines stripped and blank ones dropped."""
+    parts = []
+    for event, node in etree.iterwalk(element, events=("start", "end")):
+        if not isinstance(node.tag, str):
+            continue
+        if event == "start":
+            if node.text:
+                parts.append(node.text)
+        else:
+            if node.tag in BLOCK_TAGS:
+                parts.append("\n")
+            if node is not element and node.tail:
+                parts.append(node.tail)
+    text = "".join(parts)
+    return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _link_density(element, text_length: int) -> float:
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.text_content()) for link in element.iter("a"))
+    return min(1.0, link_length / text_length)
+
+
+def _best_candidates(body):
+    """
+    Readability style scoring: paragraphs vote for their parent and grandparent, link heavy blocks lose.
+    Returns the best block plus its siblings that scored at least a fifth of it, in document order.
+    """
+    scores = {}
+    for paragraph in body.iter(*PARAGRAPH_TAGS):
+        text = paragraph.text_content().strip()
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        grandparent = parent.getparent()
+        for ancestor, share in ((parent, 1.0), (grandparent, 0.5)):
+            if ancestor is None:
+                continue
+            if ancestor not in scores:
+                scores[ancestor] = _class_weight(ancestor)
+            scores[ancestor] += score * share
+
+    for element in scores:
+        scores[element] *= 1 - _link_density(element, len(element.text_content()))
+    if not scores:
+        return []
+    best = max(scores, key=scores.get)
+    if scores[best] <= 0:
+        return []
+
+    parent = best.getparent()
+    if parent is None:
+        return [best]
+    threshold = max(10, scores[best] * 0.2)
+    return [sibling for sibling in parent if sibling is best or scores.get(sibling, 0) >= threshold]
+
+
+def extract_main_text(html: str) -> str:
+    """
+    Usage: Parse the page once with lxml, drop tags and class/id marked boilerplate (navs, cookie banners,
+        sidebars, share widgets...) and keep the main content block picked by readability style scoring.
+    Parameters: html (str or bytes): The page.
+    Returns: str: The article text, one block per line, or the cleaned text of the whole body when no
+        block clearly holds the article. Empty string when nothing could be parsed.
+    """
+    if not html:
+        return ""
+    if isinstance(html, str):
+        # lxml refuses str input that carries an XML encoding declaration
+        html = html.encode("utf-8")
+    try:
+        root = lxml.html.fromstring(html, parser=lxml.html.HTMLParser(encoding="utf-8", remove_comments=True))
+    except (etree.ParserError, ValueError):
+        return ""
+
+    body = root.find("body")
+    body = body if body is not None else root
+    _drop_boilerplate(body)
+
+    page_text = _element_text(body)
+    candidates = _best_candidates(body)
+    if not candidates:
+        return page_text
+
+    candidate_text = "\n".join(_element_text(candidate) for candidate in candidates)
+    if len(candidate_text) < MIN_CANDIDATE_SHARE * len(page_text):
+        return page_text
+    return candidate_text
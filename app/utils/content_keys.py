@@ -0,0 +1,50 @@
+import hashlib
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from app.utils.youtube_url_checker import is_youtube_url
+from app.utils.get_yt_transcript import get_video_id
+
+# click ids added by ad and analytics platforms, never part of the resource (utm_* is matched by prefix).
+# Other parameters are kept even when they look like tracking ("ref", "si"), some sites route on them.
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid"}
+
+def normalize_url(url: str) -> str:
+    """
+    Usage: Normalize a URL so that links to the same page map to the same key.
+        Lowercases scheme and host, drops default ports, fragments and the utm_* / click id tracking
+        parameters, and sorts the remaining query parameters. Scheme, www. and the path are kept
+        as they are, an http-only host or a www. subdomain can serve something else.
+    Parameters: url (str)
+    Returns: str: The normalized URL.
+    """
+    parsed = urlparse(url.strip())
+    scheme = (parsed.scheme or "http").lower()
+    host = (parsed.hostname or "").lower()
+    port = parsed.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunparse((scheme, host, parsed.path or "/", "", urlencode(query), ""))
+
+def source_cache_key(url: str) -> str:
+    """
+    Usage: Cache key of a source URL, the video id for YouTube links and the normalized URL otherwise.
+    Parameters: url (str)
+    Returns: str: "yt:<video id>" or "url:<normalized url>"
+    """
+    if is_youtube_url(url):
+        video_id = get_video_id(url)
+        if video_id:
+            return f"yt:{video_id}"
+    return f"url:{normalize_url(url)}"
+
+def content_hash_key(content: bytes) -> str:
+    """
+    Usage: Cache key of an uploaded file, the SHA-256 of its bytes.
+    Parameters: content (bytes)
+    Returns: str: "sha256:<hex digest>"
+    """
+    return f"sha256:{hashlib.sha256(content).hexdigest()}"
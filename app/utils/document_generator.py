@@ -7,6 +7,18 @@ import io
 from weasyprint import HTML
 from docx import Document
 from html2docx import html2docx
+import pdfkit
+
+
+def render_pdf_from_html(html_content):
+    """
+    Usage: Render an HTML string to PDF bytes with pdfkit/wkhtmltopdf.
+        Module level so it can be sent to the CPU process pool.
+    Parameters: html_content (str): The HTML to render.
+    Returns: bytes: The rendered PDF.
+    """
+    config = pdfkit.configuration()  # path not needed if it's in Docker PATH
+    return pdfkit.from_string(html_content, False, configuration=config)
 
 class DocumentGenerator:
 
@@ -1,33 +1,238 @@
+import hashlib
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
 import requests
 from retry import retry
 from app.config import Config
+from app.utils.lru_cache import LRUCache
+
+
+def _pool(vectors) -> list:
+    """Mean pool token level outputs of the feature-extraction pipeline into one vector per text."""
+    array = np.asarray(vectors, dtype=np.float32)
+    if array.ndim > 2:
+        array = array.mean(axis=-2)
+    return array.tolist()
+
+
+class HuggingFaceBackend:
+    """Embeds through the Hugging Face inference API, one request per batch."""
+
+    def __init__(self, model_id: str, hf_token: str):
+        self.model_id = model_id
+        self.api_url = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{model_id}"
+        self.headers = {"Authorization": f"Bearer {hf_token}"}
+        self.session = requests.Session()
+
+    @retry(tries=4, delay=1, backoff=2, max_delay=8)
+    def embed_batch(self, texts: list) -> list:
+        response = self.session.post(self.api_url, headers=self.headers, json={"inputs": texts}, timeout=30)
+        result = response.json()
+
+        if isinstance(result, list):
+            return _pool(result)
+        elif "error" in result:
+            raise RuntimeError("The model is currently loading, please re-run the query.")
+        raise RuntimeError(f"Unexpected embedding response: {result}")
+
+
+class LocalBackend:
+    """
+    Embeds on the local CPU with sentence-transformers, an optional dependency.
+    The model is loaded on the first call so importing the app stays cheap.
+    """
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self.model = None
+        self.lock = threading.Lock()
+
+    def _get_model(self):
+        if self.model is None:
+            with self.lock:
+                if self.model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self.model = SentenceTransformer(self.model_id, device="cpu")
+        return self.model
+
+    def embed_batch(self, texts: list) -> list:
+        return self._get_model().encode(texts, batch_size=Config.EMBEDDING_BATCH_SIZE, convert_to_numpy=True).tolist()
+
+
+def local_backend_available() -> bool:
+    try:
+        import sentence_transformers  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 
 class Embedder:
-    """Class to handle text embedding using Hugging Face API."""
+    """
+    Text embedding with a pluggable backend (EMBEDDING_BACKEND):
+        local - sentence-transformers on the CPU (EMBEDDING_LOCAL_MODEL, HF_MODEL_ID by default), the default
+        hf    - Hugging Face inference API (HF_MODEL_ID, HF_TOKEN)
+        auto  - local when sentence-transformers is installed and EMBEDDING_LOCAL_MODEL is HF_MODEL_ID, hf otherwise
+    Vectors of different models are not comparable, cards record embedding_model next to their vector and
+    search and clustering only compare vectors of the current model.
+    Vectors are cached by a hash of the model and text. Single texts embedded concurrently from several
+    threads are collected by a background worker for up to EMBEDDING_BATCH_WAIT_MS and sent as one batch,
+    a batch the backend rejects is retried one text at a time so only the failing text raises.
+    """
 
     def __init__(self):
-        """Initialize API URL and authentication token."""
+        """Pick the backend, nothing is loaded or started until the first call."""
+        backend = Config.EMBEDDING_BACKEND
+        if backend == "auto":
+            # switching models on whether a package happens to be installed would mix embedding spaces
+            same_model = Config.EMBEDDING_LOCAL_MODEL == Config.HF_MODEL_ID
+            backend = "local" if same_model and local_backend_available() else "hf"
+        self.backend_name = backend
+
+        if backend == "local":
+            self.backend = LocalBackend(Config.EMBEDDING_LOCAL_MODEL)
+        else:
+            self.backend = HuggingFaceBackend(Config.HF_MODEL_ID, Config.HF_TOKEN)
 
-        # exposing here because config is not working (saved in .env as HF_MODEL_ID, HF_TOKEN)
-        self.model_id = Config.HF_MODEL_ID
-        self.hf_token = Config.HF_TOKEN
+        self.cache = LRUCache(max_size=Config.EMBEDDING_CACHE_SIZE)
+        self.pending_requests = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.batched_texts = 0
 
-        self.api_url = f"https://api-inference.huggingface.co/pipeline/feature-extraction/{self.model_id}"
-        self.headers = {"Authorization": f"Bearer {self.hf_token}"}
+    @property
+    def model_id(self) -> str:
+        """The model behind the vectors this embedder returns, stored as embedding_model on the cards."""
+        return self.backend.model_id
+
+    def _cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.backend.model_id}\x00{text}".encode("utf-8")).hexdigest()
+
+    def _embed_chunk(self, chunk: list) -> list:
+        """
+        Usage: Embed one batch, falling back to one request per text when the batch fails,
+            so a text the backend rejects does not fail the texts batched with it.
+        Parameters: chunk (list of str)
+        Returns: list: One vector per text, or the exception embedding that text raised.
+        """
+        try:
+            vectors = self.backend.embed_batch(chunk)
+            if len(vectors) != len(chunk):
+                raise RuntimeError(f"Expected {len(chunk)} embeddings, got {len(vectors)}")
+            return vectors
+        except Exception as exception:
+            if len(chunk) == 1:
+                return [exception]
+            print(f"Error embedding a batch of {len(chunk)} texts, embedding them one by one: {exception}")
+
+        vectors = []
+        for text in chunk:
+            try:
+                vectors.append(self.backend.embed_batch([text])[0])
+            except Exception as exception:
+                print(f"Error embedding text: {exception}")
+                vectors.append(exception)
+        return vectors
+
+    def _embed_missing(self, texts: list) -> dict:
+        """
+        Usage: Embed texts that missed the cache and cache the vectors, identical texts once, in batches of EMBEDDING_BATCH_SIZE.
+        Parameters: texts (list of str)
+        Returns: dict: text -> vector, or the exception embedding that text raised.
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        computed = {}
+        for start in range(0, len(unique_texts), Config.EMBEDDING_BATCH_SIZE):
+            chunk = unique_texts[start:start + Config.EMBEDDING_BATCH_SIZE]
+            for text, vector in zip(chunk, self._embed_chunk(chunk)):
+                computed[text] = vector
+                if not isinstance(vector, Exception):
+                    self.cache.set(self._cache_key(text), vector)
+            with self.lock:
+                self.batches += 1
+                self.batched_texts += len(chunk)
+        return computed
+
+    def embed_many(self, texts: list) -> list:
+        """
+        Usage: Embed several texts, cached ones are not sent to the backend again.
+        Parameters: texts (list of str)
+        Returns: list: One embedding vector per text, in order. Raises the error of the first text that could not be embedded.
+        """
+        keys = [self._cache_key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        computed = self._embed_missing([text for text, vector in zip(texts, vectors) if vector is None])
+
+        vectors = [vector if vector is not None else computed[text] for text, vector in zip(texts, vectors)]
+        for vector in vectors:
+            if isinstance(vector, Exception):
+                raise vector
+        return vectors
+
+    def _ensure_worker(self):
+        if self.worker is None:
+            with self.lock:
+                if self.worker is None:
+                    self.worker = threading.Thread(target=self._batch_worker, name="embedding-batcher", daemon=True)
+                    self.worker.start()
+
+    def _batch_worker(self):
+        wait_seconds = Config.EMBEDDING_BATCH_WAIT_MS / 1000
+        while True:
+            pending = [self.pending_requests.get()]
+            try:
+                while len(pending) < Config.EMBEDDING_BATCH_SIZE:
+                    pending.append(self.pending_requests.get(timeout=wait_seconds))
+            except queue.Empty:
+                pass
+
+            try:
+                computed = self._embed_missing([text for text, _ in pending])
+            except Exception as exception:
+                for _, future in pending:
+                    future.set_exception(exception)
+                continue
+            # each caller gets its own vector or error, a bad text does not fail the rest of the batch
+            for text, future in pending:
+                if isinstance(computed[text], Exception):
+                    future.set_exception(computed[text])
+                else:
+                    future.set_result(computed[text])
 
-    @retry(tries=3, delay=10)
     def embed_text(self, texts):
         """
-        Usage:Sends input text(s) to the Hugging Face API for embedding.
+        Usage: Embed one text, batched with concurrent callers, or a list of texts.
         Parameters:
             texts (str or list of str): The text(s) to be embedded.
         Returns:
-            list: The embedding vectors.
+            list: The embedding vector, or a list of vectors for a list input.
         """
-        response = requests.post(self.api_url, headers=self.headers, json={"inputs": texts})
-        result = response.json()
+        if isinstance(texts, list):
+            return self.embed_many(texts)
 
-        if isinstance(result, list):
-            return result
-        elif "error" in result:
-            raise RuntimeError("The model is currently loading, please re-run the query.")
\ No newline at end of file
+        cached = self.cache.get(self._cache_key(texts))
+        if cached is not None:
+            return cached
+
+        self._ensure_worker()
+        future = Future()
+        self.pending_requests.put((texts, future))
+        return future.result(timeout=Config.EMBEDDING_TIMEOUT_SECONDS)
+
+    def get_stats(self):
+        """
+        Usage: Backend, batching and cache counters.
+        Returns: dict
+        """
+        with self.lock:
+            return {
+                "backend": self.backend_name,
+                "model": self.backend.model_id,
+                "batches": self.batches,
+                "average_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+                "queued": self.pending_requests.qsize(),
+                "cache": self.cache.get_stats()
+            }
@@ -0,0 +1,155 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from app.config import Config
+
+
+class _PoolStats:
+    """Counters kept for one pool, in-flight = submitted - finished."""
+
+    def __init__(self, kind: str, max_workers: int):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            in_flight = self.submitted - self.completed - self.failed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "running": min(in_flight, self.max_workers),
+                "queued": max(0, in_flight - self.max_workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+class BlockingExecutor:
+    """
+    Dispatches blocking calls made from async routes onto bounded pools so they never run on the event loop:
+        io        - threads, for pymongo and other short network bound calls
+        llm       - threads, for slow Gemini generations (Q&A, knowledge maps, file summaries)
+        cpu       - processes, for PDF parsing, clustering and document rendering
+        ingestion - threads, for the long running knowledge card ingestion pipeline
+    Every pool has its own size limit, so a burst of heavy work cannot starve cheap endpoints.
+    """
+
+    def __init__(self, io_workers: int = None, llm_workers: int = None, cpu_workers: int = None, ingestion_workers: int = None):
+        self.pool_sizes = {
+            "io": io_workers or Config.IO_POOL_SIZE,
+            "llm": llm_workers or Config.LLM_POOL_SIZE,
+            "cpu": cpu_workers or Config.CPU_POOL_SIZE,
+            "ingestion": ingestion_workers or Config.INGESTION_WORKERS,
+        }
+        self.pools = {}
+        self.stats = {
+            "io": _PoolStats("thread", self.pool_sizes["io"]),
+            "llm": _PoolStats("thread", self.pool_sizes["llm"]),
+            "cpu": _PoolStats("process", self.pool_sizes["cpu"]),
+            "ingestion": _PoolStats("thread", self.pool_sizes["ingestion"]),
+        }
+        self.lock = threading.Lock()
+
+    def _get_pool(self, name: str):
+        # pools are created lazily so importing the app never forks or spawns threads
+        with self.lock:
+            if name not in self.pools:
+                if name == "cpu":
+                    self.pools[name] = ProcessPoolExecutor(max_workers=self.pool_sizes[name])
+                else:
+                    self.pools[name] = ThreadPoolExecutor(max_workers=self.pool_sizes[name], thread_name_prefix=name)
+            return self.pools[name]
+
+    async def run(self, pool_name: str, func, *args, **kwargs):
+        """
+        Usage: Run a blocking function on the given pool and await its result.
+        Parameters:
+            pool_name (str): "io", "llm", "cpu" or "ingestion".
+            func (callable): The blocking function, must be picklable (module level) for the cpu pool.
+        Returns: The return value of func, exceptions are re-raised in the caller.
+        """
+        stats = self.stats[pool_name]
+        pool = self._get_pool(pool_name)
+        with stats.lock:
+            stats.submitted += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(pool, functools.partial(func, *args, **kwargs))
+        except BaseException:
+            with stats.lock:
+                stats.failed += 1
+            raise
+        with stats.lock:
+            stats.completed += 1
+        return result
+
+    async def run_io(self, func, *args, **kwargs):
+        """Usage: Run an I/O bound blocking call (pymongo, HTTP) on the thread pool."""
+        return await self.run("io", func, *args, **kwargs)
+
+    async def run_llm(self, func, *args, **kwargs):
+        """Usage: Run a slow Gemini generation on its own thread pool so it can't exhaust the io pool."""
+        return await self.run("llm", func, *args, **kwargs)
+
+    async def run_cpu(self, func, *args, **kwargs):
+        """Usage: Run a CPU bound call (PDF parsing, clustering, rendering) on the process pool."""
+        return await self.run("cpu", func, *args, **kwargs)
+
+    async def run_ingestion(self, func, *args, **kwargs):
+        """Usage: Run a long knowledge card ingestion pipeline on its dedicated thread pool."""
+        return await self.run("ingestion", func, *args, **kwargs)
+
+    def submit(self, pool_name: str, func, *args, **kwargs):
+        """
+        Usage: Start a blocking call on the given pool without waiting for it, from synchronous code
+            or to run work in the background of a request.
+        Parameters:
+            pool_name (str): "io", "llm", "cpu" or "ingestion".
+            func (callable): The blocking function, must be picklable (module level) for the cpu pool.
+        Returns: concurrent.futures.Future: The pending result of func.
+        """
+        stats = self.stats[pool_name]
+        pool = self._get_pool(pool_name)
+        with stats.lock:
+            stats.submitted += 1
+
+        def count(future):
+            with stats.lock:
+                if future.cancelled() or future.exception() is not None:
+                    stats.failed += 1
+                else:
+                    stats.completed += 1
+
+        try:
+            future = pool.submit(func, *args, **kwargs)
+        except BaseException:
+            with stats.lock:
+                stats.failed += 1
+            raise
+        future.add_done_callback(count)
+        return future
+
+    def run_cpu_sync(self, func, *args, **kwargs):
+        """
+        Usage: Run a CPU bound call on the process pool from synchronous code that already runs in a worker thread.
+        Returns: The return value of func, exceptions are re-raised in the caller.
+        """
+        return self.submit("cpu", func, *args, **kwargs).result()
+
+    def get_metrics(self):
+        """
+        Usage: Size limits and queue depth of every pool.
+        Returns: dict: pool name -> {kind, max_workers, running, queued, submitted, completed, failed}
+        """
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def shutdown(self):
+        with self.lock:
+            for pool in self.pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            self.pools = {}
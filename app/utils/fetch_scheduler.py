@@ -0,0 +1,208 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+from app.config import Config
+from app.utils.lru_cache import LRUCache
+
+
+class RetryableFetchError(Exception):
+    """A fetch answered 429 or 5xx, worth retrying later. retry_after is in seconds when the server sent one."""
+
+    def __init__(self, status_code: int, retry_after: float = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class RateLimitedError(Exception):
+    """A site kept answering 429 or 5xx after every retry, the fetch is given up rather than forced through another route."""
+
+
+def parse_retry_after(value: str):
+    """
+    Usage: Seconds to wait from a Retry-After header, which is either a number of seconds or an HTTP date.
+    Parameters: value (str)
+    Returns: float, or None when missing or unparseable.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills rate tokens per second up to burst, reserve() hands out the time a caller has to wait for its token."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # going negative queues the caller behind the ones already waiting
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class FetchScheduler:
+    """
+    Politeness layer in front of the TieredFetcher for ingestion, bulk imports in particular:
+        - a token bucket per domain (FETCH_DOMAIN_RATE_PER_SECOND, FETCH_DOMAIN_BURST), slowed further by a robots.txt Crawl-delay
+        - at most FETCH_MAX_CONCURRENCY fetches in flight across all domains
+        - 429 and 5xx answers retried up to FETCH_MAX_RETRIES times with full-jitter exponential backoff, Retry-After honoured,
+          bot wall challenges answered with those statuses never get here, the TieredFetcher hands them to the browser
+        - robots.txt fetched once per domain and cached for FETCH_ROBOTS_TTL_SECONDS
+    Waiting for a domain token never holds a global slot, so one slow domain cannot stall the others.
+    robots.txt is requested and evaluated as FETCH_ROBOTS_USER_AGENT, the agent the HTTP tier sends with every page.
+    """
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.slots = threading.BoundedSemaphore(Config.FETCH_MAX_CONCURRENCY)
+        self.buckets = LRUCache(max_size=Config.FETCH_DOMAIN_TIER_CACHE_SIZE)
+        self.robots = LRUCache(max_size=Config.FETCH_DOMAIN_TIER_CACHE_SIZE, ttl_seconds=Config.FETCH_ROBOTS_TTL_SECONDS)
+        self.robots_locks = {}
+        self.lock = threading.Lock()
+        self.counters = {"fetched": 0, "retried": 0, "gave_up": 0, "disallowed": 0, "throttled_seconds": 0.0}
+
+    def _count(self, name: str, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def _read_robots(self, origin: str) -> RobotFileParser:
+        robots = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            # the session sends the same User-Agent as the page fetches
+            response = self.fetcher.session.get(robots.url, timeout=Config.FETCH_HTTP_TIMEOUT_SECONDS)
+            if response.status_code in (401, 403):
+                robots.disallow_all = True
+            elif response.status_code >= 400:
+                robots.allow_all = True
+            else:
+                robots.parse(response.text.splitlines())
+        except Exception as exception:
+            # unreachable robots.txt, do not block the import on it
+            print(f"Error reading {robots.url}: {exception}")
+            robots.allow_all = True
+        return robots
+
+    def _robots_for(self, url: str):
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        robots = self.robots.get(origin)
+        if robots is not None:
+            return robots
+        # the first links of a bulk import arrive together, only one of them reads robots.txt
+        with self.lock:
+            origin_lock = self.robots_locks.setdefault(origin, threading.Lock())
+        with origin_lock:
+            robots = self.robots.get(origin)
+            if robots is None:
+                robots = self._read_robots(origin)
+                self.robots.set(origin, robots)
+        with self.lock:
+            self.robots_locks.pop(origin, None)
+        return robots
+
+    def allowed(self, url: str) -> bool:
+        """
+        Usage: Whether robots.txt lets our user agent fetch url, always True when FETCH_RESPECT_ROBOTS is off.
+        Parameters: url (str)
+        Returns: bool
+        """
+        if not Config.FETCH_RESPECT_ROBOTS:
+            return True
+        return self._robots_for(url).can_fetch(Config.FETCH_ROBOTS_USER_AGENT, url)
+
+    def _bucket_for(self, url: str) -> TokenBucket:
+        domain = self.fetcher.domain_of(url)
+        bucket = self.buckets.get(domain)
+        if bucket is None:
+            rate = Config.FETCH_DOMAIN_RATE_PER_SECOND
+            crawl_delay = self._robots_for(url).crawl_delay(Config.FETCH_ROBOTS_USER_AGENT) if Config.FETCH_RESPECT_ROBOTS else None
+            if crawl_delay:
+                rate = min(rate, 1 / float(crawl_delay))
+            with self.lock:
+                bucket = self.buckets.get(domain)
+                if bucket is None:
+                    bucket = TokenBucket(rate, Config.FETCH_DOMAIN_BURST)
+                    self.buckets.set(domain, bucket)
+        return bucket
+
+    def _wait_for_turn(self, url: str):
+        wait = self._bucket_for(url).reserve()
+        if wait > 0:
+            self._count("throttled_seconds", wait)
+            time.sleep(wait)
+
+    @staticmethod
+    def backoff_seconds(attempt: int, retry_after: float = None) -> float:
+        """
+        Usage: Delay before retry number attempt (1-based), full jitter over an exponential cap, at least Retry-After.
+        Parameters: attempt (int), retry_after (float)
+        Returns: float
+        """
+        cap = min(Config.FETCH_BACKOFF_MAX_SECONDS, Config.FETCH_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+        delay = random.uniform(0, cap)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, Config.FETCH_BACKOFF_MAX_SECONDS))
+        return delay
+
+    def fetch(self, url: str):
+        """
+        Usage: Fetch a page politely through the TieredFetcher.
+        Parameters: url (str)
+        Returns: str: The HTML of the page, or None when robots.txt disallows it or the page could not be fetched.
+        Raises: RateLimitedError when the site still throttles or fails after FETCH_MAX_RETRIES retries.
+        """
+        if not self.allowed(url):
+            print(f"robots.txt disallows fetching {url}")
+            self._count("disallowed")
+            return None
+
+        for attempt in range(Config.FETCH_MAX_RETRIES + 1):
+            self._wait_for_turn(url)
+            try:
+                with self.slots:
+                    html = self.fetcher.fetch(url)
+                self._count("fetched")
+                return html
+            except RetryableFetchError as retryable:
+                last_status = retryable.status_code
+                if attempt == Config.FETCH_MAX_RETRIES:
+                    break
+                delay = self.backoff_seconds(attempt + 1, retryable.retry_after)
+                print(f"{url} answered {retryable.status_code}, retrying in {delay:.1f}s")
+                self._count("retried")
+                time.sleep(delay)
+
+        # the site keeps asking us to slow down, going around it through the browser would not be polite
+        self._count("gave_up")
+        raise RateLimitedError(
+            f"{self.fetcher.domain_of(url)} answered {last_status} after {Config.FETCH_MAX_RETRIES} retries, try again later"
+        )
+
+    def get_stats(self):
+        """
+        Usage: Fetch, retry and throttling counters.
+        Returns: dict
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        counters["throttled_seconds"] = round(counters["throttled_seconds"], 3)
+        return {**counters, "domains": len(self.buckets), "robots_cached": len(self.robots)}
@@ -0,0 +1,178 @@
+import threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from app.config import Config
+from app.utils.lru_cache import LRUCache
+from app.utils.fetch_scheduler import RetryableFetchError, parse_retry_after
+
+HTTP_TIER = "http"
+BROWSER_TIER = "browser"
+
+REQUEST_HEADERS = {
+    # the robots.txt rules are evaluated for this same agent, see FetchScheduler
+    "User-Agent": f"Mozilla/5.0 (compatible; {Config.FETCH_ROBOTS_USER_AGENT}/1.0)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# pages that only render with javascript or that are bot walls, the browser has to handle them
+BROWSER_REQUIRED_MARKERS = ("enable javascript", "javascript is required", "javascript is disabled", "checking your browser")
+
+# statuses bot walls answer with, and what tells their challenge page apart from real throttling or an outage
+CHALLENGE_STATUSES = (403, 429, 503)
+CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "cf_chl_opt", "just a moment...", "checking your browser",
+                     "attention required", "cf-turnstile", "g-recaptcha", "h-captcha")
+
+
+def is_challenge(response) -> bool:
+    """
+    Usage: Whether an error response is a bot wall (e.g. a Cloudflare challenge) that only the browser can pass,
+        rather than the site throttling us or being down.
+    Parameters: response (requests.Response)
+    Returns: bool
+    """
+    if response.status_code not in CHALLENGE_STATUSES:
+        return False
+    if response.headers.get("cf-mitigated", "").lower() == "challenge":
+        return True
+    body = response.text[:20000].lower()
+    if any(marker in body for marker in CHALLENGE_MARKERS):
+        return True
+    # Cloudflare answers a blocked client with a bare 403, its 429 and 503 stay real throttling or outages
+    return response.status_code == 403 and "cloudflare" in response.headers.get("Server", "").lower()
+
+
+class TieredFetcher:
+    """
+    Fetches a page with a plain HTTP GET first and only escalates to the remote browser
+    (Scraper.scrape_web) when the response is not usable: an error status, a non-HTML body,
+    a javascript or bot wall (including 403/429/503 challenge pages), or less than FETCH_MIN_TEXT_CHARS of readable text.
+    The HTTP tier reuses pooled keep-alive connections, accepts compressed bodies and revalidates
+    pages it fetched before with If-None-Match/If-Modified-Since. The tier that served a
+    domain is remembered for FETCH_DOMAIN_TIER_TTL_SECONDS so later fetches go straight to it.
+    """
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+        self.session = requests.Session()
+        # connection errors are retried here, throttling and 5xx are left to the FetchScheduler
+        adapter = HTTPAdapter(pool_connections=Config.FETCH_HTTP_POOL_SIZE, pool_maxsize=Config.FETCH_HTTP_POOL_SIZE,
+                              max_retries=Retry(total=1, status_forcelist=(), respect_retry_after_header=False))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(REQUEST_HEADERS)
+
+        self.domain_tiers = LRUCache(max_size=Config.FETCH_DOMAIN_TIER_CACHE_SIZE, ttl_seconds=Config.FETCH_DOMAIN_TIER_TTL_SECONDS)
+        self.validators = LRUCache(max_size=Config.FETCH_CONDITIONAL_CACHE_SIZE)
+        self.lock = threading.Lock()
+        self.counters = {"http": 0, "browser": 0, "escalated": 0, "not_modified": 0, "skipped_http": 0, "challenged": 0, "failed": 0}
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        host = (urlparse(url).hostname or "").lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def is_readable(self, html: str) -> bool:
+        """
+        Usage: Whether an HTTP response already holds the article, so the browser is not needed.
+        Parameters: html (str)
+        Returns: bool
+        """
+        if not html:
+            return False
+        text = self.scraper.extract_main_content(html) or ""
+        if len(text) < Config.FETCH_MIN_TEXT_CHARS:
+            return False
+        lowered = text[:2000].lower()
+        return not any(marker in lowered for marker in BROWSER_REQUIRED_MARKERS)
+
+    def fetch_http(self, url: str):
+        """
+        Usage: Plain GET with connection reuse and conditional revalidation.
+        Parameters: url (str)
+        Returns: str: The HTML, or None when the response is an error, a bot wall challenge or not HTML.
+        Raises: RetryableFetchError on 429 and 5xx that are not challenges, so the scheduler can back off and retry.
+        """
+        cached = self.validators.get(url)
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self.session.get(url, headers=headers, timeout=Config.FETCH_HTTP_TIMEOUT_SECONDS, allow_redirects=True)
+        if response.status_code == 304 and cached:
+            self._count("not_modified")
+            return cached["html"]
+        if is_challenge(response):
+            # backing off would only meet the same wall again, the browser can solve it
+            self._count("challenged")
+            return None
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableFetchError(response.status_code, parse_retry_after(response.headers.get("Retry-After")))
+        if response.status_code != 200:
+            return None
+        if "html" not in response.headers.get("Content-Type", "text/html").lower():
+            return None
+
+        html = response.text
+        if response.headers.get("ETag") or response.headers.get("Last-Modified"):
+            self.validators.set(url, {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "html": html
+            })
+        return html
+
+    def fetch(self, url: str):
+        """
+        Usage: Fetch a page through the cheapest tier that returns readable content.
+        Parameters: url (str)
+        Returns: str: The HTML of the page, or None when every tier failed.
+        Raises: RetryableFetchError when the site throttles or fails over plain HTTP, see FetchScheduler.
+        """
+        domain = self.domain_of(url)
+        if self.domain_tiers.get(domain) == BROWSER_TIER:
+            self._count("skipped_http")
+        else:
+            try:
+                html = self.fetch_http(url)
+                if self.is_readable(html):
+                    self.domain_tiers.set(domain, HTTP_TIER)
+                    self._count("http")
+                    return html
+            except requests.RequestException as exception:
+                print(f"HTTP fetch failed, using the browser: {exception}")
+            self._count("escalated")
+
+        return self.fetch_browser(url)
+
+    def fetch_browser(self, url: str):
+        """
+        Usage: Fetch a page with the remote browser and remember that its domain needs it.
+        Parameters: url (str)
+        Returns: str: The HTML of the page, or None when the browser failed too.
+        """
+        html = self.scraper.scrape_web(url)
+        if html:
+            self.domain_tiers.set(self.domain_of(url), BROWSER_TIER)
+            self._count("browser")
+        else:
+            self._count("failed")
+        return html
+
+    def get_stats(self):
+        """
+        Usage: Pages served per tier and the size of the domain memory.
+        Returns: dict
+        """
+        with self.lock:
+            counters = dict(self.counters)
+        return {**counters, "domains": len(self.domain_tiers), "validators": len(self.validators)}
@@ -0,0 +1,164 @@
+import bisect
+import heapq
+import html
+import math
+import re
+import threading
+from collections import Counter
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of", "on", "or",
+    "that", "the", "this", "to", "was", "were", "with"
+}
+
+# a match in the title counts three times, in a tag or category twice, in the summary once
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "category": 2, "summary": 1}
+
+
+def tokenize(text: str) -> list:
+    """
+    Usage: Split text into lowercase search terms, HTML tags and entities are removed first.
+    Parameters: text (str)
+    Returns: list: The terms, stopwords and single characters dropped.
+    """
+    if not text:
+        return []
+    text = html.unescape(TAG_PATTERN.sub(" ", text)).lower()
+    return [token for token in TOKEN_PATTERN.findall(text) if len(token) > 1 and token not in STOPWORDS]
+
+
+def document_terms(card: dict) -> Counter:
+    """
+    Usage: Weighted term frequencies of a card over title, tags, category and summary.
+    Parameters: card (dict): A card document, only the indexed fields are read.
+    Returns: Counter: term -> weighted frequency
+    """
+    terms = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        value = card.get(field)
+        if isinstance(value, list):
+            value = " ".join(str(item) for item in value if item)
+        for token in tokenize(value):
+            terms[token] += weight
+    return terms
+
+
+class KeywordIndex:
+    """
+    In-process inverted index with BM25 ranking and prefix completion over one set of cards.
+    Postings map a term to {card_id: weighted frequency}, the sorted vocabulary used for prefix
+    lookups is rebuilt lazily after changes. Thread-safe, documents can be added, replaced and
+    removed while searches are running.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, max_prefix_terms: int = 20):
+        self.k1 = k1
+        self.b = b
+        self.max_prefix_terms = max_prefix_terms
+        self.postings = {}
+        self.documents = {}
+        self.lengths = {}
+        self.total_length = 0
+        self.vocabulary = []
+        self.vocabulary_dirty = False
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add_document(self, card_id: str, card: dict):
+        """
+        Usage: Index a card, replacing the previous version of it.
+        Parameters: card_id (str), card (dict): A card document with title/tags/category/summary.
+        """
+        terms = document_terms(card)
+        with self.lock:
+            self._remove(card_id)
+            self.documents[card_id] = terms
+            self.lengths[card_id] = sum(terms.values())
+            self.total_length += self.lengths[card_id]
+            for term, frequency in terms.items():
+                if term not in self.postings:
+                    self.postings[term] = {}
+                    self.vocabulary_dirty = True
+                self.postings[term][card_id] = frequency
+
+    def remove_document(self, card_id: str):
+        with self.lock:
+            self._remove(card_id)
+
+    def _remove(self, card_id: str):
+        terms = self.documents.pop(card_id, None)
+        if not terms:
+            return
+        self.total_length -= self.lengths.pop(card_id, 0)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(card_id, None)
+            if not posting:
+                del self.postings[term]
+                self.vocabulary_dirty = True
+
+    def _expand_prefix(self, prefix: str) -> list:
+        # caller holds the lock
+        if self.vocabulary_dirty:
+            self.vocabulary = sorted(self.postings)
+            self.vocabulary_dirty = False
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        # every term starting with prefix sorts before prefix followed by the highest code point
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff", start)
+        matches = self.vocabulary[start:end]
+        # the most common completions when a short prefix matches a lot of terms
+        if len(matches) > self.max_prefix_terms:
+            matches = heapq.nlargest(self.max_prefix_terms, matches, key=lambda term: len(self.postings[term]))
+        return matches
+
+    def search(self, query: str, limit: int = 10, prefix: bool = True):
+        """
+        Usage: Rank the indexed cards against a query with BM25.
+        Parameters: query (str), limit (int), prefix (bool): Also match terms starting with the last query word,
+            unless the query ends with a space or that word is a stopword or a single character.
+        Returns: list: (card_id, score) tuples, best first.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # only the word being typed is a prefix, not an earlier word left last because a stopword or letter was dropped
+        typed = TOKEN_PATTERN.findall(html.unescape(TAG_PATTERN.sub(" ", query)).lower())
+        expand_last = prefix and not query[-1:].isspace() and typed[-1:] == tokens[-1:]
+
+        with self.lock:
+            count = len(self.documents)
+            if not count:
+                return []
+            average_length = self.total_length / count
+            scores = {}
+            for position, token in enumerate(tokens):
+                terms = self._expand_prefix(token) if expand_last and position == len(tokens) - 1 else [token]
+                for term in terms:
+                    posting = self.postings.get(term)
+                    if not posting:
+                        continue
+                    idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for card_id, frequency in posting.items():
+                        norm = self.k1 * (1 - self.b + self.b * self.lengths[card_id] / average_length)
+                        scores[card_id] = scores.get(card_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def suggest(self, prefix: str, limit: int = 10) -> list:
+        """
+        Usage: Typeahead completions of the last word of prefix, most frequent first.
+        Parameters: prefix (str), limit (int)
+        Returns: list: The completed terms.
+        """
+        tokens = TOKEN_PATTERN.findall((prefix or "").lower())
+        if not tokens:
+            return []
+        with self.lock:
+            matches = self._expand_prefix(tokens[-1])
+            return heapq.nlargest(limit, matches, key=lambda term: len(self.postings[term]))
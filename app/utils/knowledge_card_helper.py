@@ -1,4 +1,8 @@
-from app.models import KnowledgeCard
+import html
+import re
+from app.config import Config
+from app.models import KnowledgeCard, KnowledgeCardListItem
+from app.utils.vector_codec import vector_to_list
 
 
 def to_knowledge_card(card) -> KnowledgeCard:
@@ -10,7 +14,8 @@ def to_knowledge_card(card) -> KnowledgeCard:
         tags=card.get("tags",[]),
         note=card.get("note"),
         created_at=card.get("created_at"),
-        embedded_vector=card.get("embedded_vector",[]),
+        embedded_vector=vector_to_list(card.get("embedded_vector")),
+        embedding_model=card.get("embedding_model"),
         source_url=card.get("source_url"),
         thumbnail=card.get("thumbnail"),
         favourite=card.get("favourite", False),
@@ -25,4 +30,57 @@ def to_knowledge_card(card) -> KnowledgeCard:
         bookmarked_by=card.get("bookmarked_by") or [],
         qna=card.get("qna") or [],
         knowledge_map=card.get("knowledge_map") or []
-    )
\ No newline at end of file
+    )
+
+HTML_TAG = re.compile(r"<[^>]+>")
+WHITESPACE = re.compile(r"\s+")
+
+def list_view_projection(viewer_id: str = None):
+    """
+    Usage: $project stage of the card list views. Only the fields shown on a card tile leave the server,
+        the summary is cut down to a prefix for the excerpt and the liked_by/bookmarked_by arrays are
+        reduced to the viewer's flags.
+    Parameters: viewer_id (str): The ID of the user looking at the list.
+    Returns: dict: The projection document.
+    """
+    return {
+        "user_id": 1, "title": 1, "tags": 1, "note": 1, "created_at": 1, "source_url": 1, "thumbnail": 1,
+        "favourite": 1, "archive": 1, "category": 1, "shared_token": 1, "public": 1, "likes": 1, "copied_from": 1,
+        # summaries are html, take enough characters to still have an excerpt once the markup is stripped
+        "excerpt": {"$substrCP": [{"$ifNull": ["$summary", ""]}, 0, Config.CARD_EXCERPT_LENGTH * 4]},
+        "liked_by_me": {"$in": [viewer_id, {"$ifNull": ["$liked_by", []]}]},
+        "bookmarked_by_me": {"$in": [viewer_id, {"$ifNull": ["$bookmarked_by", []]}]}
+    }
+
+def make_excerpt(text: str) -> str:
+    """
+    Usage: Plain text excerpt of an html summary, cut at a word boundary.
+    Parameters: text (str): The summary or a prefix of it.
+    Returns: str: At most CARD_EXCERPT_LENGTH characters.
+    """
+    text = WHITESPACE.sub(" ", html.unescape(HTML_TAG.sub(" ", text or ""))).strip()
+    if len(text) <= Config.CARD_EXCERPT_LENGTH:
+        return text
+    return text[:Config.CARD_EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+
+def to_knowledge_card_list_item(card) -> KnowledgeCardListItem:
+    return KnowledgeCardListItem(
+        card_id=str(card["_id"]),
+        user_id=str(card["user_id"]),
+        title=card.get("title"),
+        excerpt=make_excerpt(card.get("excerpt")),
+        tags=card.get("tags") or [],
+        note=card.get("note"),
+        created_at=card.get("created_at"),
+        source_url=card.get("source_url"),
+        thumbnail=card.get("thumbnail"),
+        favourite=card.get("favourite", False),
+        archive=card.get("archive", False),
+        category=card.get("category") or [],
+        shared_token=card.get("shared_token"),
+        public=card.get("public", False),
+        likes=card.get("likes", 0),
+        copied_from=str(card.get("copied_from")) if card.get("copied_from") else None,
+        liked_by_me=card.get("liked_by_me", False),
+        bookmarked_by_me=card.get("bookmarked_by_me", False)
+    )
@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+from bson import ObjectId
+
+NEWEST_FIRST = {"created_at": -1, "_id": -1}
+
+def _encode(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+
+def encode_cursor(created_at: datetime, card_id) -> str:
+    """
+    Usage: Opaque cursor pointing just after a card in a newest-first feed.
+    Parameters: created_at (datetime), card_id (str | ObjectId): The last card of the page.
+    Returns: str: A url-safe cursor.
+    """
+    return _encode({"t": created_at.isoformat() if created_at else None, "id": str(card_id)})
+
+def decode_cursor(cursor: str):
+    """
+    Usage: Inverse of encode_cursor.
+    Parameters: cursor (str)
+    Returns: tuple: (created_at, ObjectId)
+    Raises: ValueError when the cursor is malformed.
+    """
+    try:
+        payload = _decode(cursor)
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return created_at, ObjectId(payload["id"])
+    except Exception as exception:
+        raise ValueError(f"Invalid cursor: {cursor}") from exception
+
+def keyset_filter(cursor: str) -> dict:
+    """
+    Usage: Filter selecting the cards that come after the cursor in (created_at desc, _id desc) order.
+        Together with the (…, created_at, _id) indexes this seeks straight to the page instead of skipping.
+    Parameters: cursor (str): A cursor from encode_cursor.
+    Returns: dict: The query filter.
+    """
+    created_at, card_id = decode_cursor(cursor)
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": card_id}}
+    ]}
+
+def encode_rank_cursor(score: float, card_id) -> str:
+    """
+    Usage: Opaque cursor pointing just after an entry of a feed ranked by (score desc, _id desc).
+    Parameters: score (float), card_id (str | ObjectId): The last entry of the page.
+    Returns: str: A url-safe cursor.
+    """
+    return _encode({"s": score, "id": str(card_id)})
+
+def rank_keyset_filter(cursor: str) -> dict:
+    """
+    Usage: Filter selecting the entries that come after a cursor from encode_rank_cursor.
+    Parameters: cursor (str)
+    Returns: dict: The query filter.
+    Raises: ValueError when the cursor is malformed.
+    """
+    try:
+        payload = _decode(cursor)
+        score, card_id = float(payload["s"]), ObjectId(payload["id"])
+    except Exception as exception:
+        raise ValueError(f"Invalid cursor: {cursor}") from exception
+    return {"$or": [
+        {"score": {"$lt": score}},
+        {"score": score, "_id": {"$lt": card_id}}
+    ]}
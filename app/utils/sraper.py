@@ -1,31 +1,65 @@
+import threading
 from selenium.webdriver import Remote, ChromeOptions
 from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
 from bs4 import BeautifulSoup
 from app.config import Config
+from app.utils.browser_pool import BrowserSessionPool
+from app.utils.content_extractor import extract_main_text
+from app.utils.chunker import chunk_text
 
 SBR_WEBDRIVER = f'https://{Config.AUTH}@brd.superproxy.io:9515'
 
+# markers of the common challenge pages, checked before paying for Captcha.waitForSolve
+CAPTCHA_MARKERS = ("g-recaptcha", "hcaptcha", "cf-challenge", "challenge-platform", "captcha-delivery", "px-captcha", "arkoselabs")
+CAPTCHA_TITLES = ("just a moment", "attention required", "are you a robot", "verify you are human")
+
+def create_remote_driver():
+    """
+    Usage: Open a new remote Chromium session on the scraping browser
+    Returns: selenium Remote webdriver
+    """
+    print('Connecting to the browser...')
+    sbr_connection = ChromiumRemoteConnection(SBR_WEBDRIVER, 'goog', 'chrome')
+    return Remote(sbr_connection, options=ChromeOptions())
+
 class Scraper:
 
+    def __init__(self, create_driver=None):
+        self.browser_pool = BrowserSessionPool(create_driver or create_remote_driver)
+        self.captcha_checks = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def captcha_detected(driver) -> bool:
+        """
+        Usage: Whether the loaded page is a captcha or bot challenge
+        Parameters: driver: webdriver on the loaded page
+        Returns: bool
+        """
+        title = (driver.title or "").lower()
+        if any(marker in title for marker in CAPTCHA_TITLES):
+            return True
+        source = driver.page_source.lower()
+        return any(marker in source for marker in CAPTCHA_MARKERS)
+
     def scrape_web(self, website):
         """
-        Usage: to scrape the website content using the selenium webdriver
+        Usage: to scrape the website content using a pooled selenium webdriver session
         Parameters: website url
         Returns: html content of the website
         """
         try:
-            print('Connecting to the browser...')
-            sbr_connection = ChromiumRemoteConnection(SBR_WEBDRIVER, 'goog', 'chrome')
-            with Remote(sbr_connection, options=ChromeOptions()) as driver:
-                print('Connected! Navigating...')
+            with self.browser_pool.session() as driver:
                 driver.get(website)
-                # capta handling
-                solve_res = driver.execute('executeCdpCommand', {
-                    'cmd' : 'Captcha.waitForSolve',
-                    'params' : {'detectTimeout' : 10000},
-                })
-                print('captcha solving status :', solve_res['value']['status'])
-                print("navigated, scraping page content...")
+                # capta handling, only when the page is a challenge
+                if self.captcha_detected(driver):
+                    with self.lock:
+                        self.captcha_checks += 1
+                    solve_res = driver.execute('executeCdpCommand', {
+                        'cmd' : 'Captcha.waitForSolve',
+                        'params' : {'detectTimeout' : Config.CAPTCHA_DETECT_TIMEOUT_MS},
+                    })
+                    print('captcha solving status :', solve_res['value']['status'])
                 html = driver.page_source
                 return html
             
@@ -33,6 +67,34 @@ class Scraper:
             print(f"An error occurred: {exception}")
             return None
 
+    def get_stats(self):
+        """
+        Usage: Browser pool and throughput counters
+        Returns: dict
+        """
+        with self.lock:
+            captcha_checks = self.captcha_checks
+        return {**self.browser_pool.get_stats(), "captcha_checks": captcha_checks}
+
+    def close(self):
+        self.browser_pool.close()
+
+    def extract_main_content(self, html):
+        """
+        Usage: to extract the readable main content of a page in a single lxml pass, navs, cookie banners, sidebars and similar boilerplate dropped
+        Parameters: html content of the website
+        Returns: cleaned text of the main content, one block per line
+        """
+        try:
+            content = extract_main_text(html)
+            if content:
+                return content
+            # lxml could not make sense of the page, use the BeautifulSoup path
+            return self.clean_body_content(self.extract_body_content(html))
+        except Exception as exception:
+            print(f"An error occurred: {exception}")
+            return None
+
     def extract_body_content(self,html):
         """
         Usage: to extract the body content from the html content
@@ -72,17 +134,14 @@ class Scraper:
             print(f"An error occurred: {exception}")
             return None
 
-    def split_content(self, web_content, max_length=6000):
+    def split_content(self, web_content, max_tokens=None):
         """
-        Usage: to split the content into chunks to pass to the summarizer
-        Parameters: web content, max length of each chunk
+        Usage: to split the content into chunks to pass to the summarizer, on paragraph and sentence boundaries within a token budget
+        Parameters: web content, max tokens of each chunk (defaults to CHUNK_MAX_TOKENS)
         Returns: list of content chunks
         """
         try:
-            return [
-                web_content[i:i+max_length] for i in range(0, len(web_content), max_length)
-        ]
+            return chunk_text(web_content, max_tokens=max_tokens)
         except Exception as exception:
             print(f"An error occurred: {exception}")
             return None
-
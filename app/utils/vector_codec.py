@@ -0,0 +1,45 @@
+import numpy as np
+from bson.binary import Binary
+
+# BSON binary subtype 9 (vector) with the float32 dtype byte, the layout MongoDB vector search reads
+VECTOR_SUBTYPE = 9
+FLOAT32_DTYPE = b"\x27\x00"
+
+
+def encode_vector(vector):
+    """
+    Usage: Pack an embedding as little-endian float32 in a BSON Binary, 4 bytes per dimension
+        instead of a BSON array of doubles with per-element keys and type bytes.
+    Parameters: vector (list | np.ndarray | Binary): The embedding, already encoded values are returned as is.
+    Returns: Binary: The packed vector, or [] for an empty/missing vector so "no embedding" keeps its meaning.
+    """
+    if isinstance(vector, Binary):
+        return vector
+    if vector is None or len(vector) == 0:
+        return []
+    data = np.asarray(vector, dtype="<f4").tobytes()
+    return Binary(FLOAT32_DTYPE + data, VECTOR_SUBTYPE)
+
+
+def decode_vector(value) -> np.ndarray:
+    """
+    Usage: Read a stored embedding as a float32 array, packed vectors are viewed in place with np.frombuffer.
+    Parameters: value (Binary | list | None): The stored value, lists written before the migration are still accepted.
+    Returns: np.ndarray: 1-D float32 array, empty when there is no embedding. Packed vectors are read-only views.
+    """
+    if isinstance(value, Binary):
+        return np.frombuffer(value, dtype="<f4", offset=len(FLOAT32_DTYPE))
+    if value is None or len(value) == 0:
+        return np.empty(0, dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def vector_to_list(value) -> list:
+    """
+    Usage: Stored embedding as a plain list of floats, for the pydantic models and API responses.
+    Parameters: value (Binary | list | None)
+    Returns: list
+    """
+    if isinstance(value, Binary):
+        return decode_vector(value).tolist()
+    return value or []
@@ -0,0 +1,68 @@
+"""
+Chunk count and characters sent to the summarizer, chunk_text against the fixed 6000 character
+slicing that Scraper.split_content used before.
+
+    python -m benchmarks.bench_chunker
+"""
+import random
+import time
+from app.utils.chunker import chunk_text
+
+WORDS = ("data cache latency memory query index vector model token budget throughput replica shard "
+         "request response server client queue worker batch stream").split()
+
+
+def old_split(text: str, max_length: int = 6000):
+    return [text[i:i + max_length] for i in range(0, len(text), max_length)]
+
+
+def article(rng: random.Random, paragraphs: int) -> str:
+    """Prose with a footer repeated on every 'page' and a share line between sections."""
+    lines = []
+    for index in range(paragraphs):
+        sentences = [" ".join(rng.choices(WORDS, k=rng.randint(8, 22))).capitalize() + "." for _ in range(rng.randint(2, 6))]
+        lines.append(" ".join(sentences))
+        if index % 8 == 7:
+            lines.append("Copyright Example Corp. All rights reserved. Terms of use and privacy policy.")
+            lines.append("Share this")
+    return "\n".join(lines)
+
+
+def transcript(rng: random.Random, segments: int) -> str:
+    """A caption track that loops over the same chorus."""
+    chorus = [" ".join(rng.choices(WORDS, k=12)) for _ in range(6)]
+    lines = []
+    for index in range(segments):
+        lines.extend(chorus if index % 3 == 0 else [" ".join(rng.choices(WORDS, k=12)) for _ in range(6)])
+    return "\n".join(lines)
+
+
+def measure(split, documents):
+    started = time.perf_counter()
+    chunks = [split(document) for document in documents]
+    elapsed = time.perf_counter() - started
+    return sum(map(len, chunks)), sum(len(chunk) for document in chunks for chunk in document), elapsed
+
+
+def main():
+    rng = random.Random(0)
+    corpora = {
+        "articles": [article(rng, rng.randint(20, 300)) for _ in range(50)],
+        "transcripts": [transcript(rng, rng.randint(20, 200)) for _ in range(50)],
+    }
+    splitters = {
+        "fixed 6000 chars": old_split,
+        "chunk_text 1500 tokens": lambda text: chunk_text(text, max_tokens=1500, overlap_tokens=0),
+        "chunk_text default": chunk_text,
+    }
+    print(f"{'corpus':<12} {'splitter':<24} {'chunks':>7} {'chars sent':>11} {'ms':>8}")
+    for corpus, documents in corpora.items():
+        source_chars = sum(map(len, documents))
+        print(f"{corpus:<12} {'(source)':<24} {'':>7} {source_chars:>11}")
+        for name, split in splitters.items():
+            chunks, chars, elapsed = measure(split, documents)
+            print(f"{corpus:<12} {name:<24} {chunks:>7} {chars:>11} {elapsed * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Cost of placing one new card in a user's clusters at 1k, 10k and 50k cards: the full recluster that
+used to run inside the ingestion and copy requests, against the incremental assignment that runs there now
+(nearest centroid, then one atomic $inc of the centroid sum, not timed here as it is a single update).
+
+    python -m benchmarks.bench_clustering [--cards 1000 10000 50000] [--dimensions 384] [--dense-max 10000]
+
+The dense backend builds the N x N distance matrix and is only run up to --dense-max cards.
+"""
+import argparse
+import time
+import numpy as np
+from app.config import Config
+from app.utils.clustering_module import clustering_module, nearest_centroid
+
+
+def topic_vectors(cards: int, dimensions: int, seed: int = 0):
+    """Cards around one topic per 50 cards plus 10% unrelated cards, like a real collection."""
+    rng = np.random.default_rng(seed)
+    topics = max(1, cards // 50)
+    centers = rng.normal(size=(topics, dimensions))
+    clustered = int(cards * 0.9)
+    vectors = centers[rng.integers(topics, size=clustered)] + rng.normal(scale=0.25, size=(clustered, dimensions))
+    return np.vstack([vectors, rng.normal(size=(cards - clustered, dimensions))]).astype(np.float32)
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--dense-max", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'cards':>7} {'clusters':>9} {'dense recluster s':>18} {'radius recluster s':>19} {'incremental assign ms':>22}")
+    for cards in args.cards:
+        vectors = topic_vectors(cards, args.dimensions)
+        dense = "skipped"
+        if cards <= args.dense_max:
+            seconds, _ = timed(clustering_module, vectors, Config.CLUSTER_EPS, Config.CLUSTER_MIN_SAMPLES, backend="dense")
+            dense = f"{seconds:.2f}"
+        radius_seconds, labels = timed(clustering_module, vectors, Config.CLUSTER_EPS, Config.CLUSTER_MIN_SAMPLES, backend="radius")
+
+        centroids = np.vstack([vectors[labels == label].mean(axis=0) for label in set(labels) if label != -1])
+        new_cards = topic_vectors(args.repeat, args.dimensions, seed=1)
+        started = time.perf_counter()
+        for vector in new_cards:
+            nearest_centroid(vector, centroids)
+        assign_ms = (time.perf_counter() - started) / args.repeat * 1000
+
+        print(f"{cards:>7} {len(centroids):>9} {dense:>18} {radius_seconds:>19.2f} {assign_ms:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Requests/sec of the home feed (get_all_cards) and the dashboard (get_dashboard_data) against a real MongoDB:
+the sync KnowledgeCardDao called through the io pool, as the routes did before, side by side with the
+AsyncKnowledgeCardDao (motor) the routes await now.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.bench_dao [--deep-page 1000]
+
+It also measures the latency of page 1 against page --deep-page of the home feed of one user with enough
+cards to have that many pages, with skip/limit and with the keyset cursor, through KnowledgeCardDao.get_all_cards,
+and the first and last page of the bookmarks of a user with --bookmarks bookmarked cards: the $slice of ids plus
+one $in query of KnowledgeCardService.get_bookmarked_cards, against the user document plus one get_card_by_id per
+card that it replaced.
+
+Cards are written to a separate database that is dropped at the end, the dashboard cache is bypassed so
+every request reaches the server. Both drivers use the pool options of app.database.connection.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from app.config import Config
+from app.dao import knowledge_card_dao, async_knowledge_card_dao, user_dao
+from app.dao.knowledge_card_dao import invalidate_dashboard, all_cards_filter
+from app.database import db_instance, async_db_instance
+from app.database.indexes import INDEX_SPECS
+from app.services import knowledge_card_service
+from app.utils import encode_cursor, NEWEST_FIRST
+from app.utils.executor import BlockingExecutor
+
+BENCH_DB = "brieffydb_bench"
+FEED_PAGE_SIZE = 20
+
+
+def card_document(user_id: ObjectId, index: int, now: datetime, rng: random.Random, user_ids: list):
+    """A card with a summary, a binary-sized vector and a bookmark by another user, like production documents."""
+    return {
+        "user_id": user_id, "title": f"Card {index}", "summary": "<p>" + "summary text " * 400 + "</p>",
+        "tags": ["bench"], "created_at": now - timedelta(minutes=index), "embedded_vector": [rng.random() for _ in range(384)],
+        "favourite": index % 7 == 0, "archive": index % 11 == 0, "public": index % 3 == 0, "likes": 0,
+        "source_url": f"https://example.com/{index}" if index % 2 else None,
+        "bookmarked_by": [str(rng.choice(user_ids))], "liked_by": [],
+    }
+
+
+def seed(db, users: int, cards_per_user: int):
+    rng = random.Random(0)
+    user_ids = [ObjectId() for _ in range(users)]
+    now = datetime.utcnow()
+    documents = [card_document(user_id, index, now, rng, user_ids) for user_id in user_ids for index in range(cards_per_user)]
+    db.knowledge_cards_collection.insert_many(documents)
+    db.knowledge_cards_collection.create_indexes(INDEX_SPECS["knowledge_cards_collection"])
+    return [str(user_id) for user_id in user_ids]
+
+
+def seed_deep_user(db, pages: int, user_ids: list):
+    """One user whose home feed has pages full pages, one card in eleven is archived and not in the feed."""
+    rng = random.Random(1)
+    user_id = ObjectId()
+    now = datetime.utcnow()
+    count = pages * FEED_PAGE_SIZE * 11 // 10 + FEED_PAGE_SIZE
+    for start in range(0, count, 5000):
+        db.knowledge_cards_collection.insert_many([
+            card_document(user_id, index, now, rng, user_ids) for index in range(start, min(count, start + 5000))
+        ])
+    return str(user_id)
+
+
+def latency_ms(call, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def deep_pages(db, user_id: str, page: int, repeat: int):
+    """p50/p99 of page 1 and page `page` of a home feed with skip/limit and with the cursor, through the DAO."""
+    skip = (page - 1) * FEED_PAGE_SIZE
+    # the cursor a client holds after reading page - 1 pages: the last card of the page before
+    last = next(db.knowledge_cards_collection.find(all_cards_filter(user_id), {"created_at": 1})
+                .sort(list(NEWEST_FIRST.items())).skip(skip - 1).limit(1))
+    cursor = encode_cursor(last["created_at"], last["_id"])
+    calls = {
+        ("skip", 1): lambda: knowledge_card_dao.get_all_cards(user_id, 0, FEED_PAGE_SIZE),
+        ("skip", page): lambda: knowledge_card_dao.get_all_cards(user_id, skip, FEED_PAGE_SIZE),
+        ("cursor", 1): lambda: knowledge_card_dao.get_all_cards(user_id, limit=FEED_PAGE_SIZE + 1, cursor=None),
+        ("cursor", page): lambda: knowledge_card_dao.get_all_cards(user_id, limit=FEED_PAGE_SIZE + 1, cursor=cursor),
+    }
+    # both modes must return the same page
+    assert [card.card_id for card in calls[("skip", page)]()] == [card.card_id for card in calls[("cursor", page)]()][:FEED_PAGE_SIZE]
+
+    print(f"\nhome feed of one user, {FEED_PAGE_SIZE} cards per page")
+    print(f"{'pagination':<10} {'page':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for (mode, number), call in calls.items():
+        call()
+        p50, p99 = latency_ms(call, repeat)
+        print(f"{mode:<10} {number:>6} {p50:>9.2f} {p99:>9.2f}")
+
+
+def seed_bookmarks(db, bookmarks: int):
+    """A user who bookmarked `bookmarks` cards, taken from the seeded ones, newest bookmark last."""
+    card_ids = [str(card["_id"]) for card in db.knowledge_cards_collection.find({}, {"_id": 1}).limit(bookmarks)]
+    user_id = db.users_collection.insert_one({"email": "bookmarks@example.com", "bookmarked_cards": card_ids}).inserted_id
+    return str(user_id), len(card_ids)
+
+
+def bookmarks_per_card(user_id: str, skip: int, limit: int):
+    """The bookmarks page before the $in query: the whole user document, then one find_one per bookmarked card."""
+    user = user_dao.get_user_by_id(user_id)
+    # get_card_by_id logs every call
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [knowledge_card_dao.get_card_by_id(card_id) for card_id in user["bookmarked_cards"][skip:skip + limit]]
+
+
+def bookmark_pages(user_id: str, bookmarks: int, repeat: int):
+    """p50/p99 of the first and last bookmarks page, current service against the per-card reads."""
+    limit = Config.BOOKMARKS_PAGE_MAX_SIZE
+    last = max(0, bookmarks - limit)
+    calls = {
+        ("$slice + $in", 0): lambda: knowledge_card_service.get_bookmarked_cards(user_id, 0, limit),
+        ("$slice + $in", last): lambda: knowledge_card_service.get_bookmarked_cards(user_id, last, limit),
+        ("per card", 0): lambda: bookmarks_per_card(user_id, 0, limit),
+        ("per card", last): lambda: bookmarks_per_card(user_id, last, limit),
+    }
+    assert len(calls[("$slice + $in", last)]()) == len(calls[("per card", last)]())
+
+    print(f"\nbookmarks of one user with {bookmarks} bookmarked cards, {limit} cards per page")
+    print(f"{'query':<14} {'skip':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for (mode, skip), call in calls.items():
+        call()
+        p50, p99 = latency_ms(call, repeat)
+        print(f"{mode:<14} {skip:>6} {p50:>9.2f} {p99:>9.2f}")
+
+
+def sync_calls(executor: BlockingExecutor):
+    def dashboard(user_id):
+        invalidate_dashboard(user_id)
+        return knowledge_card_dao.get_dashboard_data(user_id)
+
+    return {
+        "get_all_cards": lambda user_id: executor.run_io(knowledge_card_dao.get_all_cards, user_id, 0, FEED_PAGE_SIZE),
+        "get_dashboard_data": lambda user_id: executor.run_io(dashboard, user_id),
+    }
+
+
+def async_calls():
+    async def get_dashboard_data(user_id):
+        invalidate_dashboard(user_id)
+        return await async_knowledge_card_dao.get_dashboard_data(user_id)
+
+    return {
+        "get_all_cards": lambda user_id: async_knowledge_card_dao.get_all_cards(user_id, 0, FEED_PAGE_SIZE),
+        "get_dashboard_data": get_dashboard_data,
+    }
+
+
+async def requests_per_second(call, user_ids: list, total: int, concurrency: int):
+    remaining = iter(range(total))
+
+    async def client():
+        for index in remaining:
+            await call(user_ids[index % len(user_ids)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def run(args, user_ids: list):
+    drivers = {f"sync DAO, io pool {size}": sync_calls(BlockingExecutor(io_workers=size)) for size in args.io_pools}
+    drivers["async DAO (motor)"] = async_calls()
+
+    print(f"{'endpoint':<20} {'driver':<22} " + " ".join(f"{f'c={c}':>9}" for c in args.concurrency))
+    for endpoint in ("get_all_cards", "get_dashboard_data"):
+        for driver, calls in drivers.items():
+            # one warm-up pass fills the connection pools
+            await requests_per_second(calls[endpoint], user_ids, min(args.requests, 200), max(args.concurrency))
+            rates = [await requests_per_second(calls[endpoint], user_ids, args.requests, concurrency) for concurrency in args.concurrency]
+            print(f"{endpoint:<20} {driver:<22} " + " ".join(f"{rate:>9.0f}" for rate in rates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=200, help="cards per user")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per measurement")
+    parser.add_argument("--concurrency", type=lambda value: [int(c) for c in value.split(",")], default=[1, 16, 64])
+    parser.add_argument("--io-pools", type=lambda value: [int(c) for c in value.split(",")], default=[8, Config.IO_POOL_SIZE])
+    parser.add_argument("--deep-page", type=int, default=1000, help="page compared with page 1, 0 to skip")
+    parser.add_argument("--bookmarks", type=int, default=10000, help="bookmarked cards of one user, 0 to skip")
+    parser.add_argument("--latency-repeat", type=int, default=50, help="requests per latency measurement")
+    args = parser.parse_args()
+
+    if not Config.MONGO_URI:
+        raise SystemExit("MONGO_URI is not set, point it at a MongoDB server the benchmark may write to")
+
+    db = db_instance.client[BENCH_DB]
+    db_instance.client.drop_database(BENCH_DB)
+    user_ids = seed(db, args.users, args.cards)
+    # both DAOs read the bench copy, the application database is never touched
+    knowledge_card_dao.knowledge_cards_collection = db.knowledge_cards_collection
+    async_knowledge_card_dao.knowledge_cards_collection = async_db_instance.client[BENCH_DB].knowledge_cards_collection
+    user_dao.users_collection = db.users_collection
+    try:
+        asyncio.run(run(args, user_ids))
+        if args.deep_page > 1:
+            deep_pages(db, seed_deep_user(db, args.deep_page, user_ids), args.deep_page, args.latency_repeat)
+        if args.bookmarks:
+            bookmark_pages(*seed_bookmarks(db, args.bookmarks), args.latency_repeat)
+    finally:
+        db_instance.client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
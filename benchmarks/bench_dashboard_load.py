@@ -0,0 +1,141 @@
+"""
+p50/p99 of GET /knowledge-card/dashboard against a real MongoDB, idle and while card ingestions run
+on the ingestion pool, to check that the pipeline work never stalls the event loop serving cheap endpoints.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.bench_dashboard_load [--requests 2000] [--ingestions 4]
+
+Requests go through the FastAPI app in process (httpx ASGITransport), --concurrency clients at a time.
+The ingestions run KnowledgeCardService.process_knowledge_card on blocking_executor.run_ingestion, as the
+ingestion workers do, with only the network replaced: the fetch sleeps --fetch-ms and returns a saved
+article grown to a long page, summary and metadata each sleep --llm-ms. Extraction, chunking, the insert,
+the search indexes and clustering run for real, and every insert invalidates that user's dashboard.
+
+The dashboard cache is bypassed so every request reaches the server. Cards are written to the database of
+bench_dao, dropped at the end.
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+import httpx
+import numpy as np
+from app import app
+from app.config import Config
+from app.dao import knowledge_card_dao, async_knowledge_card_dao, card_cluster_dao
+from app.dao.knowledge_card_dao import invalidate_dashboard
+from app.database import db_instance, async_db_instance
+from app.services import knowledge_card_service, summary_cache_service
+from app.utils import blocking_executor, fetch_scheduler, gemini_text_processor, embedder_for_title
+from benchmarks.bench_dao import BENCH_DB, seed
+from benchmarks.bench_extractor import grown
+
+ARTICLE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html" / "news_article.html"
+
+
+def replace_network(fetch_ms: float, llm_ms: float):
+    """Stand-ins for the fetch, the Gemini calls and the embedding API, on the shared instances."""
+    page = grown(ARTICLE.read_text(encoding="utf-8"), 20)
+
+    def fetch(url, *args, **kwargs):
+        time.sleep(fetch_ms / 1000)
+        return page
+
+    def summarize_text(chunks, *args, **kwargs):
+        time.sleep(llm_ms / 1000)
+        return "\n".join(f"- {chunk[:200]}" for chunk in chunks)
+
+    def generate_card_metadata(summary, *args, **kwargs):
+        time.sleep(llm_ms / 1000)
+        return {"title": summary[2:60], "tags": ["bench"], "category": "Misc", "icon": None}
+
+    rng = np.random.default_rng(0)
+    fetch_scheduler.fetch = fetch
+    gemini_text_processor.summarize_text = summarize_text
+    gemini_text_processor.generate_card_metadata = generate_card_metadata
+    embedder_for_title.embed_text = lambda text: rng.normal(size=384).tolist()
+    # every ingestion runs the whole pipeline
+    summary_cache_service.get = lambda key: None
+    summary_cache_service.put = lambda key, entry: None
+
+
+async def dashboard_latencies(client: httpx.AsyncClient, user_ids: list, total: int, concurrency: int):
+    remaining = iter(range(total))
+    samples = []
+
+    async def user():
+        for index in remaining:
+            user_id = user_ids[index % len(user_ids)]
+            invalidate_dashboard(user_id)
+            started = time.perf_counter()
+            response = await client.get("/knowledge-card/dashboard", params={"user_id": user_id})
+            samples.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    samples.sort()
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+async def ingest_until(stop: asyncio.Event, user_ids: list, worker: int, ingested: list):
+    number = 0
+    while not stop.is_set():
+        url = f"https://example.com/bench/{worker}/{number}"
+        await blocking_executor.run_ingestion(knowledge_card_service.process_knowledge_card, user_ids[number % len(user_ids)], url)
+        ingested.append(url)
+        number += 1
+
+
+async def run(args, user_ids: list):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # warm-up fills the connection pools
+        await dashboard_latencies(client, user_ids, min(args.requests, 200), args.concurrency)
+        idle = await dashboard_latencies(client, user_ids, args.requests, args.concurrency)
+
+        stop, ingested = asyncio.Event(), []
+        ingestions = [asyncio.create_task(ingest_until(stop, user_ids, worker, ingested)) for worker in range(args.ingestions)]
+        # let every ingestion reach its first fetch before measuring
+        await asyncio.sleep(args.fetch_ms / 1000)
+        started = time.perf_counter()
+        loaded = await dashboard_latencies(client, user_ids, args.requests, args.concurrency)
+        seconds = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*ingestions)
+
+    print(f"{'phase':<28} {'p50 ms':>9} {'p99 ms':>9}")
+    print(f"{'idle':<28} {idle[0]:>9.2f} {idle[1]:>9.2f}")
+    print(f"{f'{args.ingestions} ingestions running':<28} {loaded[0]:>9.2f} {loaded[1]:>9.2f}")
+    print(f"\n{len(ingested)} cards ingested in {seconds:.1f} s while measuring, "
+          f"ingestion pool: {blocking_executor.get_metrics().get('ingestion')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--cards", type=int, default=200, help="cards per user")
+    parser.add_argument("--requests", type=int, default=2000, help="dashboard requests per phase")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--ingestions", type=int, default=Config.INGESTION_WORKERS, help="ingestions running at once")
+    parser.add_argument("--fetch-ms", type=float, default=200)
+    parser.add_argument("--llm-ms", type=float, default=500)
+    args = parser.parse_args()
+
+    if not Config.MONGO_URI:
+        raise SystemExit("MONGO_URI is not set, point it at a MongoDB server the benchmark may write to")
+    db = db_instance.client[BENCH_DB]
+    db_instance.client.drop_database(BENCH_DB)
+    user_ids = seed(db, args.users, args.cards)
+    # reads, inserts and cluster updates all go to the bench copy, the application database is never touched
+    knowledge_card_dao.knowledge_cards_collection = db.knowledge_cards_collection
+    async_knowledge_card_dao.knowledge_cards_collection = async_db_instance.client[BENCH_DB].knowledge_cards_collection
+    card_cluster_dao.clusters_collection = db.clusters_collection
+    card_cluster_dao.cluster_state_collection = db.cluster_state_collection
+    replace_network(args.fetch_ms, args.llm_ms)
+    try:
+        asyncio.run(run(args, user_ids))
+    finally:
+        db_instance.client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    main()
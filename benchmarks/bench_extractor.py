@@ -0,0 +1,63 @@
+"""
+Parse time and output size of extract_main_text against the BeautifulSoup path it replaced
+(extract_body_content + clean_body_content), over the saved pages in tests/fixtures/html.
+
+    python -m benchmarks.bench_extractor [--repeat 200] [--grow 20]
+
+--grow also measures every page with its body repeated that many times, the size of a long article.
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+from app.utils.content_extractor import extract_main_text
+from app.utils.sraper import Scraper
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "html"
+BODY = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.DOTALL | re.IGNORECASE)
+
+
+def grown(html: str, times: int) -> str:
+    return BODY.sub(lambda match: match.group(1) + match.group(2) * times + match.group(3), html)
+
+
+def measure(extract, html: str, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        text = extract(html)
+    return (time.perf_counter() - started) / repeat * 1000, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--grow", type=int, default=20)
+    args = parser.parse_args()
+
+    scraper = Scraper(create_driver=lambda: None)
+    extractors = {
+        "lxml": extract_main_text,
+        "beautifulsoup": lambda html: scraper.clean_body_content(scraper.extract_body_content(html)),
+    }
+    pages = {}
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        pages[path.stem] = html
+        pages[f"{path.stem} x{args.grow}"] = grown(html, args.grow)
+
+    print(f"{'page':<24} {'html chars':>10} " + " ".join(f"{name + ' ms':>16} {name + ' chars':>18}" for name in extractors))
+    totals = {name: [0.0, 0] for name in extractors}
+    for page, html in pages.items():
+        row = []
+        for name, extract in extractors.items():
+            repeat = args.repeat if " x" not in page else max(1, args.repeat // args.grow)
+            milliseconds, chars = measure(extract, html, repeat)
+            totals[name][0] += milliseconds
+            totals[name][1] += chars
+            row.append(f"{milliseconds:>16.2f} {chars:>18}")
+        print(f"{page:<24} {len(html):>10} " + " ".join(row))
+    print(f"{'total':<24} {sum(map(len, pages.values())):>10} " + " ".join(f"{ms:>16.2f} {chars:>18}" for ms, chars in totals.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Relevance and latency of KeywordIndex.search over 100k synthetic cards.
+
+    python -m benchmarks.bench_keyword_search [--cards 100000] [--queries 200]
+
+Each query is built from the title of a known card and searched three ways:
+  complete   all title words, ending with a space
+  typing     the last word cut to its first three letters, the way typeahead sends it
+  stopword   the complete words followed by a stopword ("... the")
+A query hits when its card is in the top 10. "stopword, old" searches the query with the stopword removed,
+which is what the index did before it checked that the typed last word survived tokenizing: the previous
+word was expanded as a prefix and pulled in every card sharing its first letters.
+"""
+import argparse
+import time
+import numpy as np
+from app.utils import KeywordIndex
+
+SYLLABLES = ["ka", "lo", "mi", "ra", "te", "su", "no", "vi", "pe", "do", "ba", "zu", "ni", "ko", "sa", "re"]
+
+
+def vocabulary(size: int, rng) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))))
+    return sorted(words)
+
+
+def build_cards(cards: int, rng):
+    words = vocabulary(20000, rng)
+    # Zipf-like word frequencies, a few common words and a long tail
+    weights = 1 / np.arange(1, len(words) + 1)
+    weights /= weights.sum()
+
+    def text(length):
+        return " ".join(words[position] for position in rng.choice(len(words), size=length, p=weights))
+
+    return {
+        f"card-{number}": {"title": text(rng.integers(3, 7)), "tags": text(2).split(), "summary": text(40)}
+        for number in range(cards)
+    }
+
+
+def run(index: KeywordIndex, queries: list):
+    hits, samples = 0, []
+    for card_id, query in queries:
+        started = time.perf_counter()
+        ranked = index.search(query, limit=10)
+        samples.append((time.perf_counter() - started) * 1000)
+        hits += any(ranked_id == card_id for ranked_id, _ in ranked)
+    samples.sort()
+    return hits / len(queries), samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    cards = build_cards(args.cards, rng)
+    index = KeywordIndex()
+    started = time.perf_counter()
+    for card_id, card in cards.items():
+        index.add_document(card_id, card)
+    print(f"indexed {len(index)} cards in {time.perf_counter() - started:.1f} s, {len(index.postings)} terms")
+
+    targets = [f"card-{number}" for number in rng.choice(args.cards, size=args.queries, replace=False)]
+    titles = {card_id: cards[card_id]["title"] for card_id in targets}
+    variants = {
+        "complete": [(card_id, title + " ") for card_id, title in titles.items()],
+        "typing": [(card_id, title[:title.rfind(" ") + 1] + title.split()[-1][:3]) for card_id, title in titles.items()],
+        "stopword": [(card_id, title + " the") for card_id, title in titles.items()],
+        "stopword, old": [(card_id, title) for card_id, title in titles.items()],
+    }
+
+    print(f"{'query':<14} {'hit@10':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, queries in variants.items():
+        hit_rate, p50, p99 = run(index, queries)
+        print(f"{name:<14} {hit_rate:>7.1%} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Pages/minute of the browser tier with a stub WebDriver that sleeps like the remote scraping browser:
+a new session per page with Captcha.waitForSolve on every page (what scrape_web did before the pool),
+against Scraper.scrape_web on the pooled sessions that only waits on challenge pages.
+
+    python -m benchmarks.bench_scraper [--connect 1.5] [--page 0.8] [--captcha 2.0]
+
+Latencies are in seconds and scaled down by --scale so a run takes seconds, pages/minute is reported at
+full scale.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.browser_pool import BrowserSessionPool
+from app.utils.sraper import Scraper, CAPTCHA_MARKERS
+
+
+class SleepingDriver:
+    """Remote session stand-in, every call costs the latency of the real one."""
+
+    def __init__(self, latencies: dict):
+        self.latencies = latencies
+        time.sleep(latencies["connect"])
+        self.title = ""
+        self.page_source = ""
+
+    def get(self, url):
+        time.sleep(self.latencies["page"])
+        self.title = url
+        self.page_source = f"<html><body><div class='{CAPTCHA_MARKERS[0]}'></div></body></html>" if "challenge" in url else "<html><body><p>article</p></body></html>"
+
+    def execute(self, command, params):
+        time.sleep(self.latencies["captcha"] if "challenge" in self.title else self.latencies["captcha_idle"])
+        return {"value": {"status": "solve_finished" if "challenge" in self.title else "not_detected"}}
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        pass
+
+
+def scrape_unpooled(latencies: dict, url: str):
+    driver = SleepingDriver(latencies)
+    driver.get(url)
+    driver.execute("executeCdpCommand", {"cmd": "Captcha.waitForSolve", "params": {}})
+    html = driver.page_source
+    driver.quit()
+    return html
+
+
+def pages_per_minute(scrape, urls: list, workers: int, scale: float):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(scrape, urls))
+    elapsed = (time.perf_counter() - started) / scale
+    assert all(pages)
+    return len(urls) / elapsed * 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connect", type=float, default=1.5, help="seconds to open a remote session")
+    parser.add_argument("--page", type=float, default=0.8, help="seconds to load a page")
+    parser.add_argument("--captcha", type=float, default=2.0, help="seconds waitForSolve takes on a challenge page")
+    parser.add_argument("--captcha-idle", type=float, default=1.0, help="seconds waitForSolve takes when there is no challenge")
+    parser.add_argument("--challenge-share", type=float, default=0.1, help="share of pages that are challenges")
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--scale", type=float, default=0.02)
+    args = parser.parse_args()
+
+    latencies = {name: getattr(args, name) * args.scale for name in ("connect", "page", "captcha", "captcha_idle")}
+    every = max(1, round(1 / args.challenge_share)) if args.challenge_share else args.pages + 1
+    urls = [f"https://example.com/{'challenge' if index % every == 0 else 'article'}/{index}" for index in range(args.pages)]
+
+    scraper = Scraper(create_driver=lambda: SleepingDriver(latencies))
+    scraper.browser_pool = BrowserSessionPool(scraper.browser_pool.create_driver, max_size=args.pool_size)
+
+    print(f"{'mode':<36} {'pages/min':>10}")
+    rate = pages_per_minute(lambda url: scrape_unpooled(latencies, url), urls, args.pool_size, args.scale)
+    print(f"{'new session + waitForSolve per page':<36} {rate:>10.1f}")
+    rate = pages_per_minute(scraper.scrape_web, urls, args.pool_size, args.scale)
+    print(f"{'pooled, waitForSolve on challenges':<36} {rate:>10.1f}")
+    stats = scraper.get_stats()
+    print(f"sessions created {stats['created']}, recycled {stats['recycled']}, captcha checks {stats['captcha_checks']}")
+    scraper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Latency of semantic search over a user with 20k cards: the first search that builds the user's matrix,
+warm searches on the cached matrix, and warm searches of other users while that matrix is being loaded.
+
+    python -m benchmarks.bench_search [--cards 20000] [--dimensions 384] [--repeat 500] [--read-ms 300]
+
+The cards come from an in-memory stand-in for get_card_vectors that returns packed vectors like Mongo does,
+sleeping --read-ms to stand in for the collection read. Query embedding is not timed, queries are random vectors.
+"""
+import argparse
+import importlib
+import threading
+import time
+import numpy as np
+from bson import ObjectId
+from app.services import SemanticSearchService
+from app.utils import encode_vector
+
+search_file = importlib.import_module("app.services.semantic_search_service")
+
+
+class StoredVectors:
+    def __init__(self, users: dict, read_seconds: float):
+        self.users = users
+        self.read_seconds = read_seconds
+
+    def get_card_vectors(self, user_id, model_id=None):
+        time.sleep(self.read_seconds)
+        return self.users[user_id]
+
+
+def stored_cards(cards: int, dimensions: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(cards, dimensions)).astype(np.float32)
+    return [{"_id": ObjectId(), "embedded_vector": encode_vector(vector)} for vector in vectors]
+
+
+def percentiles(samples: list):
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--repeat", type=int, default=500)
+    parser.add_argument("--read-ms", type=float, default=300)
+    args = parser.parse_args()
+
+    big_user, other_user = str(ObjectId()), str(ObjectId())
+    store = StoredVectors({
+        big_user: stored_cards(args.cards, args.dimensions, seed=0),
+        other_user: stored_cards(1000, args.dimensions, seed=1),
+    }, read_seconds=0)
+    search_file.knowledge_card_dao = store
+    queries = np.random.default_rng(2).normal(size=(args.repeat, args.dimensions)).astype(np.float32)
+
+    service = SemanticSearchService()
+    started = time.perf_counter()
+    service.rank(big_user, queries[0], 10)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        service.rank(big_user, query, 10)
+        samples.append((time.perf_counter() - started) * 1000)
+    warm_p50, warm_p99 = percentiles(samples)
+
+    # other users keep searching while big_user's matrix is evicted and read again, slowly
+    service.rank(other_user, queries[0], 10)
+    store.read_seconds = args.read_ms / 1000
+    stop = threading.Event()
+
+    def reload_big_user():
+        while not stop.is_set():
+            service.indexes.delete(big_user)
+            service.rank(big_user, queries[0], 10)
+
+    loader = threading.Thread(target=reload_big_user)
+    loader.start()
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        service.rank(other_user, query, 10)
+        samples.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    loader.join()
+    during_p50, during_p99 = percentiles(samples)
+
+    print(f"{'cards':>7} {'first search ms':>16} {'warm p50 ms':>12} {'warm p99 ms':>12} "
+          f"{'other user p50 ms':>18} {'other user p99 ms':>18}  (during {args.read_ms:.0f} ms reloads)")
+    print(f"{args.cards:>7} {build_ms:>16.1f} {warm_p50:>12.2f} {warm_p99:>12.2f} {during_p50:>18.2f} {during_p99:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
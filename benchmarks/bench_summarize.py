@@ -0,0 +1,67 @@
+"""
+Wall time of TextProcessingWithGemini.summarize_text with a stub model that sleeps like Gemini:
+every chunk summarized one after another (max_concurrency=1, what the loop did before the map-reduce)
+against the concurrent map with the tree reduce.
+
+    python -m benchmarks.bench_summarize [--chunks 4 16 64] [--latency 1.5] [--concurrency 8] [--fanout 8]
+
+--latency is the seconds one generate_content call takes and is scaled down by --scale so a run takes
+seconds, the reported times are at full scale.
+"""
+import argparse
+import threading
+import time
+from types import SimpleNamespace
+from app.utils.ai_gemini import TextProcessingWithGemini
+
+
+class SleepingModel:
+    """GenerativeModel stand-in, every generate_content call costs the latency of the real one."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        time.sleep(self.latency)
+        with self.lock:
+            self.calls += 1
+        part = SimpleNamespace(text=f"summary of {len(prompt)} chars")
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+def measure(processor, chunks, latency, concurrency, fanout):
+    model = SleepingModel(latency)
+    started = time.perf_counter()
+    summary = processor.summarize_text(chunks, client=model, max_concurrency=concurrency, reduce_fanout=fanout)
+    assert summary, "summarize_text returned nothing"
+    return time.perf_counter() - started, model.calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--latency", type=float, default=1.5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--scale", type=float, default=0.02)
+    args = parser.parse_args()
+
+    processor = TextProcessingWithGemini()
+    latency = args.latency * args.scale
+    modes = {"sequential": 1, "concurrent": args.concurrency}
+
+    print(f"{'chunks':>6} " + " ".join(f"{name + ' s':>14} {name + ' calls':>18}" for name in modes) + f" {'speedup':>8}")
+    for count in args.chunks:
+        chunks = [f"chunk {index} " + "lorem ipsum " * 200 for index in range(count)]
+        row, seconds = [], {}
+        for name, concurrency in modes.items():
+            elapsed, calls = measure(processor, chunks, latency, concurrency, args.fanout)
+            seconds[name] = elapsed / args.scale
+            row.append(f"{seconds[name]:>14.1f} {calls:>18}")
+        print(f"{count:>6} " + " ".join(row) + f" {seconds['sequential'] / seconds['concurrent']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
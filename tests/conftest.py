@@ -0,0 +1,12 @@
+import os
+
+# Config is read when the app package is imported. Point it at a Mongo that the unit tests never
+# contact, and keep startup side effects (index creation, job persistence) out of the way.
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/?serverSelectionTimeoutMS=200")
+os.environ.setdefault("MONGO_ENSURE_INDEXES", "false")
+os.environ.setdefault("INGESTION_JOB_STORE", "memory")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+# clients configured at import time (transcript proxy, Gemini) only need placeholder credentials
+os.environ.setdefault("PROXY_USERNAME", "test")
+os.environ.setdefault("PROXY_PASSWORD", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
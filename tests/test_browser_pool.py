@@ -0,0 +1,164 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.utils.browser_pool import BrowserSessionPool
+from app.utils.sraper import Scraper
+
+CHALLENGE = "<html><head><title>Just a moment...</title></head><body><div class='cf-challenge'></div></body></html>"
+
+
+class StubDriver:
+    """Stands in for a remote Chromium session, pages whose url contains 'challenge' are bot checks."""
+
+    def __init__(self, page_seconds: float = 0.0):
+        self.page_seconds = page_seconds
+        self.page_source = ""
+        self.title = ""
+        self.alive = True
+        self.quit_calls = 0
+        self.cdp_commands = []
+
+    def get(self, url):
+        time.sleep(self.page_seconds)
+        if "broken" in url:
+            raise RuntimeError("tab crashed")
+        challenge = "challenge" in url
+        self.title = "Just a moment..." if challenge else url
+        self.page_source = CHALLENGE if challenge else f"<html><body><p>{url}</p></body></html>"
+
+    def execute(self, command, params):
+        self.cdp_commands.append(params["cmd"])
+        return {"value": {"status": "solve_finished"}}
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("session deleted")
+        return 1
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+class DriverFactory:
+    def __init__(self, page_seconds: float = 0.0):
+        self.page_seconds = page_seconds
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        driver = StubDriver(self.page_seconds)
+        with self.lock:
+            self.drivers.append(driver)
+        return driver
+
+
+def scrape_all(scraper: Scraper, urls: list, workers: int = 20):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(scraper.scrape_web, urls))
+
+
+def test_concurrent_scrapes_share_the_pooled_sessions():
+    factory = DriverFactory(page_seconds=0.01)
+    scraper = Scraper(create_driver=factory)
+    scraper.browser_pool = BrowserSessionPool(factory, max_size=3, max_pages=1000, max_age_seconds=600)
+
+    pages = scrape_all(scraper, [f"https://example.com/{index}" for index in range(60)])
+
+    assert all(page and "example.com" in page for page in pages)
+    assert len(factory.drivers) == 3
+    stats = scraper.get_stats()
+    assert stats["pages"] == 60 and stats["failures"] == 0
+    assert stats["idle"] == stats["open"] == 3
+
+
+def test_sessions_are_recycled_after_max_pages():
+    factory = DriverFactory()
+    pool = BrowserSessionPool(factory, max_size=1, max_pages=5, max_age_seconds=600)
+    for _ in range(12):
+        with pool.session() as driver:
+            driver.get("https://example.com")
+
+    assert len(factory.drivers) == 3
+    assert [driver.quit_calls for driver in factory.drivers] == [1, 1, 0]
+    assert pool.get_stats()["recycled"] == 2
+
+
+def test_dead_idle_session_is_replaced():
+    factory = DriverFactory()
+    pool = BrowserSessionPool(factory, max_size=1, max_pages=100, max_age_seconds=600)
+    with pool.session():
+        pass
+    factory.drivers[0].alive = False
+
+    with pool.session() as driver:
+        assert driver is factory.drivers[1]
+    assert pool.get_stats()["unhealthy"] == 1
+
+
+def test_failed_scrape_drops_its_session():
+    factory = DriverFactory()
+    scraper = Scraper(create_driver=factory)
+    scraper.browser_pool = BrowserSessionPool(factory, max_size=2, max_pages=100, max_age_seconds=600)
+
+    assert scraper.scrape_web("https://example.com/broken") is None
+    assert factory.drivers[0].quit_calls == 1
+    assert scraper.scrape_web("https://example.com/fine") is not None
+    assert scraper.get_stats()["failures"] == 1
+
+
+def test_acquire_times_out_while_every_session_is_busy():
+    pool = BrowserSessionPool(DriverFactory(), max_size=1, max_pages=100, max_age_seconds=600)
+    busy = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(busy)
+
+
+def test_closed_pool_opens_no_new_session():
+    factory = DriverFactory()
+    pool = BrowserSessionPool(factory, max_size=2, max_pages=100, max_age_seconds=600)
+    with pool.session():
+        pass
+    pool.close()
+
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=5)
+    assert len(factory.drivers) == 1
+    assert factory.drivers[0].quit_calls == 1
+
+
+def test_close_wakes_up_waiting_scrapes():
+    pool = BrowserSessionPool(DriverFactory(), max_size=1, max_pages=100, max_age_seconds=600)
+    busy = pool.acquire()
+    errors = []
+
+    def wait_for_session():
+        try:
+            pool.acquire(timeout=30)
+        except Exception as exception:
+            errors.append(exception)
+
+    waiter = threading.Thread(target=wait_for_session)
+    waiter.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    pool.close()
+    waiter.join()
+
+    assert time.monotonic() - started < 1
+    assert [type(error) for error in errors] == [RuntimeError]
+    pool.release(busy)
+    assert pool.get_stats()["open"] == 0
+
+
+def test_captcha_is_only_solved_on_challenge_pages():
+    factory = DriverFactory()
+    scraper = Scraper(create_driver=factory)
+    scraper.browser_pool = BrowserSessionPool(factory, max_size=4, max_pages=1000, max_age_seconds=600)
+
+    urls = [f"https://example.com/{'challenge' if index % 3 == 0 else 'article'}/{index}" for index in range(90)]
+    scrape_all(scraper, urls)
+
+    assert scraper.get_stats()["captcha_checks"] == 30
+    assert sum(len(driver.cdp_commands) for driver in factory.drivers) == 30
@@ -0,0 +1,76 @@
+import asyncio
+import inspect
+from datetime import datetime
+import mongomock
+import pytest
+from bson import ObjectId
+from app.dao import knowledge_card_dao, user_dao, async_knowledge_card_dao
+from app.models import KnowledgeCardListItem
+from app.services import knowledge_card_service, engagement_buffer_service
+from app.utils.jwt_handler import create_access_token
+
+USER_ID = "64b000000000000000000001"
+CARD_ID = "64b0000000000000000000c1"
+
+
+@pytest.fixture
+def buffered_like(monkeypatch):
+    """The viewer liked CARD_ID and the like is still waiting in the engagement buffer."""
+    monkeypatch.setattr(engagement_buffer_service, "enabled", True)
+    monkeypatch.setattr(engagement_buffer_service, "pending", {CARD_ID: {"liked_by": {USER_ID: (True, False)}}})
+    card = KnowledgeCardListItem(card_id=CARD_ID, user_id=USER_ID, created_at=datetime.utcnow(),
+                                 favourite=True, archive=True, public=True, likes=0)
+    for name in ("get_all_cards", "get_favourite_cards", "get_archived_cards"):
+        monkeypatch.setattr(knowledge_card_dao, name, lambda *args, **kwargs: [card])
+
+    async def get_all_cards(*args, **kwargs):
+        return [card]
+
+    # the home feed is read through the async DAO
+    monkeypatch.setattr(async_knowledge_card_dao, "get_all_cards", get_all_cards)
+
+
+@pytest.mark.parametrize("feed", ["get_all_cards", "get_favourite_cards", "get_archive_cards"])
+@pytest.mark.parametrize("cursor", ["", None])
+def test_feeds_show_the_viewers_buffered_like(buffered_like, feed, cursor):
+    token = create_access_token({"userId": USER_ID, "email": "user@example.com"})
+    result = getattr(knowledge_card_service, feed)(token, limit=4, cursor=cursor)
+    if inspect.iscoroutine(result):
+        result = asyncio.run(result)
+    cards = result["cards"] if cursor is not None else result
+    assert cards[0]["liked_by_me"] is True
+    assert cards[0]["likes"] == 1
+
+
+@pytest.fixture
+def bookmarks(monkeypatch):
+    """Six bookmarked ids of which the third card was deleted without its bookmarks being pulled."""
+    card_ids = [f"64b0000000000000000000{index:02d}" for index in range(6)]
+    users = mongomock.MongoClient().db.users_collection
+    users.insert_one({"_id": ObjectId(USER_ID), "bookmarked_cards": list(card_ids)})
+    monkeypatch.setattr(user_dao, "users_collection", users)
+
+    def get_cards_by_ids(card_ids, viewer_id=None):
+        found = [card_id for card_id in card_ids if card_id != deleted]
+        cards = [KnowledgeCardListItem(card_id=card_id, user_id=USER_ID) for card_id in found]
+        return cards, [card_id for card_id in card_ids if card_id not in found]
+
+    deleted = card_ids[2]
+    monkeypatch.setattr(knowledge_card_dao, "get_cards_by_ids", get_cards_by_ids)
+    return card_ids, users
+
+
+def test_reading_bookmarks_does_not_shift_later_pages(bookmarks):
+    card_ids, users = bookmarks
+    pages = [knowledge_card_service.get_bookmarked_cards(USER_ID, skip=skip, limit=3) for skip in (0, 3)]
+
+    assert [card["card_id"] for page in pages for card in page] == card_ids[:2] + card_ids[3:]
+    assert users.find_one()["bookmarked_cards"] == card_ids
+
+
+def test_deleted_card_leaves_every_bookmark_list(bookmarks):
+    card_ids, users = bookmarks
+    users.insert_one({"_id": ObjectId(), "bookmarked_cards": [card_ids[2], card_ids[4]]})
+
+    assert user_dao.remove_card_from_all_bookmarks(card_ids[2]) == 2
+    assert [user["bookmarked_cards"] for user in users.find()] == [card_ids[:2] + card_ids[3:], [card_ids[4]]]
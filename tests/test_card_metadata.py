@@ -0,0 +1,89 @@
+import json
+import pytest
+from app.utils.ai_gemini import TextProcessingWithGemini, is_single_emoji
+
+
+@pytest.mark.parametrize("icon", ["📋", "👩‍💻", "👨‍👩‍👧‍👦", "🇯🇵", "👍🏽", "❤️", "1️⃣", "🏴󠁧󠁢󠁳󠁣󠁴󠁿"])
+def test_multi_codepoint_emoji_are_single_icons(icon):
+    assert is_single_emoji(icon)
+
+
+@pytest.mark.parametrize("icon", ["", "  ", "ok", "📋📋", "🇯", "📋 tech", None, 5, ["📋"]])
+def test_text_and_several_emoji_are_not_icons(icon):
+    assert not is_single_emoji(icon)
+
+
+class StubModel:
+    """Answers the structured metadata prompt with a fixed text."""
+
+    def __init__(self, text):
+        self.text = text
+
+    def generate_content(self, prompt, generation_config=None):
+        return self.text
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    processor = TextProcessingWithGemini()
+    monkeypatch.setattr(processor, "extract_text_from_response", lambda response: response)
+    processor.fallbacks = []
+    fallbacks = {
+        "get_title": "Fallback title",
+        "generate_tags": ["fallback"],
+        "generate_category": "fallback",
+        "get_icon": "🧩",
+    }
+    for name, value in fallbacks.items():
+        monkeypatch.setattr(processor, name, lambda *args, name=name, value=value, **kwargs: processor.fallbacks.append(name) or value)
+    return processor
+
+
+def generate(processor, text):
+    return processor.generate_card_metadata("summary", max_tags=3, client=StubModel(text))
+
+
+def test_valid_response_needs_no_fallback(processor):
+    text = json.dumps({"title": "Bike lanes approved", "tags": ["cycling", "city", "cycling", "budget", "vote"],
+                       "category": "Politics", "icon": "🚲"})
+    metadata = generate(processor, f"```json\n{text}\n```")
+
+    assert metadata == {"title": "Bike lanes approved", "tags": ["cycling", "city", "budget"], "category": "politics", "icon": "🚲"}
+    assert processor.fallbacks == []
+
+
+def test_zwj_icon_is_kept_without_an_extra_call(processor):
+    metadata = generate(processor, json.dumps({"title": "T", "tags": ["a"], "category": "tech", "icon": "👩‍💻"}))
+    assert metadata["icon"] == "👩‍💻"
+    assert processor.fallbacks == []
+
+
+def test_malformed_json_falls_back_for_every_field(processor):
+    metadata = generate(processor, '{"title": "Cut off')
+    assert metadata == {"title": "Fallback title", "tags": ["fallback"], "category": "fallback", "icon": "🧩"}
+    assert processor.fallbacks == ["get_title", "generate_tags", "generate_category", "get_icon"]
+
+
+def test_only_missing_fields_fall_back(processor):
+    metadata = generate(processor, json.dumps({"title": "Kept", "category": "science"}))
+    assert metadata["title"] == "Kept" and metadata["category"] == "science"
+    assert processor.fallbacks == ["generate_tags", "get_icon"]
+
+
+@pytest.mark.parametrize("field,value", [
+    ("title", 42), ("title", "x" * 200), ("title", ""),
+    ("tags", {"a": 1}), ("tags", [1, None, " "]),
+    ("category", ["tech"]), ("category", "misc"),
+    ("icon", "science"), ("icon", 1),
+])
+def test_badly_typed_fields_fall_back(processor, field, value):
+    raw = {"title": "Title", "tags": ["a"], "category": "tech", "icon": "🔬", field: value}
+    generate(processor, json.dumps(raw))
+    fallback = {"title": "get_title", "tags": "generate_tags", "category": "generate_category", "icon": "get_icon"}[field]
+    assert processor.fallbacks == [fallback]
+
+
+def test_non_object_response_is_rejected(processor):
+    assert processor.validate_card_metadata(["title"]) == {}
+    assert processor.validate_card_metadata("📋") == {}
+    assert processor.validate_card_metadata({"tags": "a, b ,a"}) == {"tags": ["a", "b"]}
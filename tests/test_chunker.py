@@ -0,0 +1,109 @@
+from pathlib import Path
+from app.utils.chunker import chunk_text, estimate_tokens, split_units
+
+TRANSCRIPTS = Path(__file__).resolve().parent / "fixtures" / "transcripts"
+
+
+def paragraph(index: int, words: int = 60) -> str:
+    return " ".join(f"word{index}x{position}" for position in range(words)) + "."
+
+
+def test_empty_text_has_no_chunks():
+    assert chunk_text("") == []
+    assert chunk_text("\n  \n") == []
+
+
+def test_paragraphs_that_differ_only_in_numbers_are_kept():
+    text = "\n".join([
+        "In 2021 the company reported revenue of 4.2 billion dollars across all regions.",
+        "In 2023 the company reported revenue of 9.8 billion dollars across all regions.",
+        "Step 1: open the settings page and pick the account you want to change.",
+        "Step 2: open the settings page and pick the account you want to change.",
+    ])
+    units = split_units(text, max_tokens=1000)
+    assert len(units) == 4
+
+
+def test_long_repeats_are_dropped_ignoring_case_and_punctuation():
+    footer = "Subscribe to our newsletter for weekly updates on everything we publish"
+    text = "\n".join([paragraph(1), footer, paragraph(2), footer.upper() + "!", paragraph(3)])
+    units = split_units(text, max_tokens=1000)
+    assert units == [paragraph(1), footer, paragraph(2), paragraph(3)]
+
+
+def test_short_lines_are_only_deduplicated_when_they_keep_repeating():
+    text = "\n".join(["Share this", paragraph(1), "Share this", paragraph(2), "Share this", "Note", paragraph(3), "Note"])
+    units = split_units(text, max_tokens=1000)
+    assert units.count("Share this") == 1
+    assert units.count("Note") == 2
+
+
+def test_loops_in_a_one_line_transcript_are_dropped():
+    transcript = (TRANSCRIPTS / "youtube_loop.txt").read_text(encoding="utf-8")
+    routine = "take it out of the fridge the night before you bake"
+    sponsor = "this video is brought to you by crumbly"
+
+    assert transcript.count(routine) == 3 and transcript.count(sponsor) == 2
+    units = split_units(transcript, max_tokens=1000)
+    text = " ".join(units)
+    assert text.count(routine) == 1 and text.count(sponsor) == 1
+    assert "put the jar in the oven with only the light on" in text
+    assert text.endswith("see you in the next one [Music]")
+
+
+def test_word_runs_are_only_compared_within_one_line_text():
+    quote = "the only way to do great work is to love what you do and keep looking until you find it"
+    text = "\n".join([f"{paragraph(1)} {quote}", f"{quote} {paragraph(2)}"])
+    assert split_units(text, max_tokens=1000) == text.split("\n")
+    # a run overlapping its own first occurrence is a repeated word, not a loop
+    chant = " ".join(["ha"] * 30)
+    assert split_units(chant, max_tokens=1000) == [" ".join(["ha"] * 30)]
+
+
+def test_chunks_stay_within_the_budget_and_cut_between_words():
+    text = "\n".join(paragraph(index) for index in range(40))
+    chunks = chunk_text(text, max_tokens=500, overlap_tokens=0)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_chunks_are_packed_full():
+    text = "\n".join(paragraph(index) for index in range(40))
+    chunks = chunk_text(text, max_tokens=500, overlap_tokens=0)
+    # a closed chunk never had room left for the paragraph that opened the next one
+    def used(chunk):
+        return sum(estimate_tokens(line) + 1 for line in chunk.splitlines())
+    for chunk, following in zip(chunks, chunks[1:]):
+        assert used(chunk) + used(following.splitlines()[0]) > 500
+
+
+def test_oversized_paragraph_is_split_on_sentences():
+    sentences = [f"Sentence number {index} talks about a different topic entirely." for index in range(200)]
+    chunks = chunk_text(" ".join(sentences), max_tokens=200, overlap_tokens=0)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.rstrip().endswith(".")
+        assert estimate_tokens(chunk) <= 200
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk():
+    text = "\n".join(paragraph(index, words=20) for index in range(30))
+    chunks = chunk_text(text, max_tokens=300, overlap_tokens=80)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.splitlines()[0] == previous.splitlines()[-1]
+
+
+def test_near_duplicate_chunks_are_dropped():
+    words = [f"token{index}" for index in range(300)]
+    loop = " ".join(words)
+    almost = " ".join(words[:150] + ["changed"] + words[151:])
+    chunks = chunk_text("\n".join([loop, almost]), max_tokens=1000, overlap_tokens=0, dedup_similarity=0.9)
+    assert chunks == [loop]
+
+
+def test_distinct_chunks_are_kept():
+    first = " ".join(f"alpha{index}" for index in range(300))
+    second = " ".join(f"beta{index}" for index in range(300))
+    chunks = chunk_text("\n".join([first, second]), max_tokens=1000, overlap_tokens=0)
+    assert chunks == [first, second]
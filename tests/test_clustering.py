@@ -0,0 +1,107 @@
+import importlib
+import threading
+import mongomock
+import numpy as np
+import pytest
+from bson import ObjectId
+from app.config import Config
+from app.dao import card_cluster_dao
+from app.services import ClusteringServices
+from app.utils.clustering_module import clustering_module, nearest_centroid
+
+clustering_file = importlib.import_module("app.utils.clustering_module")
+cluster_service_file = importlib.import_module("app.services.card_cluster_service")
+
+
+def topic_vectors(seed: int, topics: int = 6, cards_per_topic: int = 40, noise: int = 30, dimensions: int = 384):
+    """Cards spread around a few topic directions, plus unrelated cards that belong to no topic."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(topics, dimensions))
+    cards = [center + rng.normal(scale=0.25, size=(cards_per_topic, dimensions)) for center in centers]
+    cards.append(rng.normal(size=(noise, dimensions)))
+    return np.vstack(cards) * rng.uniform(0.5, 3.0, size=(topics * cards_per_topic + noise, 1))
+
+
+def same_partition(first, second) -> bool:
+    """Labels are equal up to renumbering of the clusters, noise must stay noise."""
+    pairs = set(zip(first, second))
+    return (len({a for a, _ in pairs}) == len(pairs) == len({b for _, b in pairs})
+            and all((a == -1) == (b == -1) for a, b in pairs))
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("eps,min_samples", [(0.1, 3), (0.2, 5)])
+def test_radius_backend_matches_the_dense_matrix(seed, eps, min_samples):
+    vectors = topic_vectors(seed)
+    dense = clustering_module(vectors, eps=eps, min_samples=min_samples, backend="dense")
+    radius = clustering_module(vectors, eps=eps, min_samples=min_samples, backend="radius")
+
+    assert len(set(dense) - {-1}) == 6
+    assert same_partition(dense, radius)
+
+
+def test_auto_switches_to_the_radius_backend_above_the_limit(monkeypatch):
+    used = []
+    monkeypatch.setattr(clustering_file, "radius_clustering", lambda *args: used.append("radius") or [])
+    monkeypatch.setattr(Config, "CLUSTER_DENSE_MAX_CARDS", 100)
+
+    clustering_module(topic_vectors(0, topics=2, cards_per_topic=10, noise=0), backend="auto")
+    assert used == []
+    clustering_module(topic_vectors(0, topics=3, cards_per_topic=40, noise=0), backend="auto")
+    assert used == ["radius"]
+
+
+def test_nearest_centroid_uses_cosine_distance():
+    centroids = [[1.0, 0.0], [0.0, 5.0]]
+    index, distance = nearest_centroid([0.1, 2.0], centroids)
+    assert index == 1
+    assert distance == pytest.approx(1 - 2.0 / np.hypot(0.1, 2.0))
+    assert nearest_centroid([1.0, 0.0], []) == (None, None)
+
+
+@pytest.fixture
+def clusters(monkeypatch):
+    database = mongomock.MongoClient().db
+    monkeypatch.setattr(card_cluster_dao, "clusters_collection", database.clusters_collection)
+    monkeypatch.setattr(card_cluster_dao, "cluster_state_collection", database.cluster_state_collection)
+    return database.clusters_collection
+
+
+def test_concurrent_assignments_all_move_the_centroid(clusters):
+    user_id = str(ObjectId())
+    card_cluster_dao.create_cluster({"user_id": ObjectId(user_id), "centroid_vector": [1.0, 0.0, 0.0],
+                                     "knowledge_card_ids": [ObjectId(), ObjectId()], "topic_name": "topic"})
+    card_cluster_dao.reset_cluster_state(user_id, 1000)
+    vectors = [[1.0, 0.01 * index, 0.0] for index in range(40)]
+    service = ClusteringServices()
+    barrier = threading.Barrier(8)
+
+    def assign(batch):
+        barrier.wait()
+        for vector in batch:
+            service.assign_card(user_id, str(ObjectId()), vector)
+
+    threads = [threading.Thread(target=assign, args=(vectors[index::8],)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    cluster = clusters.find_one()
+    assert cluster["card_count"] == 42
+    assert len(cluster["knowledge_card_ids"]) == 42
+    expected = (np.array([2.0, 0.0, 0.0]) + np.sum(vectors, axis=0)) / 42
+    assert card_cluster_dao.get_cluster_centroids(user_id)[0]["centroid"] == pytest.approx(expected)
+
+
+def test_drift_schedules_one_background_recluster(clusters, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(cluster_service_file.blocking_executor, "submit", lambda pool, func: submitted.append(pool))
+    monkeypatch.setattr(ClusteringServices, "cluster_knowledge_cards", lambda user_id: pytest.fail("reclustered in the request"))
+    user_id = str(ObjectId())
+    service = ClusteringServices()
+
+    # no clusters yet, every card is unassigned and the drift threshold trips on the third
+    messages = [service.assign_card(user_id, str(ObjectId()), [1.0, 0.0]) for _ in range(4)]
+    assert messages[-2:] == ["recluster scheduled", "recluster scheduled"]
+    assert submitted == ["io"]
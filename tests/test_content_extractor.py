@@ -0,0 +1,74 @@
+from pathlib import Path
+import pytest
+from app.utils.content_extractor import extract_main_text
+from app.utils.sraper import Scraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "html"
+
+# saved page -> (text that belongs to the article, page chrome that must be gone)
+EXPECTED = {
+    "news_article.html": (
+        ["approve a network of protected bike lanes", "Opposition from shop owners", "seven districts crossed by the network"],
+        ["We use cookies", "Related stories", "Tram extension delayed", "Comments (214)", "Get the morning briefing",
+         "Share on Facebook", "All rights reserved", "Politics"],
+    ),
+    "blog_post.html": (
+        ["Sourness in sourdough comes from two acids", "4. Shorten the cold retard", "which step made the difference"],
+        ["Skip to content", "Share this", "You might also like", "Leave a Reply", "About me", "Advertisement",
+         "Proudly powered by WordPress", "Previous: Scoring patterns"],
+    ),
+    "docs_page.html": (
+        ["Every client keeps a pool of open connections", "Sizing the pool", "never be shared across a fork"],
+        ["Search docs", "Installation", "Changelog", "Built with Sphinx"],
+    ),
+    "encoded_article.html": (
+        ["Über die Geschichte des Kaffeehauses", "immateriellen Kulturerbe der UNESCO – ein Zeichen"],
+        ["Startseite", "Teilen", "Impressum"],
+    ),
+}
+
+
+def read_fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+def old_extraction(html: str) -> str:
+    scraper = Scraper(create_driver=lambda: None)
+    return scraper.clean_body_content(scraper.extract_body_content(html))
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_article_text_is_kept_and_page_chrome_dropped(name):
+    text = extract_main_text(read_fixture(name))
+    kept, dropped = EXPECTED[name]
+    for phrase in kept:
+        assert phrase in text
+    for phrase in dropped:
+        assert phrase not in text
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_output_is_smaller_than_the_beautifulsoup_path(name):
+    html = read_fixture(name)
+    assert len(extract_main_text(html)) < len(old_extraction(html))
+
+
+def test_page_without_an_article_keeps_the_whole_body():
+    text = extract_main_text(read_fixture("listing_page.html"))
+    assert "Weekend events in Riverside" in text
+    assert "Family science fair\nRiverside Library\nSunday 14:00" in text
+    assert "Free entry unless stated otherwise." in text
+
+
+def test_bytes_and_broken_input():
+    html = read_fixture("news_article.html")
+    assert extract_main_text(html.encode("utf-8")) == extract_main_text(html)
+    assert extract_main_text("") == ""
+    assert extract_main_text("<p>unclosed <b>tags") == "unclosed tags"
+
+
+def test_chrome_named_wrapper_around_the_main_landmark_is_kept():
+    # the wrapper holds less than half of the page text once the teasers come before it
+    html = read_fixture("docs_page.html").replace('<div class="wy-grid-for-nav">', "<p>teaser</p>" * 2000 + '<div class="wy-grid-for-nav">')
+    text = extract_main_text(html)
+    assert "never be shared across a fork" in text
@@ -0,0 +1,39 @@
+import pytest
+from app.utils.content_keys import normalize_url, source_cache_key, content_hash_key
+
+
+@pytest.mark.parametrize("first,second", [
+    ("https://Example.com/a?b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com:443/a#section", "https://example.com/a"),
+    ("http://example.com:80/a", "http://example.com/a"),
+    ("https://example.com/a?utm_source=x&utm_medium=mail&id=7", "https://example.com/a?id=7"),
+    ("https://example.com/a?fbclid=abc&gclid=def", "https://example.com/a"),
+    ("https://example.com", "https://example.com/"),
+])
+def test_links_to_the_same_resource_share_a_key(first, second):
+    assert normalize_url(first) == normalize_url(second)
+
+
+@pytest.mark.parametrize("first,second", [
+    ("http://example.com/a", "https://example.com/a"),
+    ("https://www.example.com/a", "https://example.com/a"),
+    ("https://example.com/a?si=2", "https://example.com/a?si=3"),
+    ("https://example.com/a?ref=main", "https://example.com/a"),
+    ("https://example.com/a?id=1", "https://example.com/a?id=2"),
+    ("https://example.com:8443/a", "https://example.com/a"),
+])
+def test_distinct_resources_keep_distinct_keys(first, second):
+    assert normalize_url(first) != normalize_url(second)
+
+
+def test_youtube_links_are_keyed_on_the_video_id():
+    key = source_cache_key("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=42")
+    assert key == "yt:dQw4w9WgXcQ"
+    assert source_cache_key("https://youtu.be/dQw4w9WgXcQ") == key
+
+
+def test_page_and_upload_keys():
+    assert source_cache_key("https://example.com/a?utm_campaign=x") == "url:https://example.com/a"
+    assert content_hash_key(b"same bytes") == content_hash_key(b"same bytes")
+    assert content_hash_key(b"same bytes") != content_hash_key(b"other bytes")
+    assert content_hash_key(b"").startswith("sha256:")
@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from app.dao import AsyncKnowledgeCardDao
+from app.dao.knowledge_card_dao import dashboard_pipeline, shape_dashboard, invalidate_dashboard
+from app.models import KnowledgeCardListItem
+from app.utils import encode_vector
+
+
+def test_recent_cards_facet_ends_with_the_list_view_projection():
+    recent_cards = dashboard_pipeline(str(ObjectId()))[1]["$facet"]["recent_cards"]
+    projection = recent_cards[-1]["$project"]
+    assert "embedded_vector" not in projection
+    assert "summary" not in projection
+
+
+def test_dashboard_is_json_serializable_with_binary_vectors():
+    user_id = ObjectId()
+    card = {
+        "_id": ObjectId(), "user_id": user_id, "title": "Card", "excerpt": "<p>Some summary</p>",
+        "created_at": datetime(2026, 1, 1), "liked_by_me": False, "bookmarked_by_me": True,
+        # a document that skipped the projection must still not break the response
+        "embedded_vector": encode_vector([0.1, 0.2, 0.3])
+    }
+    dashboard = shape_dashboard({"own": [{"total_cards": 1, "link": 1}], "recent_cards": [card]})
+
+    recent = dashboard["recent_cards"]
+    assert isinstance(recent[0], KnowledgeCardListItem)
+    body = jsonable_encoder(dashboard)
+    assert body["recent_cards"][0]["card_id"] == str(card["_id"])
+    assert body["recent_cards"][0]["excerpt"] == "Some summary"
+    assert "embedded_vector" not in body["recent_cards"][0]
+    assert body["upload_stats"] == {"link": 1, "file": 0}
+
+
+class AsyncAggregation:
+    """The part of a motor aggregation cursor the async DAO uses, counts the round trips."""
+
+    def __init__(self, collection, result):
+        self.collection, self.result = collection, result
+
+    async def to_list(self, length):
+        self.collection.round_trips += 1
+        return [self.result]
+
+
+def test_async_dashboard_shares_the_cache_with_the_sync_dao(monkeypatch):
+    collection = SimpleNamespace(round_trips=0)
+    collection.aggregate = lambda pipeline: AsyncAggregation(collection, {"own": [{"total_cards": 2, "link": 1}]})
+    dao = AsyncKnowledgeCardDao()
+    monkeypatch.setattr(dao, "knowledge_cards_collection", collection)
+    user_id = str(ObjectId())
+
+    first = asyncio.run(dao.get_dashboard_data(user_id))
+    assert asyncio.run(dao.get_dashboard_data(user_id)) is first
+    assert collection.round_trips == 1
+    assert first["total_cards"] == 2 and first["upload_stats"] == {"link": 1, "file": 1}
+
+    # a write through the sync DAO drops the copy the async DAO cached
+    invalidate_dashboard(user_id)
+    asyncio.run(dao.get_dashboard_data(user_id))
+    assert collection.round_trips == 2
@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+import mongomock
+import pytest
+from bson import ObjectId
+from app.config import Config
+from app.dao.knowledge_card_dao import KnowledgeCardDao
+from app.utils import embedder as embedder_module
+from app.utils.embedder import Embedder, LocalBackend
+
+USER_ID = "64b000000000000000000001"
+
+
+@pytest.fixture
+def local_installed(monkeypatch):
+    monkeypatch.setattr(embedder_module, "local_backend_available", lambda: True)
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "auto")
+    monkeypatch.setattr(Config, "HF_MODEL_ID", "org/model-a")
+
+
+def test_auto_keeps_the_hf_model_when_the_local_one_differs(local_installed, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_LOCAL_MODEL", "org/model-b")
+    embedder = Embedder()
+    assert embedder.backend_name == "hf"
+    assert embedder.model_id == "org/model-a"
+
+
+def test_auto_runs_the_same_model_locally(local_installed, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_LOCAL_MODEL", "org/model-a")
+    embedder = Embedder()
+    assert embedder.backend_name == "local"
+    assert embedder.model_id == "org/model-a"
+
+
+def test_card_vectors_of_other_models_are_left_out(monkeypatch):
+    monkeypatch.setattr(Config, "HF_MODEL_ID", "org/model-a")
+    dao = KnowledgeCardDao()
+    dao.knowledge_cards_collection = mongomock.MongoClient().db.knowledge_cards_collection
+    user_id = ObjectId(USER_ID)
+    dao.knowledge_cards_collection.insert_many([
+        {"_id": "current", "user_id": user_id, "embedded_vector": [0.1, 0.2], "embedding_model": "org/model-a"},
+        {"_id": "legacy", "user_id": user_id, "embedded_vector": [0.1, 0.2]},
+        {"_id": "other", "user_id": user_id, "embedded_vector": [0.1, 0.2, 0.3], "embedding_model": "org/model-b"},
+    ])
+
+    assert sorted(card["_id"] for card in dao.get_card_vectors(USER_ID, "org/model-a")) == ["current", "legacy"]
+    assert [card["_id"] for card in dao.get_card_vectors(USER_ID, "org/model-b")] == ["other"]
+
+
+class RecordingBackend:
+    """Returns the length of each text as its vector and rejects texts containing "bad"."""
+    model_id = "org/model-a"
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_batch(self, texts: list) -> list:
+        self.batches.append(list(texts))
+        if any("bad" in text for text in texts):
+            raise RuntimeError("rejected")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_SIZE", 4)
+    monkeypatch.setattr(Config, "EMBEDDING_BATCH_WAIT_MS", 200)
+    embedder = Embedder()
+    embedder.backend = RecordingBackend()
+    return embedder
+
+
+def embed_concurrently(embedder, texts: list) -> list:
+    with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+        futures = [pool.submit(embedder.embed_text, text) for text in texts]
+    return [future.exception() or future.result() for future in futures]
+
+
+def test_the_local_backend_is_the_default_and_loads_nothing_up_front():
+    # no network in the tests: the model is only loaded, from the local cache, on the first embedding
+    embedder = Embedder()
+    assert embedder.backend_name == Config.EMBEDDING_BACKEND == "local"
+    assert isinstance(embedder.backend, LocalBackend)
+    assert embedder.backend.model is None
+
+
+def test_lists_are_sent_in_batches_of_the_configured_size(recording):
+    texts = [f"text {number}" for number in range(10)]
+    assert recording.embed_text(texts) == [[float(len(text)), 1.0] for text in texts]
+    assert [len(batch) for batch in recording.backend.batches] == [4, 4, 2]
+
+
+def test_concurrent_single_texts_share_a_batch(recording):
+    results = embed_concurrently(recording, ["one", "two", "three", "four"])
+    assert results == [[3.0, 1.0], [3.0, 1.0], [5.0, 1.0], [4.0, 1.0]]
+    assert len(recording.backend.batches) == 1
+
+
+def test_cached_and_repeated_texts_are_not_sent_again(recording):
+    recording.embed_text("cached")
+    recording.embed_text(["cached", "fresh", "fresh"])
+    assert recording.embed_text("cached") == [6.0, 1.0]
+    assert recording.backend.batches == [["cached"], ["fresh"]]
+    assert recording.get_stats()["cache"]["hits"] >= 2
+
+
+def test_a_rejected_text_fails_alone(recording):
+    results = embed_concurrently(recording, ["good", "bad one", "fine"])
+
+    assert results[0] == [4.0, 1.0] and results[2] == [4.0, 1.0]
+    assert isinstance(results[1], RuntimeError)
+    # the batch failed, then each text was sent on its own
+    assert sorted(recording.backend.batches[1:]) == [["bad one"], ["fine"], ["good"]]
+    # the good vectors were cached, only the rejected text is sent again
+    with pytest.raises(RuntimeError):
+        recording.embed_text(["good", "bad one"])
+    assert recording.backend.batches[-1] == ["bad one"]
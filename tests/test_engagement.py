@@ -0,0 +1,161 @@
+import importlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import mongomock
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app.dao.knowledge_card_dao import KnowledgeCardDao
+from app.services import EngagementBufferService
+
+buffer_module = importlib.import_module("app.services.engagement_buffer_service")
+
+USERS = [str(ObjectId()) for _ in range(40)]
+CARD_ID = str(ObjectId())
+
+
+class RecordingCollection:
+    """Records the update documents a DAO sends, every update reports one modified document."""
+
+    def __init__(self):
+        self.updates = []
+
+    def update_one(self, filter, update):
+        self.updates.append((filter, update))
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def recorded():
+    dao = KnowledgeCardDao()
+    dao.knowledge_cards_collection = RecordingCollection()
+    return dao, dao.knowledge_cards_collection.updates
+
+
+def test_like_only_matches_cards_the_user_has_not_liked(recorded):
+    dao, updates = recorded
+    dao.like_a_card(CARD_ID, USERS[0])
+    dao.unlike_a_card(CARD_ID, USERS[0])
+
+    # the membership test is in the filter and the counter moves in the same update as the array,
+    # so a repeated like matches nothing instead of incrementing likes twice
+    assert updates == [
+        ({"_id": ObjectId(CARD_ID), "public": True, "liked_by": {"$ne": USERS[0]}},
+         {"$addToSet": {"liked_by": USERS[0]}, "$inc": {"likes": 1}}),
+        ({"_id": ObjectId(CARD_ID), "public": True, "liked_by": USERS[0]},
+         {"$pull": {"liked_by": USERS[0]}, "$inc": {"likes": -1}}),
+    ]
+
+
+def test_bookmark_only_matches_cards_the_user_has_not_bookmarked(recorded):
+    dao, updates = recorded
+    dao.bookmark_a_card(CARD_ID, USERS[0])
+    dao.unbookmark_a_card(CARD_ID, USERS[0])
+
+    assert updates == [
+        ({"_id": ObjectId(CARD_ID), "public": True, "bookmarked_by": {"$ne": USERS[0]}}, {"$addToSet": {"bookmarked_by": USERS[0]}}),
+        ({"_id": ObjectId(CARD_ID), "bookmarked_by": USERS[0]}, {"$pull": {"bookmarked_by": USERS[0]}}),
+    ]
+
+
+@pytest.fixture
+def cards():
+    """
+    A public card in a scratch database of the mongod at TEST_MONGO_URI. The concurrency tests need a real
+    server: an in-memory mock applies one update at a time and would pass with a read-modify-write too.
+    """
+    uri = os.getenv("TEST_MONGO_URI")
+    if not uri:
+        pytest.skip("TEST_MONGO_URI is not set")
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as error:
+        pytest.skip(f"no mongod at TEST_MONGO_URI: {error}")
+    database = client[f"brieffydb_test_{ObjectId()}"]
+    dao = KnowledgeCardDao()
+    dao.knowledge_cards_collection = database.knowledge_cards_collection
+    card_id = str(dao.knowledge_cards_collection.insert_one({"public": True, "likes": 0, "liked_by": [], "bookmarked_by": []}).inserted_id)
+    yield dao, card_id
+    client.drop_database(database.name)
+    client.close()
+
+
+def run_together(calls, threads: int = 64):
+    """Run the calls on many threads at once, results in call order."""
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda call: call(), calls))
+
+
+def test_concurrent_likes_and_unlikes_keep_an_exact_count(cards):
+    dao, card_id = cards
+    users = [str(ObjectId()) for _ in range(2000)]
+    # every user double clicks like, the first half then double clicks unlike
+    results = run_together([lambda user_id=user_id: dao.like_a_card(card_id, user_id) for user_id in users * 2])
+    assert results.count(True) == len(users)
+    results = run_together([lambda user_id=user_id: dao.unlike_a_card(card_id, user_id) for user_id in users[:1000] * 2])
+    assert results.count(True) == 1000
+
+    card = dao.knowledge_cards_collection.find_one()
+    assert sorted(card["liked_by"]) == sorted(users[1000:])
+    assert card["likes"] == 1000
+
+
+def test_concurrent_bookmarks_are_recorded_once(cards):
+    dao, card_id = cards
+    users = [str(ObjectId()) for _ in range(2000)]
+    results = run_together([lambda user_id=user_id: dao.bookmark_a_card(card_id, user_id) for user_id in users * 2])
+    assert results.count(True) == len(users)
+    results = run_together([lambda user_id=user_id: dao.unbookmark_a_card(card_id, user_id) for user_id in users[:500] * 2])
+    assert results.count(True) == 500
+
+    assert sorted(dao.knowledge_cards_collection.find_one()["bookmarked_by"]) == sorted(users[500:])
+
+
+def test_private_cards_cannot_be_liked():
+    dao = KnowledgeCardDao()
+    dao.knowledge_cards_collection = mongomock.MongoClient().db.knowledge_cards_collection
+    card_id = str(dao.knowledge_cards_collection.insert_one({"public": False, "likes": 0, "liked_by": []}).inserted_id)
+    assert dao.like_a_card(card_id, USERS[0]) is False
+    assert dao.knowledge_cards_collection.find_one()["likes"] == 0
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    """An enabled engagement buffer over a public card nobody liked, the state read takes a while like a round trip."""
+    service = EngagementBufferService()
+    service.enabled, service.flush_threshold = True, 10 ** 6
+
+    def get_engagement_state(card_id, user_id):
+        time.sleep(0.05)
+        return {"public": True, "liked": False, "bookmarked": False}
+
+    monkeypatch.setattr(buffer_module.knowledge_card_dao, "get_engagement_state", get_engagement_state)
+    monkeypatch.setattr(buffer_module.knowledge_card_dao, "apply_engagement_changes", lambda changes: len(changes))
+    monkeypatch.setattr(buffer_module.discovery_feed_dao, "adjust_counters", lambda counters: None)
+    return service
+
+
+def test_buffered_double_toggle_ends_where_it_started(buffer):
+    card_id = str(ObjectId())
+    results = run_together([lambda: buffer.toggle(card_id, USERS[0], "like")] * 2)
+
+    assert sorted(results) == [False, True]
+    assert buffer._buffered_state(card_id, "liked_by", USERS[0]) is False
+    assert buffer.merge_pending([{"card_id": card_id, "likes": 0}])[0]["likes"] == 0
+    assert buffer.toggle_locks == {}
+
+
+def test_flush_drops_the_dashboards_of_the_users_it_wrote(buffer, monkeypatch):
+    invalidated = []
+    monkeypatch.setattr(buffer_module, "invalidate_dashboard", lambda *user_ids: invalidated.extend(user_ids))
+    card_id = str(ObjectId())
+    buffer.toggle(card_id, USERS[0], "bookmark")
+    buffer.toggle(card_id, USERS[1], "like")
+    invalidated.clear()
+
+    assert buffer.flush() == 1
+    assert sorted(invalidated) == sorted(USERS[:2])
@@ -0,0 +1,205 @@
+import http.server
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from app.config import Config
+from app.utils.content_extractor import extract_main_text
+from app.utils.fetch_scheduler import FetchScheduler, RateLimitedError, RetryableFetchError
+from app.utils.fetcher import TieredFetcher
+
+ARTICLE = "<html><body><article><p>" + "A readable sentence about the topic, with some detail. " * 30 + "</p></article></body></html>"
+
+
+class LocalSite:
+    """A local HTTP server whose answers are set per path by the test, every request is recorded."""
+
+    def __init__(self):
+        self.routes = {"/robots.txt": lambda: (200, {}, "User-agent: *\nAllow: /\n")}
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                with site.lock:
+                    site.requests.append((self.path, self.headers.get("User-Agent"), time.monotonic()))
+                    site.in_flight += 1
+                    site.max_in_flight = max(site.max_in_flight, site.in_flight)
+                try:
+                    status, headers, body = site.routes.get(self.path, lambda: (200, {"Content-Type": "text/html"}, ARTICLE))()
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(body.encode())
+                finally:
+                    with site.lock:
+                        site.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page_requests(self):
+        return [request for request in self.requests if request[0] != "/robots.txt"]
+
+
+@pytest.fixture
+def site():
+    local_site = LocalSite()
+    yield local_site
+    local_site.server.shutdown()
+
+
+@pytest.fixture
+def browser_calls():
+    return []
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch, browser_calls):
+    monkeypatch.setattr(Config, "FETCH_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(Config, "FETCH_DOMAIN_RATE_PER_SECOND", 1000.0)
+    monkeypatch.setattr(Config, "FETCH_DOMAIN_BURST", 100.0)
+
+    def make(**settings):
+        for name, value in settings.items():
+            monkeypatch.setattr(Config, name, value)
+        scraper = SimpleNamespace(extract_main_content=extract_main_text,
+                                  scrape_web=lambda url: browser_calls.append(url) or "<html>browser</html>")
+        return FetchScheduler(TieredFetcher(scraper))
+
+    return make
+
+
+def test_robots_disallow_skips_the_page(site, make_scheduler):
+    site.routes["/robots.txt"] = lambda: (200, {}, f"User-agent: {Config.FETCH_ROBOTS_USER_AGENT}\nDisallow: /private\n")
+    scheduler = make_scheduler()
+
+    assert scheduler.fetch(f"{site.base_url}/private/page") is None
+    assert scheduler.fetch(f"{site.base_url}/public/page") == ARTICLE
+    assert [request[0] for request in site.requests] == ["/robots.txt", "/public/page"]
+
+
+def test_robots_and_pages_use_the_same_agent(site, make_scheduler):
+    make_scheduler().fetch(f"{site.base_url}/page")
+    agents = {request[1] for request in site.requests}
+    assert len(agents) == 1
+    assert Config.FETCH_ROBOTS_USER_AGENT in agents.pop()
+
+
+def test_throttled_page_is_retried_after_retry_after(site, make_scheduler):
+    answers = iter([(429, {"Retry-After": "1"}, ""), (200, {"Content-Type": "text/html"}, ARTICLE)])
+    site.routes["/flaky"] = lambda: next(answers)
+    scheduler = make_scheduler()
+
+    started = time.monotonic()
+    assert scheduler.fetch(f"{site.base_url}/flaky") == ARTICLE
+    assert time.monotonic() - started >= 1
+    assert scheduler.get_stats()["retried"] == 1
+
+
+def test_gives_up_without_the_browser_once_retries_are_used(site, make_scheduler, browser_calls):
+    site.routes["/down"] = lambda: (503, {}, "")
+    scheduler = make_scheduler(FETCH_MAX_RETRIES=2)
+
+    with pytest.raises(RateLimitedError):
+        scheduler.fetch(f"{site.base_url}/down")
+    assert len(site.page_requests()) == 3
+    assert browser_calls == []
+    # the domain must not be pinned to the browser tier by a give-up
+    assert scheduler.fetcher.domain_tiers.get("127.0.0.1") is None
+
+
+def test_bot_wall_503_ends_in_a_browser_fetch(site, make_scheduler, browser_calls):
+    site.routes["/walled"] = lambda: (503, {"Server": "cloudflare", "cf-mitigated": "challenge"}, "<html><title>Just a moment...</title></html>")
+    scheduler = make_scheduler(FETCH_MAX_RETRIES=2)
+
+    assert scheduler.fetch(f"{site.base_url}/walled") == "<html>browser</html>"
+    assert browser_calls == [f"{site.base_url}/walled"]
+    # no back-off against the wall, and the next page of the site goes straight to the browser
+    assert len(site.page_requests()) == 1
+    assert scheduler.get_stats()["retried"] == 0
+    assert scheduler.fetcher.domain_tiers.get("127.0.0.1") == "browser"
+
+
+@pytest.mark.parametrize("status, headers, body", [
+    (503, {"cf-mitigated": "challenge", "Server": "cloudflare"}, "<html><title>Just a moment...</title></html>"),
+    (429, {"Content-Type": "text/html"}, "<html><script src='/cdn-cgi/challenge-platform/h/b/orchestrate/jsch/v1'></script></html>"),
+    (403, {"Server": "cloudflare"}, "<html><h1>Sorry, you have been blocked</h1></html>"),
+])
+def test_challenge_page_goes_to_the_browser(site, make_scheduler, browser_calls, status, headers, body):
+    site.routes["/walled"] = lambda: (status, headers, body)
+    fetcher = make_scheduler().fetcher
+
+    assert fetcher.fetch(f"{site.base_url}/walled") == "<html>browser</html>"
+    assert browser_calls == [f"{site.base_url}/walled"]
+    assert fetcher.get_stats()["challenged"] == 1
+
+
+def test_cloudflare_throttling_without_a_challenge_is_retried(site, make_scheduler):
+    site.routes["/busy"] = lambda: (429, {"Server": "cloudflare", "Retry-After": "3"}, "error code: 1015")
+    fetcher = make_scheduler().fetcher
+
+    with pytest.raises(RetryableFetchError) as raised:
+        fetcher.fetch(f"{site.base_url}/busy")
+    assert raised.value.retry_after == 3
+
+
+def test_domain_rate_limit_spaces_requests(site, make_scheduler):
+    scheduler = make_scheduler(FETCH_DOMAIN_RATE_PER_SECOND=20.0, FETCH_DOMAIN_BURST=1.0)
+    threads = [threading.Thread(target=scheduler.fetch, args=(f"{site.base_url}/page{index}",)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    times = sorted(request[2] for request in site.page_requests())
+    assert len(times) == 6
+    # five waits of 1/20 s after the first token
+    assert times[-1] - times[0] >= 0.2
+
+
+def test_crawl_delay_slows_the_domain_down(site, make_scheduler):
+    site.routes["/robots.txt"] = lambda: (200, {}, "User-agent: *\nCrawl-delay: 1\n")
+    scheduler = make_scheduler(FETCH_DOMAIN_BURST=1.0)
+
+    scheduler.fetch(f"{site.base_url}/one")
+    scheduler.fetch(f"{site.base_url}/two")
+    first, second = [request[2] for request in site.page_requests()]
+    assert second - first >= 0.9
+
+
+def test_global_concurrency_cap(site, make_scheduler):
+    def slow_page():
+        time.sleep(0.2)
+        return 200, {"Content-Type": "text/html"}, ARTICLE
+
+    for index in range(6):
+        site.routes[f"/slow{index}"] = slow_page
+    scheduler = make_scheduler(FETCH_MAX_CONCURRENCY=2)
+    threads = [threading.Thread(target=scheduler.fetch, args=(f"{site.base_url}/slow{index}",)) for index in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(site.page_requests()) == 6
+    assert site.max_in_flight <= 2
+
+
+def test_robots_txt_is_read_once_per_site(site, make_scheduler):
+    scheduler = make_scheduler()
+    threads = [threading.Thread(target=scheduler.fetch, args=(f"{site.base_url}/page{index}",)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [request[0] for request in site.requests].count("/robots.txt") == 1
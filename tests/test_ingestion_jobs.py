@@ -0,0 +1,129 @@
+import asyncio
+import importlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import mongomock
+import pytest
+from fastapi.testclient import TestClient
+from app import app
+from app.dao import knowledge_card_dao
+from app.dao.ingestion_job_dao import IngestionJobDao, InMemoryIngestionJobDao
+from app.models import KnowledgeCardRequest
+from app.services import knowledge_card_service
+from app.utils.jwt_handler import create_access_token
+
+ingestion_module = importlib.import_module("app.services.ingestion_job_service")
+IngestionJobService = ingestion_module.IngestionJobService
+
+USER_ID = "64b000000000000000000001"
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    store = InMemoryIngestionJobDao()
+    monkeypatch.setattr(ingestion_module, "ingestion_job_dao", store)
+    return store
+
+
+@pytest.fixture
+def mongo_jobs():
+    dao = IngestionJobDao()
+    dao.ingestion_jobs_collection = mongomock.MongoClient().db.ingestion_jobs_collection
+    return dao
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    calls = []
+
+    def process_knowledge_card(user_id, source_url, note, on_stage, job_id=None):
+        calls.append((user_id, source_url, note))
+        on_stage("fetch")
+        return SimpleNamespace(card_id=f"card-{len(calls)}")
+
+    monkeypatch.setattr(knowledge_card_service, "process_knowledge_card", process_knowledge_card)
+    return calls
+
+
+def queued_job(job_id: str, updated_at: datetime = None, status: str = "queued"):
+    now = datetime.utcnow()
+    return {"job_id": job_id, "user_id": USER_ID, "source_url": "https://example.com/a", "note": None,
+            "status": status, "stage": None, "progress": 0, "created_at": now, "updated_at": updated_at or now}
+
+
+def test_submitted_job_stores_the_user_id_and_never_the_token(jobs, pipeline):
+    token = create_access_token({"userId": USER_ID, "email": "user@example.com"})
+
+    async def run():
+        service = IngestionJobService(max_workers=1)
+        job = await service.submit(KnowledgeCardRequest(token=token, source_url="https://example.com/a", note="read later"))
+        await service.queue.join()
+        await service.stop()
+        return job
+
+    job = asyncio.run(run())
+    stored = jobs.get_job(job["job_id"])
+    assert token not in str(stored)
+    assert "request" not in stored
+    assert stored["status"] == "completed"
+    assert stored["card_id"] == "card-1"
+    assert stored["expires_at"] > datetime.utcnow()
+    assert pipeline == [(USER_ID, "https://example.com/a", "read later")]
+
+
+def test_a_job_queued_by_two_instances_runs_once(jobs, pipeline):
+    jobs.create_job(queued_job("job-1"))
+
+    async def run():
+        first, second = IngestionJobService(max_workers=2), IngestionJobService(max_workers=2)
+        await asyncio.gather(first.start(), second.start())
+        await asyncio.gather(first.queue.join(), second.queue.join())
+        await asyncio.gather(first.stop(), second.stop())
+
+    asyncio.run(run())
+    assert len(pipeline) == 1
+    assert jobs.get_job("job-1")["status"] == "completed"
+
+
+def test_finished_jobs_expire(jobs):
+    jobs.create_job({**queued_job("old", status="completed"), "expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    assert jobs.get_job("old") is None
+
+
+def test_stale_running_jobs_are_requeued(mongo_jobs):
+    mongo_jobs.create_job(queued_job("stale", updated_at=datetime.utcnow() - timedelta(hours=1), status="running"))
+    mongo_jobs.create_job(queued_job("alive", status="running"))
+
+    assert mongo_jobs.requeue_stale_jobs(datetime.utcnow() - timedelta(minutes=15)) == 1
+    assert [job["job_id"] for job in mongo_jobs.get_queued_jobs()] == ["stale"]
+    assert mongo_jobs.get_job("alive")["status"] == "running"
+
+
+def test_claim_is_granted_once(mongo_jobs):
+    mongo_jobs.create_job(queued_job("job-1"))
+    assert mongo_jobs.claim_job("job-1")["status"] == "running"
+    assert mongo_jobs.claim_job("job-1") is None
+    assert mongo_jobs.claim_job("missing") is None
+
+
+def test_event_stream_of_unknown_job_is_404(jobs):
+    response = TestClient(app).get("/knowledge-card/jobs/unknown/events")
+    assert response.status_code == 404
+
+
+
+def test_a_requeued_job_does_not_insert_its_card_twice(monkeypatch):
+    cards = mongomock.MongoClient().db.knowledge_cards_collection
+    monkeypatch.setattr(knowledge_card_dao, "knowledge_cards_collection", cards)
+    indexed = []
+    monkeypatch.setattr(knowledge_card_service, "_index_new_card", lambda user_id, card, embedding: indexed.append(card.card_id))
+
+    # the interrupted run and the run after the requeue both reach the insert
+    first = knowledge_card_service.process_knowledge_card(USER_ID, None, "note", job_id="job-1")
+    second = knowledge_card_service.process_knowledge_card(USER_ID, None, "note", job_id="job-1")
+
+    assert first.card_id == second.card_id
+    assert cards.count_documents({}) == 1
+    assert indexed == [first.card_id]
+    assert knowledge_card_dao.insert_knowledge_card(first, ingestion_job_id="job-1") is None
+    assert cards.count_documents({}) == 1
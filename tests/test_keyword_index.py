@@ -0,0 +1,36 @@
+import pytest
+from app.utils import KeywordIndex, tokenize
+
+
+@pytest.fixture
+def index():
+    index = KeywordIndex()
+    index.add_document("python", {"title": "Python packaging guide", "tags": ["python"]})
+    index.add_document("pythonic", {"title": "Writing pythonic loops", "summary": "<p>Idioms &amp; style</p>"})
+    index.add_document("rust", {"title": "Rust ownership explained"})
+    return index
+
+
+def test_tokenize_drops_markup_stopwords_and_single_characters():
+    assert tokenize("<b>The</b> Rust &amp; a C compiler") == ["rust", "compiler"]
+
+
+def test_the_last_word_matches_as_a_prefix(index):
+    assert {card_id for card_id, _ in index.search("pyth")} == {"python", "pythonic"}
+    assert [card_id for card_id, _ in index.search("rust own")] == ["rust"]
+
+
+def test_a_trailing_space_ends_the_prefix(index):
+    assert [card_id for card_id, _ in index.search("python ")][0] == "python"
+    assert "pythonic" not in {card_id for card_id, _ in index.search("python ")}
+
+
+@pytest.mark.parametrize("query", ["python the", "python a", "python <i>of</i>"])
+def test_a_dropped_last_word_does_not_turn_the_previous_word_into_a_prefix(index, query):
+    assert {card_id for card_id, _ in index.search(query)} == {"python"}
+
+
+def test_removed_documents_stop_matching(index):
+    index.remove_document("pythonic")
+    assert [card_id for card_id, _ in index.search("pyth")] == ["python"]
+    assert index.suggest("pyth") == ["python"]
@@ -0,0 +1,154 @@
+import hashlib
+import importlib
+import threading
+import time
+import numpy as np
+import pytest
+from bson import ObjectId
+from app.models import KnowledgeCardListItem
+from app.services import SemanticSearchService
+
+search_file = importlib.import_module("app.services.semantic_search_service")
+
+DIMENSIONS = 64
+
+
+class HashEmbedder:
+    """Deterministic bag of words: every word adds a fixed random direction seeded by its hash."""
+    model_id = "test-hash-embedder"
+
+    def embed_text(self, text: str):
+        vector = np.zeros(DIMENSIONS, dtype=np.float32)
+        for word in text.lower().split():
+            seed = int.from_bytes(hashlib.sha1(word.encode()).digest()[:4], "little")
+            vector += np.random.default_rng(seed).normal(size=DIMENSIONS)
+        return vector.tolist()
+
+
+class FakeCardDao:
+    """Cards of one user held in memory, get_card_vectors can be made slow to stand in for Mongo."""
+
+    def __init__(self, embedder, titles_by_user, load_seconds: float = 0.0):
+        self.cards = {
+            user_id: {str(ObjectId()): title for title in titles}
+            for user_id, titles in titles_by_user.items()
+        }
+        self.embedder = embedder
+        self.load_seconds = load_seconds
+        self.loads = []
+
+    def get_card_vectors(self, user_id, model_id=None):
+        cards = [
+            {"_id": ObjectId(card_id), "embedded_vector": self.embedder.embed_text(title)}
+            for card_id, title in self.cards.get(user_id, {}).items()
+        ]
+        self.loads.append(user_id)
+        time.sleep(self.load_seconds)
+        return cards
+
+    def get_cards_by_ids(self, card_ids, viewer_id=None):
+        titles = self.cards.get(viewer_id, {})
+        cards = [KnowledgeCardListItem(card_id=card_id, user_id=viewer_id, title=titles[card_id])
+                 for card_id in card_ids if card_id in titles]
+        return cards, [card_id for card_id in card_ids if card_id not in titles]
+
+    def card_id(self, user_id, title):
+        return next(card_id for card_id, card_title in self.cards[user_id].items() if card_title == title)
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    embedder = HashEmbedder()
+    monkeypatch.setattr(search_file, "embedder_for_title", embedder)
+    return embedder
+
+
+def use_dao(monkeypatch, dao):
+    monkeypatch.setattr(search_file, "knowledge_card_dao", dao)
+    return dao
+
+
+def test_search_ranks_the_closest_title_first(monkeypatch, embedder):
+    user_id = str(ObjectId())
+    use_dao(monkeypatch, FakeCardDao(embedder, {user_id: [
+        "sourdough starter feeding schedule", "python asyncio event loop", "kubernetes pod autoscaling"
+    ]}))
+
+    results = SemanticSearchService().search(user_id, "asyncio event loop", limit=2)
+
+    assert [result["title"] for result in results][0] == "python asyncio event loop"
+    assert len(results) == 2
+    assert results[0]["score"] > results[1]["score"]
+
+
+def test_the_matrix_is_loaded_once_and_patched_by_inserts_and_deletes(monkeypatch, embedder):
+    user_id = str(ObjectId())
+    dao = use_dao(monkeypatch, FakeCardDao(embedder, {user_id: ["sourdough starter", "rye bread"]}))
+    service = SemanticSearchService()
+    service.search(user_id, "bread")
+
+    card_id = str(ObjectId())
+    dao.cards[user_id][card_id] = "espresso brewing ratio"
+    service.add_card(user_id, card_id, embedder.embed_text("espresso brewing ratio"))
+    assert service.rank(user_id, embedder.embed_text("espresso ratio"), 1)[0][0] == card_id
+
+    service.remove_card(user_id, card_id)
+    assert card_id not in [ranked_id for ranked_id, _ in service.rank(user_id, embedder.embed_text("espresso ratio"), 5)]
+    assert dao.loads == [user_id]
+
+
+def test_a_slow_load_does_not_block_the_searches_of_other_users(monkeypatch, embedder):
+    slow_user, fast_user = str(ObjectId()), str(ObjectId())
+    dao = use_dao(monkeypatch, FakeCardDao(embedder, {slow_user: ["rye bread"], fast_user: ["espresso"]}))
+    service = SemanticSearchService()
+    service.search(fast_user, "espresso")
+
+    dao.load_seconds = 0.5
+    slow = threading.Thread(target=service.search, args=(slow_user, "bread"))
+    slow.start()
+    while slow_user not in dao.loads:
+        time.sleep(0.001)
+
+    started = time.perf_counter()
+    service.search(fast_user, "espresso")
+    service.add_card(fast_user, str(ObjectId()), embedder.embed_text("latte art"))
+    assert time.perf_counter() - started < 0.2
+    slow.join()
+
+
+def test_concurrent_first_searches_of_a_user_read_the_vectors_once(monkeypatch, embedder):
+    user_id = str(ObjectId())
+    dao = use_dao(monkeypatch, FakeCardDao(embedder, {user_id: ["rye bread", "espresso"]}, load_seconds=0.1))
+    service = SemanticSearchService()
+
+    threads = [threading.Thread(target=service.search, args=(user_id, "bread")) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert dao.loads == [user_id]
+    assert service.loading == {}
+
+
+def test_a_card_inserted_while_the_matrix_loads_is_not_lost(monkeypatch, embedder):
+    user_id = str(ObjectId())
+    dao = use_dao(monkeypatch, FakeCardDao(embedder, {user_id: ["rye bread"]}, load_seconds=0.2))
+    service = SemanticSearchService()
+
+    loading = threading.Thread(target=service.search, args=(user_id, "bread"))
+    loading.start()
+    while user_id not in dao.loads:
+        time.sleep(0.001)
+    # both writes land after get_card_vectors read the collection, only add_card and remove_card report them
+    card_id = str(ObjectId())
+    dao.cards[user_id][card_id] = "espresso brewing ratio"
+    service.add_card(user_id, card_id, embedder.embed_text("espresso brewing ratio"))
+    removed_id = dao.card_id(user_id, "rye bread")
+    del dao.cards[user_id][removed_id]
+    service.remove_card(user_id, removed_id)
+    loading.join()
+
+    ranked = [ranked_id for ranked_id, _ in service.rank(user_id, embedder.embed_text("espresso"), 5)]
+    assert ranked == [card_id]
+    assert dao.loads == [user_id]